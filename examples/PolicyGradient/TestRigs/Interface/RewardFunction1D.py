@@ -24,7 +24,7 @@ class RewardFunction1D(metaclass=abc.ABCMeta):
         :param state: The floating point state
         :return numpy array [1, none]:
         """
-        xs = np.array([state])
+        xs = np.array([state], dtype=np.float32)
         return xs.reshape([1, xs.shape[0]])
 
     def reset(self) -> np.array:
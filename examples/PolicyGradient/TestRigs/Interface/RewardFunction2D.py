@@ -26,7 +26,7 @@ class RewardFunction2D(metaclass=abc.ABCMeta):
         :param state: The floating point state as 2 element List or Tuple
         :return numpy array [2, none]:
         """
-        st = np.zeros((1, 2))
+        st = np.zeros((1, 2), dtype=np.float32)
         st[0][0] = state[0]
         st[0][1] = state[1]
         return st
@@ -15,6 +15,7 @@ from examples.PolicyGradient.TestRigs.Interface.RewardFunction1D import RewardFu
 from examples.PolicyGradient.TestRigs.RewardFunctions.LocalMaximaRewardFunction1D import LocalMaximaRewardFunction1D
 from examples.PolicyGradient.TestRigs.RewardFunctions.ParabolicRewardFunction1D import ParabolicRewardFunction1D
 from examples.PolicyGradient.TestRigs.Visualise import Visualise
+from reflrn.FusedModelInference import FusedModelInference
 from reflrn.SimpleLearningRate import SimpleLearningRate
 
 
@@ -43,6 +44,8 @@ class PolicyGradientAgent:
         self.kl_update = 0
         self.actor_model = self._build_actor_model()
         self.critic_model = self._build_critic_model()
+        # actor & critic heads over the same input in one call, shares the weights of both models.
+        self.actor_critic = FusedModelInference([self.actor_model, self.critic_model], (self.state_size,))
 
         self.actor_model.summary()
 
@@ -220,14 +223,15 @@ class PolicyGradientAgent:
         :return:
         """
         batch_size = min(len(self.replay), 250)
-        X = np.zeros((batch_size, self.state_size))
-        Y = np.zeros((batch_size, self.action_size))
         samples = random.sample(list(self.replay), batch_size)
+        X = np.array([np.reshape(sample[0], self.state_size) for sample in samples], dtype=np.float32)
+        Y = np.zeros((batch_size, self.action_size), dtype=np.float32)
+        action_probs, action_values = self.actor_critic.predict(X)
         i = 0
         for sample in samples:
-            state, action_one_hot, reward, next_state = sample
-            action_value_s = self.critic_model.predict(state, batch_size=1).flatten()
-            action_probs_s = self.actor_model.predict(state, batch_size=1).flatten()
+            _, action_one_hot, reward, _ = sample
+            action_value_s = action_values[i]
+            action_probs_s = np.array(action_probs[i])
 
             avn = ((1 - action_one_hot) * action_value_s) + (action_one_hot * reward)
             avn -= np.max(avn)
@@ -238,7 +242,6 @@ class PolicyGradientAgent:
             action_probs_s += (action_probs_s * avn * 0.7)
             action_probs_s /= np.sum(action_probs_s)
 
-            X[i] = state
             Y[i] = action_probs_s
 
             print("ST: " + '{:+.2}'.format(float(X[i])) + " [ " +
@@ -273,12 +276,14 @@ class PolicyGradientAgent:
         predicted_qval_action2 = []
         states = []
         replay_qvals = []
-        for sv in np.arange(e.state_min(), e.state_max(), e.state_step()):
-            state = e.state_as_x(sv)
-            states.append(state[0])
+        svs = np.arange(e.state_min(), e.state_max(), e.state_step())
+        xs = np.concatenate([e.state_as_x(sv) for sv in svs])
+        aprobs, all_qvals = self.actor_critic.predict(xs)
+        for k, sv in enumerate(svs):
+            states.append(xs[k])
             replay_qvals.append(e.reward(sv))
-            aprob = self.actor_model.predict(state, batch_size=1).flatten()
-            qvals = self.critic_model.predict(state, batch_size=1).flatten()
+            aprob = aprobs[k]
+            qvals = all_qvals[k]
             predicted_prob_action1.append(aprob[0])
             predicted_prob_action2.append(aprob[1])
             predicted_qval_action1.append(qvals[0])
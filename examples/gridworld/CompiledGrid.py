@@ -0,0 +1,129 @@
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+
+#
+# A grid map compiled into flat tables indexed by cell id (row * cols + col).
+#
+# next_cell [cells, actions] : the cell an action moves to, the cell itself where the action is not legal.
+# legal [cells, actions] : True if the action stays on the grid, does not move into a blocked cell and the cell
+#                          is not terminal.
+# reward [cells] : the reward for moving into the cell.
+# terminal [cells] : True if the cell ends the episode.
+# blocked [cells] : True if the cell can not be moved into.
+#
+# All tables are read only, so a compiled grid can be shared by every copy of the grid it was compiled from.
+#
+# The tables can be saved and loaded (memory mapped), so large grids only need to be compiled once.
+#
+# Indexing a numpy array with a scalar is far slower than indexing a list, so for stepping a single agent one
+# cell at a time the same tables are also given as (read only by convention) Python lists via step_tables().
+#
+
+class CompiledGrid:
+    __tables = ('reward', 'terminal', 'blocked', 'next_cell', 'legal')
+
+    #
+    # grid_map : the rewards as rows of columns.
+    # moves : the (row offset, col offset) of each action by action id, ids must be 0 .. num actions - 1.
+    # terminal_reward : cells with this reward end the episode.
+    # blocked_reward : cells with this reward can not be moved into.
+    #
+    def __init__(self,
+                 grid_map: List[List[float]],
+                 moves: dict,
+                 terminal_reward: float,
+                 blocked_reward: float):
+        rewards = np.asarray(grid_map, dtype=np.float64)
+        if rewards.ndim != 2:
+            raise ValueError("Grid map must be a rectangular list of rows, given shape " + str(rewards.shape))
+        self.rows, self.cols = rewards.shape
+        self.num_cells = self.rows * self.cols
+        self.num_actions = len(moves)
+
+        self.reward = rewards.reshape(self.num_cells)
+        self.terminal = self.reward == terminal_reward
+        self.blocked = self.reward == blocked_reward
+
+        cells = np.arange(self.num_cells)
+        rw, cl = np.divmod(cells, self.cols)
+        self.next_cell = np.zeros((self.num_cells, self.num_actions), dtype=np.int64)
+        self.legal = np.zeros((self.num_cells, self.num_actions), dtype=np.bool_)
+        for actn in range(0, self.num_actions):
+            drw, dcl = moves[actn]
+            nrw = rw + drw
+            ncl = cl + dcl
+            on_grid = (nrw >= 0) & (nrw < self.rows) & (ncl >= 0) & (ncl < self.cols)
+            nxt = np.where(on_grid, (nrw * self.cols) + ncl, cells)
+            self.legal[:, actn] = on_grid & ~self.blocked[nxt] & ~self.terminal
+            self.next_cell[:, actn] = np.where(self.legal[:, actn], nxt, cells)
+
+        self.__freeze()
+        return
+
+    def __freeze(self) -> None:
+        for name in self.__tables:
+            getattr(self, name).setflags(write=False)
+        self.__step_tables = None
+        return
+
+    #
+    # Save the tables to the given directory, one numpy (.npy) file per table.
+    #
+    def save(self,
+             directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'shape.npy'), np.asarray([self.rows, self.cols], dtype=np.int64))
+        for name in self.__tables:
+            np.save(os.path.join(directory, name + '.npy'), getattr(self, name))
+        return
+
+    #
+    # Load tables saved by save(), no compilation is done. If mmap the tables are memory mapped (read only) so
+    # loading costs next to nothing and the pages of the tables are only read as they are used.
+    #
+    @classmethod
+    def load(cls,
+             directory: str,
+             mmap: bool = True) -> 'CompiledGrid':
+        cg = cls.__new__(cls)
+        cg.rows, cg.cols = np.load(os.path.join(directory, 'shape.npy')).tolist()
+        for name in cls.__tables:
+            setattr(cg, name, np.load(os.path.join(directory, name + '.npy'), mmap_mode='r' if mmap else None))
+        cg.num_cells = cg.rows * cg.cols
+        cg.num_actions = cg.next_cell.shape[1]
+        if cg.reward.shape != (cg.num_cells,) or cg.legal.shape != cg.next_cell.shape:
+            raise ValueError("Compiled grid in [" + directory + "] tables do not match grid shape " +
+                             str((cg.rows, cg.cols)))
+        cg.__freeze()
+        return cg
+
+    #
+    # The next_cell, legal, reward and terminal tables as Python lists, created on first use.
+    #
+    def step_tables(self) -> Tuple[list, list, list, list]:
+        if self.__step_tables is None:
+            self.__step_tables = (self.next_cell.tolist(),
+                                  self.legal.tolist(),
+                                  self.reward.tolist(),
+                                  self.terminal.tolist())
+        return self.__step_tables
+
+    #
+    # The cell id of the given (row, col)
+    #
+    def cell(self,
+             coords) -> int:
+        return (int(coords[0]) * self.cols) + int(coords[1])
+
+    #
+    # The (row, col) of the given cell id
+    #
+    def coords(self,
+               cell: int) -> Tuple[int, int]:
+        return divmod(int(cell), self.cols)
+
+    def shape(self) -> Tuple[int, int]:
+        return self.rows, self.cols
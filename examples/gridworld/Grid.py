@@ -39,6 +39,13 @@ class Grid(metaclass=abc.ABCMeta):
     def deep_copy(self):
         pass
 
+    #
+    # The immutable definition of the grid (map compiled into tables by cell), shared by all copies of the grid.
+    #
+    @abc.abstractmethod
+    def compiled_grid(self):
+        pass
+
     #
     # What actions are allowable with agent at current location.
     #
@@ -54,6 +61,14 @@ class Grid(metaclass=abc.ABCMeta):
     def disallowed_actions(self, allowable_actions: List[int]) -> List[int]:
         pass
 
+    #
+    # Boolean mask over actions(), True where the action is allowable at the given location (or the current
+    # location). Grids that can should override this with masks pre-computed by cell.
+    #
+    def legal_action_mask(self,
+                          coords: List[int] = None) -> np.ndarray:
+        return np.isin(np.asarray(self.actions()), np.asarray(self.allowable_actions(coords), dtype=np.int64))
+
     @classmethod
     @abc.abstractmethod
     def coords_after_action(cls, x: int, y: int, action: int) -> List[int]:
@@ -0,0 +1,207 @@
+import numpy as np
+
+
+#
+# Counts of visits by grid cell and of actions taken by (cell, action), held as int64 so they are exact however
+# long the run.
+#
+# Recording a step just appends to a buffer, the buffer is added to the counts (in one vectorised add) when it
+# is full or when the counts are read, so recording costs about the same as appending to a list.
+#
+# If decay_every is given the recent counts are halved every decay_every steps, so they weight the most recent
+# steps most heavily and are the counts to use for exploration bonuses in a non stationary setting. The total
+# counts are never decayed.
+#
+# Normalised visit distributions (for heat maps) are only calculated when asked for and are then kept until
+# the next step is recorded.
+#
+# Counts are exported as compressed numpy archives holding just the non zero counts, either all counts to date
+# (snapshot) or the counts since the last export (delta), so long runs can be written out periodically and
+# summed offline.
+#
+
+class GridActivityCounter:
+    __flush_size = 4096
+
+    def __init__(self,
+                 rows: int,
+                 cols: int,
+                 num_actions: int,
+                 decay_every: int = None):
+        if decay_every is not None and decay_every < 1:
+            raise ValueError("Decay window must be at least one step, given [" + str(decay_every) + "]")
+        self.__rows = rows
+        self.__cols = cols
+        self.__num_cells = rows * cols
+        self.__num_actions = num_actions
+        self.__decay_every = decay_every
+
+        self.__steps = 0
+        self.__cell_counts = np.zeros(self.__num_cells, dtype=np.int64)
+        self.__cell_action_counts = np.zeros(self.__num_cells * num_actions, dtype=np.int64)
+        self.__recent_cell_counts = None
+        self.__recent_cell_action_counts = None
+        if decay_every is not None:
+            self.__recent_cell_counts = np.zeros(self.__num_cells, dtype=np.int64)
+            self.__recent_cell_action_counts = np.zeros(self.__num_cells * num_actions, dtype=np.int64)
+
+        self.__visited = list()  # buffered cells moved into
+        self.__taken = list()  # buffered (cell * num_actions) + action of the actions taken
+        self.__exported_cell_counts = np.zeros(self.__num_cells, dtype=np.int64)
+        self.__exported_cell_action_counts = np.zeros(self.__num_cells * num_actions, dtype=np.int64)
+        self.__exported_steps = 0
+        self.__distribution = None
+        self.__flush_at = self.__next_flush_at()
+        return
+
+    #
+    # Record the given action being taken from the given cell and moving the agent into the given next cell.
+    #
+    def record(self,
+               cell: int,
+               action: int,
+               next_cell: int) -> None:
+        self.__visited.append(next_cell)
+        self.__taken.append((cell * self.__num_actions) + action)
+        self.__distribution = None
+        if len(self.__visited) >= self.__flush_at:
+            self.__flush()
+            if self.__decay_every is not None and self.__steps % self.__decay_every == 0:
+                self.__recent_cell_counts >>= 1
+                self.__recent_cell_action_counts >>= 1
+        return
+
+    #
+    # The buffer is flushed when full or at the end of a decay window, whichever comes first.
+    #
+    def __next_flush_at(self) -> int:
+        if self.__decay_every is None:
+            return self.__flush_size
+        return min(self.__flush_size, self.__decay_every - (self.__steps % self.__decay_every))
+
+    #
+    # Add the buffered steps to the counts.
+    #
+    def __flush(self) -> None:
+        if len(self.__visited) > 0:
+            visited = np.asarray(self.__visited, dtype=np.int64)
+            taken = np.asarray(self.__taken, dtype=np.int64)
+            np.add.at(self.__cell_counts, visited, 1)
+            np.add.at(self.__cell_action_counts, taken, 1)
+            if self.__decay_every is not None:
+                np.add.at(self.__recent_cell_counts, visited, 1)
+                np.add.at(self.__recent_cell_action_counts, taken, 1)
+            self.__steps += len(self.__visited)
+            self.__visited.clear()
+            self.__taken.clear()
+            self.__flush_at = self.__next_flush_at()
+        return
+
+    def steps(self) -> int:
+        return self.__steps + len(self.__visited)
+
+    #
+    # Visits by cell [rows, cols], recent (decayed) visits if decay is on and recent is True.
+    #
+    def cell_counts(self,
+                    recent: bool = False) -> np.ndarray:
+        self.__flush()
+        counts = self.__recent_cell_counts if recent and self.__decay_every is not None else self.__cell_counts
+        return counts.reshape((self.__rows, self.__cols)).copy()
+
+    #
+    # Actions taken by cell [rows, cols, actions], recent (decayed) counts if decay is on and recent is True.
+    #
+    def cell_action_counts(self,
+                           recent: bool = False) -> np.ndarray:
+        self.__flush()
+        if recent and self.__decay_every is not None:
+            counts = self.__recent_cell_action_counts
+        else:
+            counts = self.__cell_action_counts
+        return counts.reshape((self.__rows, self.__cols, self.__num_actions)).copy()
+
+    #
+    # Visits by cell [rows, cols] as a fraction of all visits, all zero if there have been none. Read only as
+    # it is kept until the next step is recorded.
+    #
+    def visit_distribution(self) -> np.ndarray:
+        if self.__distribution is None:
+            self.__flush()
+            total = np.sum(self.__cell_counts)
+            dist = self.__cell_counts / total if total > 0 else np.zeros(self.__num_cells)
+            dist = dist.reshape((self.__rows, self.__cols))
+            dist.setflags(write=False)
+            self.__distribution = dist
+        return self.__distribution
+
+    #
+    # Count based exploration bonus, beta / sqrt(1 + n) by action [k, actions] for the given cell ids [k], or
+    # [actions] for a single cell id, where n is the (recent if decay is on) number of times the action has been
+    # taken from the cell.
+    #
+    def exploration_bonus(self,
+                          cells,
+                          beta: float = 1.0) -> np.ndarray:
+        self.__flush()
+        counts = self.__cell_action_counts if self.__decay_every is None else self.__recent_cell_action_counts
+        counts = counts.reshape((self.__num_cells, self.__num_actions))
+        return beta / np.sqrt(1.0 + counts[cells])
+
+    #
+    # Export all counts to date.
+    #
+    def save_snapshot(self,
+                      file_name: str) -> None:
+        self.__flush()
+        self.__export(file_name, self.__cell_counts, self.__cell_action_counts, self.__steps)
+        return
+
+    #
+    # Export the counts since the last export (snapshot or delta), summing the deltas in order gives the
+    # counts to date.
+    #
+    def save_delta(self,
+                   file_name: str) -> None:
+        self.__flush()
+        self.__export(file_name,
+                      self.__cell_counts - self.__exported_cell_counts,
+                      self.__cell_action_counts - self.__exported_cell_action_counts,
+                      self.__steps - self.__exported_steps)
+        return
+
+    def __export(self,
+                 file_name: str,
+                 cell_counts: np.ndarray,
+                 cell_action_counts: np.ndarray,
+                 steps: int) -> None:
+        cells = np.flatnonzero(cell_counts)
+        cell_actions = np.flatnonzero(cell_action_counts)
+        with open(file_name, 'wb') as f:
+            np.savez_compressed(f,
+                                shape=np.asarray([self.__rows, self.__cols, self.__num_actions], dtype=np.int64),
+                                steps=np.int64(steps),
+                                cells=cells,
+                                cell_counts=cell_counts[cells],
+                                cell_actions=cell_actions,
+                                cell_action_counts=cell_action_counts[cell_actions])
+        self.__exported_cell_counts = self.__cell_counts.copy()
+        self.__exported_cell_action_counts = self.__cell_action_counts.copy()
+        self.__exported_steps = self.__steps
+        return
+
+    #
+    # Load exported counts as (cell counts [rows, cols], cell action counts [rows, cols, actions], steps)
+    #
+    @classmethod
+    def load_counts(cls,
+                    file_name: str):
+        with np.load(file_name) as arc:
+            rows, cols, num_actions = arc['shape'].tolist()
+            cell_counts = np.zeros(rows * cols, dtype=np.int64)
+            cell_counts[arc['cells']] = arc['cell_counts']
+            cell_action_counts = np.zeros(rows * cols * num_actions, dtype=np.int64)
+            cell_action_counts[arc['cell_actions']] = arc['cell_action_counts']
+            return (cell_counts.reshape((rows, cols)),
+                    cell_action_counts.reshape((rows, cols, num_actions)),
+                    int(arc['steps']))
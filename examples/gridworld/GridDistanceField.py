@@ -0,0 +1,124 @@
+from typing import List
+
+import numpy as np
+
+from .CompiledGrid import CompiledGrid
+
+
+#
+# The fewest steps from every cell of a compiled grid to the nearest goal (terminal) cell.
+#
+# Found by a breadth first search out from all terminal cells at once over the legal moves taken in reverse, one
+# vectorised step per distance. The moves into each cell are held sorted by the cell moved into, so each step
+# only looks at the moves into the current frontier and the whole search is proportional to the number of
+# legal moves.
+#
+# Terminal cells are at distance 0. Blocked cells and cells from which no terminal can be reached are at
+# distance UNREACHABLE.
+#
+
+class GridDistanceField:
+    UNREACHABLE = -1
+
+    def __init__(self,
+                 compiled_grid: CompiledGrid):
+        cg = compiled_grid
+        self.__grid = cg
+
+        src, act = np.nonzero(cg.legal & ~cg.blocked[:, None])
+        dst = cg.next_cell[src, act]
+        order = np.argsort(dst, kind='stable')
+        moves_into = src[order]  # the cells that can move into each cell, grouped by the cell moved into
+        first = np.zeros(cg.num_cells + 1, dtype=np.int64)
+        first[1:] = np.cumsum(np.bincount(dst, minlength=cg.num_cells))
+
+        dist = np.full(cg.num_cells, self.UNREACHABLE, dtype=np.int64)
+        frontier = np.flatnonzero(cg.terminal)
+        dist[frontier] = 0
+        d = 0
+        while frontier.size > 0:
+            starts = first[frontier]
+            counts = first[frontier + 1] - starts
+            total = int(np.sum(counts))
+            if total == 0:
+                break
+            ends = np.cumsum(counts)
+            idx = np.repeat(starts - (ends - counts), counts) + np.arange(total)
+            frontier = np.unique(moves_into[idx])
+            frontier = frontier[dist[frontier] == self.UNREACHABLE]
+            d += 1
+            dist[frontier] = d
+
+        dist.setflags(write=False)
+        self.__dist = dist
+        self.__max_distance = max(int(np.max(dist)), 0)
+        return
+
+    #
+    # Steps to the nearest terminal by cell id [cells], read only.
+    #
+    def distances(self) -> np.ndarray:
+        return self.__dist
+
+    #
+    # Steps to the nearest terminal as a grid [rows, cols].
+    #
+    def distance_grid(self) -> np.ndarray:
+        return self.__dist.reshape((self.__grid.rows, self.__grid.cols))
+
+    #
+    # Largest (reachable) distance on the grid.
+    #
+    def max_distance(self) -> int:
+        return self.__max_distance
+
+    #
+    # The fewest steps to a terminal from the given (row, col), or an array of them [k, 2]
+    #
+    def optimal_steps(self,
+                      coords):
+        coords = np.asarray(coords, dtype=np.int64)
+        steps = self.__dist[(coords[..., 0] * self.__grid.cols) + coords[..., 1]]
+        return int(steps) if steps.ndim == 0 else steps
+
+    #
+    # Steps taken in excess of the fewest possible from the given start (row, col), or from each of an array
+    # of starts [k, 2] given an array of steps taken [k]. None (nan for arrays) where the start can not reach
+    # a terminal.
+    #
+    def optimality_gap(self,
+                       start_coords,
+                       steps_taken):
+        optimal = self.optimal_steps(start_coords)
+        if np.ndim(optimal) == 0:
+            return None if optimal == self.UNREACHABLE else int(steps_taken) - optimal
+        gap = np.asarray(steps_taken, dtype=np.float64) - optimal
+        gap[optimal == self.UNREACHABLE] = np.nan
+        return gap
+
+    #
+    # Boolean mask [cells, actions] of the legal actions that move one step closer to a terminal.
+    #
+    def optimal_actions(self) -> np.ndarray:
+        cg = self.__grid
+        dist_next = self.__dist[cg.next_cell]
+        return cg.legal & (self.__dist[:, None] > 0) & (dist_next == self.__dist[:, None] - 1)
+
+    #
+    # The shaping potential by cell id [cells], -scale * distance with unreachable cells one step further than
+    # the furthest reachable cell, so terminal cells have potential zero.
+    #
+    def potential(self,
+                  scale: float = 1.0) -> np.ndarray:
+        dist = np.where(self.__dist == self.UNREACHABLE, self.__max_distance + 1, self.__dist)
+        return -scale * dist.astype(np.float64)
+
+    def grid(self) -> CompiledGrid:
+        return self.__grid
+
+    #
+    # The cell id of the given (row, col)
+    #
+    def cell(self,
+             coords: List[int]) -> int:
+        return self.__grid.cell(coords)
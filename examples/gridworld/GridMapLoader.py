@@ -0,0 +1,198 @@
+import hashlib
+import os
+import shutil
+from typing import List, Tuple
+
+import numpy as np
+
+from .CompiledGrid import CompiledGrid
+from .SimpleGridOne import SimpleGridOne
+from .SparseGridMap import SparseGridMap
+
+
+#
+# Load grid maps from file, in either of two formats
+#
+# Text : one line per grid row, one character per cell
+#
+#   .  step        F  fire        G  goal        #  blocked        S  start (a step cell the agent starts on)
+#
+#   Blank lines and lines starting with ; are ignored, as is white space at either end of a line. All rows
+#   must be the same length and there can be at most one start.
+#
+# Binary : a SparseGridMap saved by SparseGridMap.save(), told apart from text by the (zip) file signature.
+#
+# Compiling a large map into its tables takes far longer than loading the tables, so if a cache directory is
+# given the compiled grid (and the map start) is saved there keyed by the sha256 of the map file content.
+# Loading the same map again, even from a different file, then just memory maps the tables. Changing the map
+# changes the key so a stale compiled grid is never used.
+#
+
+class GridMapLoader:
+    __cache_version = b'SimpleGridOne-compiled-v1'  # change if the way maps are compiled changes
+    __zip_signature = b'PK\x03\x04'
+    START = 'S'
+    COMMENT = ';'
+    SYMBOLS = {'.': SimpleGridOne.STEP,
+               'F': SimpleGridOne.FIRE,
+               'G': SimpleGridOne.GOAL,
+               '#': SimpleGridOne.BLCK,
+               START: SimpleGridOne.STEP}
+
+    class MapFormatError(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
+
+    def __init__(self,
+                 cache_dir: str = None):
+        self.__cache_dir = cache_dir
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        return
+
+    #
+    # Parse a map in text form, return the map and the start coords (None if the map has no start)
+    #
+    @classmethod
+    def parse_text(cls,
+                   text: str) -> Tuple[SparseGridMap, List[int]]:
+        rows = list()
+        for ln in text.splitlines():
+            ln = ln.strip()
+            if len(ln) > 0 and not ln.startswith(cls.COMMENT):
+                rows.append(ln)
+        if len(rows) == 0:
+            raise GridMapLoader.MapFormatError("Grid map has no rows")
+        if any(len(rw) != len(rows[0]) for rw in rows):
+            raise GridMapLoader.MapFormatError("Grid map rows must all be the same length")
+
+        try:
+            codes = np.frombuffer("".join(rows).encode('ascii'), dtype=np.uint8)
+        except UnicodeEncodeError:
+            raise GridMapLoader.MapFormatError("Grid map symbols must be ascii")
+        lookup = np.full(256, np.nan)
+        for sym, reward in cls.SYMBOLS.items():
+            lookup[ord(sym)] = reward
+        dense = lookup[codes]
+        if np.any(np.isnan(dense)):
+            unknown = sorted(set(chr(c) for c in np.unique(codes[np.isnan(dense)]).tolist()))
+            raise GridMapLoader.MapFormatError("Unknown grid map symbol(s) " + str(unknown))
+        starts = np.flatnonzero(codes == ord(cls.START))
+        if len(starts) > 1:
+            raise GridMapLoader.MapFormatError("Grid map has more than one start " + str(
+                [list(divmod(int(c), len(rows[0]))) for c in starts]))
+
+        cells = np.flatnonzero(dense != SimpleGridOne.STEP)
+        sgm = SparseGridMap(len(rows), len(rows[0]), SimpleGridOne.STEP, cells, dense[cells])
+        start = list(divmod(int(starts[0]), len(rows[0]))) if len(starts) == 1 else None
+        return sgm, start
+
+    #
+    # The text form of the given map, with the start marked if given.
+    #
+    @classmethod
+    def to_text(cls,
+                sparse_map: SparseGridMap,
+                start: List[int] = None) -> str:
+        dense = sparse_map.dense()
+        chars = np.full(dense.shape, '?')
+        for sym, reward in cls.SYMBOLS.items():
+            if sym != cls.START:
+                chars[dense == reward] = sym
+        if np.any(chars == '?'):
+            raise GridMapLoader.MapFormatError("Grid map has rewards with no text symbol " + str(
+                np.unique(dense[chars == '?']).tolist()))
+        if start is not None:
+            if chars[start[0], start[1]] != '.':
+                raise GridMapLoader.MapFormatError("Start " + str(list(start)) + " must be on a step cell")
+            chars[start[0], start[1]] = cls.START
+        return "\n".join("".join(rw) for rw in chars.tolist()) + "\n"
+
+    #
+    # Load a map from file in either format, return the map and the start coords (None if the map has no start)
+    #
+    def load_map(self,
+                 file_name: str) -> Tuple[SparseGridMap, List[int]]:
+        return self.__parse(self.__read(file_name), file_name)
+
+    #
+    # The compiled grid for the map in the given file, from the cache if it has been compiled before.
+    #
+    def compiled_grid(self,
+                      file_name: str) -> CompiledGrid:
+        return self.__compiled(self.__read(file_name), file_name)[0]
+
+    #
+    # A SimpleGridOne for the map in the given file, starting at the map start (re-spawning there if no
+    # re-spawn type is given) or re-spawning at random if the map has no start.
+    #
+    def simple_grid(self,
+                    file_name: str,
+                    grid_id: int,
+                    respawn_type: int = None) -> SimpleGridOne:
+        cg, start = self.__compiled(self.__read(file_name), file_name)
+        if respawn_type is None:
+            respawn_type = SimpleGridOne.RESPAWN_RANDOM if start is None else SimpleGridOne.RESPAWN_DEFAULT
+        grid_map = cg.reward.reshape((cg.rows, cg.cols))
+        return SimpleGridOne(grid_id, grid_map, start, respawn_type, compiled_grid=cg)
+
+    def cache_hits(self) -> int:
+        return self.__cache_hits
+
+    def cache_misses(self) -> int:
+        return self.__cache_misses
+
+    #
+    # The cache key for the given map file content.
+    #
+    @classmethod
+    def cache_key(cls,
+                  content: bytes) -> str:
+        return hashlib.sha256(cls.__cache_version + b'\0' + content).hexdigest()
+
+    @classmethod
+    def __read(cls,
+               file_name: str) -> bytes:
+        with open(file_name, 'rb') as f:
+            return f.read()
+
+    def __parse(self,
+                content: bytes,
+                file_name: str) -> Tuple[SparseGridMap, List[int]]:
+        if content.startswith(self.__zip_signature):
+            return SparseGridMap.load(file_name), None
+        try:
+            return self.parse_text(content.decode('utf-8'))
+        except UnicodeDecodeError:
+            raise GridMapLoader.MapFormatError("Grid map file [" + file_name + "] is neither text nor binary map")
+
+    #
+    # The compiled grid and map start for the given map file content.
+    #
+    def __compiled(self,
+                   content: bytes,
+                   file_name: str) -> Tuple[CompiledGrid, List[int]]:
+        cache_entry = None
+        if self.__cache_dir is not None:
+            cache_entry = os.path.join(self.__cache_dir, self.cache_key(content))
+            if os.path.isdir(cache_entry):
+                self.__cache_hits += 1
+                start = np.load(os.path.join(cache_entry, 'start.npy')).tolist()
+                return CompiledGrid.load(cache_entry), (start if len(start) > 0 else None)
+
+        self.__cache_misses += 1
+        sgm, start = self.__parse(content, file_name)
+        cg = SimpleGridOne.compile_map(sgm.dense())
+        if cache_entry is not None:
+            # written in full under a temporary name then renamed, so a partly written entry is never read.
+            tmp_entry = cache_entry + '.' + str(os.getpid()) + '.tmp'
+            cg.save(tmp_entry)
+            np.save(os.path.join(tmp_entry, 'start.npy'), np.asarray(start if start is not None else [],
+                                                                     dtype=np.int64))
+            try:
+                os.replace(tmp_entry, cache_entry)
+            except OSError:
+                shutil.rmtree(tmp_entry, ignore_errors=True)  # cached by another process in the meantime
+        return cg, start
@@ -0,0 +1,96 @@
+import numpy as np
+
+from examples.gridworld.CompiledGrid import CompiledGrid
+
+
+#
+# How close learned grid q-values are to the optimal (value iteration) q-values.
+#
+# Only cells with at least one legal action are compared, and for q-values only the legal actions of those
+# cells. Learned q-values may be given as [rows, cols, actions] or [cells, actions] in which case the q error,
+# the value error (max legal q) and greedy policy agreement are reported. A learned value grid [rows, cols]
+# or [cells] gives just the value error.
+#
+# The greedy action of a cell agrees with the optimal policy if it is any of the optimal actions of the cell
+# (optimal q within tie_tolerance of the optimal value).
+#
+
+class GridQComparison:
+
+    def __init__(self,
+                 compiled_grid: CompiledGrid,
+                 optimal_q: np.ndarray,
+                 optimal_v: np.ndarray,
+                 learned: np.ndarray,
+                 tie_tolerance: float = 1e-6):
+        cg = compiled_grid
+        learned = np.asarray(learned, dtype=np.float64)
+        self.__grid = cg
+        self.__active = np.any(cg.legal, axis=1)
+        self.num_cells = int(np.count_nonzero(self.__active))
+
+        if learned.shape in ((cg.rows, cg.cols, cg.num_actions), (cg.num_cells, cg.num_actions)):
+            self.compares_q = True
+            lq = learned.reshape(cg.num_cells, cg.num_actions)
+            err = lq[cg.legal] - optimal_q[cg.legal]
+            self.q_mae = float(np.mean(np.abs(err))) if err.size > 0 else 0.0
+            self.q_rmse = float(np.sqrt(np.mean(np.square(err)))) if err.size > 0 else 0.0
+            self.q_max_abs_error = float(np.max(np.abs(err))) if err.size > 0 else 0.0
+            lqm = np.where(cg.legal, lq, -np.inf)
+            learned_v = np.max(lqm, axis=1)
+            greedy = np.argmax(lqm, axis=1)
+            optimal = optimal_q[np.arange(cg.num_cells), greedy] >= (optimal_v - tie_tolerance)
+            agree = optimal[self.__active]
+            self.policy_agreement = float(np.mean(agree)) if agree.size > 0 else 1.0
+            dis = np.flatnonzero(self.__active & ~optimal)
+            self.policy_disagreements = np.stack(np.divmod(dis, cg.cols), axis=1)
+        elif learned.shape in ((cg.rows, cg.cols), (cg.num_cells,)):
+            self.compares_q = False
+            self.q_mae = self.q_rmse = self.q_max_abs_error = None
+            self.policy_agreement = None
+            self.policy_disagreements = None
+            learned_v = learned.reshape(cg.num_cells)
+        else:
+            raise ValueError("Learned values of shape " + str(learned.shape) + " do not match grid of shape " +
+                             str((cg.rows, cg.cols)) + " with [" + str(cg.num_actions) + "] actions")
+
+        verr = learned_v[self.__active] - optimal_v[self.__active]
+        self.v_mae = float(np.mean(np.abs(verr))) if verr.size > 0 else 0.0
+        self.v_max_abs_error = float(np.max(np.abs(verr))) if verr.size > 0 else 0.0
+        return
+
+    #
+    # Quality gate, True if the learned values are within the given limits (limits not given are not checked).
+    #
+    def passed(self,
+               max_v_error: float = None,
+               min_policy_agreement: float = None,
+               max_q_error: float = None) -> bool:
+        if max_v_error is not None and self.v_max_abs_error > max_v_error:
+            return False
+        if min_policy_agreement is not None and self.compares_q and self.policy_agreement < min_policy_agreement:
+            return False
+        if max_q_error is not None and self.compares_q and self.q_max_abs_error > max_q_error:
+            return False
+        return True
+
+    #
+    # Human readable summary.
+    #
+    def report(self) -> str:
+        s = "Compared [" + str(self.num_cells) + "] cells of " + str(self.__grid.rows) + "x" + str(
+            self.__grid.cols) + " grid\n"
+        s += "V  : mae [{:.6f}] max abs error [{:.6f}]\n".format(self.v_mae, self.v_max_abs_error)
+        if self.compares_q:
+            s += "Q  : mae [{:.6f}] rmse [{:.6f}] max abs error [{:.6f}]\n".format(self.q_mae,
+                                                                                 self.q_rmse,
+                                                                                 self.q_max_abs_error)
+            s += "Policy : agreement [{:.2f}%] cells not optimal [{:d}]".format(self.policy_agreement * 100.0,
+                                                                               len(self.policy_disagreements))
+            if len(self.policy_disagreements) > 0:
+                s += " e.g. " + str([tuple(c) for c in self.policy_disagreements[:10].tolist()])
+            s += "\n"
+        return s
+
+    def __str__(self) -> str:
+        return self.report()
@@ -0,0 +1,185 @@
+import numpy as np
+
+from examples.gridworld.CompiledGrid import CompiledGrid
+from examples.gridworld.GridQComparison import GridQComparison
+
+
+#
+# Exact (dynamic programming) solution of a compiled grid, as a ground truth to judge learned q-values against.
+#
+# The grid is deterministic so the Bellman backup for all cells and actions at once is
+#
+#   Q[s, a] = reward[s'] + gamma * V[s'] (0 if s' is terminal), s' = next_cell[s, a]
+#   V[s] = max over legal a of Q[s, a], 0 where there are no legal actions (terminal or boxed in)
+#
+# Value iteration needs about as many sweeps as the longest path to a terminal to propagate the terminal
+# reward. Beyond that it converges slowly (at rate gamma) on cells that can not reach a terminal at all, so
+# every evaluate_every sweeps the greedy policy is evaluated exactly and if its values are a fixed point of the
+# backup (within tolerance) they are optimal and iteration stops.
+#
+# The tables are held action major [actions, cells] so the max over actions is an elementwise max of rows.
+#
+# A deterministic policy maps each cell to one next cell, so it is evaluated exactly by pointer doubling: the
+# discounted reward over 2^(j+1) steps is that over 2^j steps plus the discounted 2^j step reward from where
+# those steps end. A few tens of vectorised steps cover any horizon that matters for gamma < 1.
+#
+# Illegal actions are given Q = nan.
+#
+
+class GridValueIteration:
+
+    class DidNotConverge(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
+
+    def __init__(self,
+                 compiled_grid: CompiledGrid,
+                 gamma: float,
+                 tolerance: float = 1e-9,
+                 max_iterations: int = 100000,
+                 evaluate_every: int = 64):
+        if not 0.0 <= gamma < 1.0:
+            raise ValueError("Discount factor gamma must be in the range [0, 1) given [" + str(gamma) + "]")
+        self.__grid = compiled_grid
+        self.__gamma = gamma
+        self.__tolerance = tolerance
+        self.__max_iterations = max_iterations
+        self.__evaluate_every = evaluate_every
+        self.__q = None
+        self.__v = None
+        self.__iterations = 0
+        self.__evaluations = 0
+
+        cg = compiled_grid
+        self.__next_cell = np.ascontiguousarray(cg.next_cell.T)
+        self.__has_legal = np.any(cg.legal, axis=1)
+        self.__no_legal = np.flatnonzero(~self.__has_legal)
+        self.__r = cg.reward[self.__next_cell]
+        self.__r_legal = np.where(cg.legal.T, self.__r, -np.inf)  # illegal actions never give the max
+        self.__discount = self.__gamma * ~cg.terminal[self.__next_cell]
+        self.__qbuf = np.empty(self.__next_cell.shape)
+        self.__dbuf = np.empty(cg.num_cells)
+        return
+
+    #
+    # Solve to convergence, return self so the result can be read straight off.
+    #
+    def solve(self) -> 'GridValueIteration':
+        cg = self.__grid
+        v = np.zeros(cg.num_cells)
+        vn = np.empty(cg.num_cells)
+        self.__evaluations = 0
+        for itr in range(1, self.__max_iterations + 1):
+            self.__max_legal(self.__backup(v, self.__r_legal), out=vn)
+            np.subtract(vn, v, out=self.__dbuf)
+            delta = max(np.max(self.__dbuf), -np.min(self.__dbuf))
+            v, vn = vn, v
+            if delta <= self.__tolerance:
+                break
+            if itr % self.__evaluate_every == 0:
+                vp = self.__evaluate(np.argmax(self.__backup(v, self.__r_legal), axis=0))
+                self.__evaluations += 1
+                if np.max(np.abs(self.__max_legal(self.__backup(vp, self.__r_legal)) - vp)) <= self.__tolerance:
+                    v = vp
+                    break
+        else:
+            raise GridValueIteration.DidNotConverge("Value iteration did not converge in [" +
+                                                    str(self.__max_iterations) + "] iterations")
+        self.__iterations = itr
+        q = np.array(self.__backup(v, self.__r).T)
+        q[~cg.legal] = np.nan
+        self.__q = q
+        self.__v = v.copy()
+        return self
+
+    #
+    # Q [actions, cells] given V and rewards, in a re-used buffer.
+    #
+    def __backup(self,
+                 v: np.ndarray,
+                 r: np.ndarray) -> np.ndarray:
+        q = self.__qbuf
+        np.take(v, self.__next_cell, out=q)
+        q *= self.__discount
+        q += r
+        return q
+
+    #
+    # V as the max over legal actions, 0 where there are none
+    #
+    def __max_legal(self,
+                    q: np.ndarray,
+                    out: np.ndarray = None) -> np.ndarray:
+        v = np.maximum.reduce(q, axis=0, out=out)
+        v[self.__no_legal] = 0.0
+        return v
+
+    #
+    # Exact value of following the given (greedy) policy from every cell, by pointer doubling.
+    #
+    def __evaluate(self,
+                   policy: np.ndarray) -> np.ndarray:
+        cells = np.arange(self.__grid.num_cells)
+        nxt = np.where(self.__has_legal, self.__next_cell[policy, cells], cells)
+        rwd = np.where(self.__has_legal, self.__r[policy, cells], 0.0)  # discounted reward over 2^j steps
+        dsc = np.where(self.__has_legal, self.__discount[policy, cells], 0.0)  # discount after 2^j steps
+        bound = max(float(np.max(np.abs(self.__r))), 1.0) / (1.0 - self.__gamma)
+        while np.max(dsc) * bound > self.__tolerance * (1.0 - self.__gamma):
+            rwd = rwd + (dsc * rwd[nxt])
+            dsc = dsc * dsc[nxt]
+            nxt = nxt[nxt]
+        return rwd
+
+    #
+    # Optimal Q values by cell id [cells, actions], nan for illegal actions.
+    #
+    def q(self) -> np.ndarray:
+        self.__solved()
+        return self.__q.copy()
+
+    #
+    # Optimal Q values as a grid [rows, cols, actions], nan for illegal actions.
+    #
+    def q_grid(self) -> np.ndarray:
+        return np.reshape(self.q(), (self.__grid.rows, self.__grid.cols, self.__grid.num_actions))
+
+    #
+    # Optimal state values as a grid [rows, cols], 0 at terminal cells.
+    #
+    def v_grid(self) -> np.ndarray:
+        self.__solved()
+        return np.reshape(self.__v, (self.__grid.rows, self.__grid.cols)).copy()
+
+    #
+    # Optimal (greedy) action by cell as a grid [rows, cols], -1 where there is no legal action.
+    #
+    def policy_grid(self) -> np.ndarray:
+        self.__solved()
+        pol = np.argmax(np.where(self.__grid.legal, self.__q, -np.inf), axis=1)
+        pol[~np.any(self.__grid.legal, axis=1)] = -1
+        return np.reshape(pol, (self.__grid.rows, self.__grid.cols))
+
+    def iterations(self) -> int:
+        return self.__iterations
+
+    #
+    # The number of exact policy evaluations made by the last solve.
+    #
+    def evaluations(self) -> int:
+        return self.__evaluations
+
+    def gamma(self) -> float:
+        return self.__gamma
+
+    #
+    # Compare learned Q values [rows, cols, actions] (or a learned value grid [rows, cols]) with the optimum.
+    #
+    def compare(self,
+                learned: np.ndarray) -> GridQComparison:
+        self.__solved()
+        return GridQComparison(self.__grid, self.__q, self.__v, learned)
+
+    def __solved(self) -> None:
+        if self.__q is None:
+            self.solve()
+        return
@@ -87,6 +87,15 @@ class GridWorld(Environment):
     def actions(self) -> [int]:
         return self.__grid.actions()
 
+    #
+    # Boolean mask of the actions allowable in the given state (or the current state).
+    #
+    def legal_action_mask(self,
+                          state: State = None) -> np.ndarray:
+        if state is None:
+            return self.__grid.legal_action_mask()
+        return self.__grid.legal_action_mask(state.state())
+
     #
     # Make the play chosen by the given agent. If it is a valid play
     # confer reward and switch play to other agent. If invalid play
@@ -130,7 +139,7 @@ class GridWorld(Environment):
     # The current curr_coords of the environment as string
     #
     def state_as_str(self) -> str:
-        return GridWorldState(self.__grid, self.__x_agent).state_as_string()
+        return GridWorldState(self.__grid).state_as_string()
 
     #
     # Load Environment from file
@@ -160,7 +169,7 @@ class GridWorld(Environment):
     # Return the State of the environment
     #
     def state(self) -> State:
-        return GridWorldState(self.__grid, self.__x_agent)
+        return GridWorldState(self.__grid)
 
     #
     # No attributes supported at this point
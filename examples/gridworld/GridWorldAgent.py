@@ -1,19 +1,31 @@
 import logging
 
-from examples.gridworld.RenderGridWorldAgentExplorationMemory import RenderGridWorldAgentExplorationMemory
+import numpy as np
+
+from examples.gridworld.GridDistanceField import GridDistanceField
 from reflrn.AgentExplorationMemory import AgentExplorationMemory
+from reflrn.EpisodeSummaryHistory import EpisodeSummaryHistory
 from reflrn.Interface.Agent import Agent
 from reflrn.Interface.ExplorationStrategy import ExplorationStrategy
 from reflrn.Interface.State import State
 
 
+#
+# If a distance field for the grid is given the episode summaries also record the cell each episode started from
+# and the optimality gap of the episode, the steps taken in excess of the fewest possible from the start cell.
+# The gap is nan where the start cell can not reach a terminal (or the episode had no steps, start cell -1).
+#
+
 class GridWorldAgent(Agent):
+    START_CELL = 'start_cell'
+    OPTIMALITY_GAP = 'optimality_gap'
 
     def __init__(self,
                  agent_id: int,  # immutable & unique id for this agent
                  agent_name: str,  # immutable & unique name for this agent
                  exploration_strategy: ExplorationStrategy,
-                 lg: logging):
+                 lg: logging,
+                 distance_field: GridDistanceField = None):
         self.__lg = lg
         self.__id = agent_id
         self.__name = agent_name
@@ -21,6 +33,12 @@ class GridWorldAgent(Agent):
         self.__policy = None
         self.__episode = 0
         self.__exploration_memory = AgentExplorationMemory(self.__lg)
+        self.__distance_field = distance_field
+        self.__start_coords = None
+        extra_columns = None
+        if distance_field is not None:
+            extra_columns = {self.START_CELL: np.int64, self.OPTIMALITY_GAP: np.float64}
+        self.__episode_summaries = EpisodeSummaryHistory(extra_columns=extra_columns)
 
     # Return immutable id
     #
@@ -48,11 +66,33 @@ class GridWorldAgent(Agent):
     # Environment call back when episode is completed
     #
     def episode_complete(self, state: State):
-        self.__lg.info(RenderGridWorldAgentExplorationMemory(self.__lg, True).render_episode(self.__exploration_memory,
-                                                                                             self.__episode))
+        summary = self.__episode_summaries.close_episode(self.__episode, self.__optimality_summary())
+        self.__lg.info('Episode Summary : Length: ' + str(summary[EpisodeSummaryHistory.LENGTH]) +
+                       ' Cost : ' + str(summary[EpisodeSummaryHistory.TOTAL_REWARD]) +
+                       ('' if self.__distance_field is None else
+                        ' Optimality Gap : ' + str(summary[self.OPTIMALITY_GAP])))
         self.__episode += 1
+        self.__start_coords = None
         pass
 
+    #
+    # The start cell & optimality gap of the current episode, None if there is no distance field.
+    #
+    def __optimality_summary(self) -> dict:
+        if self.__distance_field is None:
+            return None
+        if self.__start_coords is None:
+            return {self.START_CELL: -1, self.OPTIMALITY_GAP: np.nan}
+        gap = self.__distance_field.optimality_gap(self.__start_coords, self.__episode_summaries.current_length())
+        return {self.START_CELL: self.__distance_field.cell(self.__start_coords),
+                self.OPTIMALITY_GAP: np.nan if gap is None else float(gap)}
+
+    #
+    # The summaries of all completed episodes.
+    #
+    def episode_summaries(self) -> EpisodeSummaryHistory:
+        return self.__episode_summaries
+
     #
     # Environment call back to ask the agent to chose an action
     #
@@ -85,6 +125,9 @@ class GridWorldAgent(Agent):
                                          reward_for_play,
                                          episode_complete)
 
+        if self.__episode_summaries.current_length() == 0:
+            self.__start_coords = state.state()
+        self.__episode_summaries.step(state.state_as_string(), next_state.state_as_string(), reward_for_play)
         return
 
     #
@@ -3,13 +3,16 @@ from pathlib import Path
 
 import keras
 import numpy as np
-from keras.callbacks import LearningRateScheduler
 from keras.layers import Dense, Activation
 from keras.models import Sequential
 
 from examples.gridworld.exceptions.CannotCloneWeightsOfDifferentModelException import \
     CannotCloneWeightsOfDifferentModelException
+from reflrn.DTypePolicy import DTypePolicy
 from reflrn.Interface.Model import Model
+from reflrn.KerasTrainStep import KerasTrainStep
+from reflrn.NumpyDenseInference import NumpyDenseInference
+from reflrn.WeightSync import WeightSync
 
 
 class GridWorldQValNNModel(Model):
@@ -41,12 +44,22 @@ class GridWorldQValNNModel(Model):
         self.__num_epoch = num_epoch
         self.__model_compiled = False
         self.__epochs = 10
+        self.__train_step = KerasTrainStep(batch_size=self.__batch_size, passes=self.__epochs)
 
         self.__lr_0 = lr_0
         self.__lr_min = lr_min
         self.__lr = lr_0
         self.__lr_epoch = 1
 
+        #
+        # Predict in numpy, re-exported from the Keras model whenever the weights version changes.
+        #
+        self.__weights_version = 0
+        self.__inference = NumpyDenseInference()
+        self.__inference_supported = True
+
+        self.__weight_sync = WeightSync()
+
         return
 
     #
@@ -90,6 +103,11 @@ class GridWorldQValNNModel(Model):
     #
     def predict(self, x) -> [np.float]:
         self.__bootstrap_model()
+        x = DTypePolicy.as_input(x, "predict X")
+        if self.__inference_supported and self.__inference.version() != self.__weights_version:
+            self.__inference_supported = self.__inference.export(self.__model, self.__weights_version)
+        if self.__inference_supported:
+            return self.__inference.predict(x)
         return self.__model.predict_on_batch(x)
 
     #
@@ -97,12 +115,11 @@ class GridWorldQValNNModel(Model):
     #
     def train(self, x, y) -> None:
         self.__bootstrap_model()
-        self.__model.fit(x=x,
-                         y=y,
-                         batch_size=self.__batch_size,
-                         epochs=self.__epochs,
-                         verbose=2,
-                         callbacks=[LearningRateScheduler(self.__lr_step_down_decay)])
+        x = DTypePolicy.as_input(x, "train X")
+        y = DTypePolicy.as_input(y, "train Y")
+        loss = self.__train_step.train(self.__model, x, y, lambda: self.__lr_step_down_decay(None))
+        self.__lg.debug(self.__agent_name + " trained, loss : " + str(loss))
+        self.__weights_version += 1
         self.__inc_lr_epoch()  # count a global fitting call.
         return
 
@@ -151,6 +168,7 @@ class GridWorldQValNNModel(Model):
             raise RuntimeError("Internal Model is value (None) as has not been initialised")
         else:
             self.__model.set_weights(model.get_weights())
+            self.__weights_version += 1
         return
 
     #
@@ -161,6 +179,24 @@ class GridWorldQValNNModel(Model):
             raise RuntimeError("Internal Model is value (None) as has not been initialised")
         return self.__model.get_weights()
 
+    #
+    # Update the weights in place from the backend variables of an identical model, hard copy if tau = 1
+    # else soft (Polyak) update.
+    #
+    def sync_weights(self, model: 'Model', tau: float = 1.0) -> None:
+        if not isinstance(model, type(self)):
+            raise CannotCloneWeightsOfDifferentModelException(str(type(self)) + " <- " + str(type(model)))
+        self.__weight_sync.sync(self.weight_variables(), model.weight_variables(), tau)
+        self.__weights_version += 1
+        return
+
+    #
+    # The backend variables holding the model weights, the model is created if it does not yet exist.
+    #
+    def weight_variables(self) -> list:
+        self.__bootstrap_model()
+        return self.__model.weights
+
     #
     # Save the model using Keras built in save capability.
     #
@@ -193,6 +229,8 @@ class GridWorldQValNNModel(Model):
         finally:
             pass
         self.__model = model
+        self.__weights_version += 1
+        self.__inference_supported = True
         return
 
     @property
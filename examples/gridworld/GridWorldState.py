@@ -1,37 +1,52 @@
+from typing import List
+
 import numpy as np
 
+from reflrn.DTypePolicy import DTypePolicy
 from reflrn.Interface.State import State
+from .CompiledGrid import CompiledGrid
 from .Grid import Grid
 
 
+#
+# The state of a grid world is just where the agent is, the grid map itself never changes. So the state holds
+# the (row, col) and a reference to the shared, immutable, compiled grid rather than a copy of the grid.
+#
+# The string and array forms are created on first use and kept, the array is read only as it is shared by
+# every caller.
+#
+
 class GridWorldState(State):
+    __slots__ = ('__row', '__col', '__grid', '__as_str', '__as_array')
 
     #
-    # Constructor has no arguments as it just sets the game
+    # The state of the given grid, at its current location or at the given coords.
     #
-    def __init__(self, grid: Grid):
-        self.__grid = grid.deep_copy()  # State must be immutable
+    def __init__(self,
+                 grid: Grid,
+                 coords: List[int] = None):
+        if coords is None:
+            coords = grid.curr_coords()
+        self.__row = int(coords[Grid.ROW])
+        self.__col = int(coords[Grid.COL])
+        self.__grid = grid.compiled_grid()
+        self.__as_str = None
+        self.__as_array = None
+        return
 
     #
     # An environment specific representation for Env. State
     #
     def state(self) -> object:
-        return self.__grid.curr_coords()
+        return [self.__row, self.__col]
 
     #
     # An string representation of the environment curr_coords
     #
     def state_as_string(self) -> str:
-        st = ""
-        nst = self.__grid.curr_coords()
-        for cell in np.reshape(nst, len(nst)):
-            if len(st) > 0:
-                st = st + ","
-            if np.isnan(cell):
-                st += "?"
-            else:
-                st += str(int(cell))
-        return st
+        if self.__as_str is None:
+            self.__as_str = str(self.__row) + "," + str(self.__col)
+        return self.__as_str
 
     #
     # Render the board as human readable with q values adjacent if supplied
@@ -42,5 +57,20 @@ class GridWorldState(State):
     #
     # Return the array encoded form of the grid to be used as the X input to a NN.
     #
-    def state_as_array(self):
-        return self.state()  # Grid-world curr_coords is an array of float
+    def state_as_array(self) -> np.ndarray:
+        if self.__as_array is None:
+            self.__as_array = np.asarray([self.__row, self.__col], dtype=DTypePolicy.float_dtype)
+            self.__as_array.setflags(write=False)
+        return self.__as_array
+
+    #
+    # The cell id of the state on the compiled grid.
+    #
+    def cell(self) -> int:
+        return (self.__row * self.__grid.cols) + self.__col
+
+    #
+    # The (shared) compiled grid the state is on.
+    #
+    def grid(self) -> CompiledGrid:
+        return self.__grid
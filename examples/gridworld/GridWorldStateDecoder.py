@@ -0,0 +1,27 @@
+import numpy as np
+
+from .Grid import Grid
+from .GridWorldState import GridWorldState
+
+
+#
+# Rebuild a GridWorldState on the given grid from its array form (GridWorldState.state_as_array(), the
+# [row, col]), for replay memories that only hold the array form of a state (FixedRecordLayout).
+#
+# Used as the state_decoder of the replay memory, where the memory is passed to a spawned process the decoder
+# (and so the grid) must be picklable.
+#
+
+class GridWorldStateDecoder:
+
+    def __init__(self,
+                 grid: Grid):
+        self.__grid = grid
+        return
+
+    #
+    # The GridWorldState for the given array form of the (row, col)
+    #
+    def __call__(self,
+                 state_as_array: np.ndarray) -> GridWorldState:
+        return GridWorldState(self.__grid, np.asarray(state_as_array).astype(np.int64).reshape(2).tolist())
@@ -0,0 +1,31 @@
+import numpy as np
+
+from reflrn.DTypePolicy import DTypePolicy
+from reflrn.Interface.State import State
+from reflrn.Interface.StateEncoder import StateEncoder
+
+
+#
+# Encode a grid world state as its (row, col) coordinates held as int16, decode rebuilds the same X input
+# as GridWorldState.state_as_array().
+#
+
+class GridWorldStateEncoder(StateEncoder):
+
+    def code_dtype(self) -> np.dtype:
+        return np.dtype(np.int16)
+
+    def code_shape(self) -> tuple:
+        return (2,)
+
+    #
+    # The (row, col) code for the given state.
+    #
+    def encode(self, state: State) -> np.ndarray:
+        return np.asarray(state.state(), dtype=np.int16)
+
+    #
+    # The network inputs for the given codes as [n, 2].
+    #
+    def decode_batch(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(codes, dtype=DTypePolicy.float_dtype).reshape(-1, 2)
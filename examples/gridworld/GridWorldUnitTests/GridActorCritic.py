@@ -7,21 +7,29 @@ import numpy as np
 
 from examples.gridworld.Grid import Grid
 from examples.gridworld.SimpleGridOne import SimpleGridOne
-from examples.gridworld.GridWorldQValNNModel import GridWorldQValNNModel
+from reflrn.ActionMask import ActionMask
+from reflrn.DTypePolicy import DTypePolicy
 from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.Interface.Model import Model
 from reflrn.RareEventBiasReplayMemory import RareEventBiasReplayMemory
 
 
 #
 # Actor critic pattern to learn to find goals on a simple  2D grid.
 #
+# The actor and critic are GridWorldQValNNModel (keras) unless other models are given, the keras model is only
+# imported when it is needed so the actor critic can be exercised with stand in models where keras is not
+# installed.
+#
 
 class GridActorCritic:
     def __init__(self,
                  grid: Grid,
                  lg,
                  rows: int,
-                 cols: int):
+                 cols: int,
+                 actor_model: Model = None,
+                 critic_model: Model = None):
 
         self.env_grid = grid
         self.lg = lg
@@ -40,6 +48,7 @@ class GridActorCritic:
         self.epsilon = 0.8  # exploration factor.
         self.epsilon_decay = .9995
         self.gamma = .8  # Discount Factor Applied to reward
+        self.tau = 1.0  # Actor update from critic, 1.0 => hard copy else Polyak (soft) update
 
         self.steps_to_goal = 0
         self.train_on_new_episode = False
@@ -55,29 +64,27 @@ class GridActorCritic:
         #
         self.replay_memory = RareEventBiasReplayMemory(self.lg, replay_mem_size=2000)
 
-        self.actor_model = GridWorldQValNNModel(model_name="Actor",
-                                                input_dimension=self.input_dim,
-                                                num_actions=self.num_actions,
-                                                num_grid_cells=(self.num_rows * self.num_cols),
-                                                lg=self.lg,
-                                                batch_size=self.batch_size,
-                                                num_epoch=3,
-                                                lr_0=0.005,
-                                                lr_min=0.001
-                                                )
-
-        self.critic_model = GridWorldQValNNModel(model_name="Critic",
-                                                 input_dimension=self.input_dim,
-                                                 num_actions=self.num_actions,
-                                                 num_grid_cells=(self.num_rows * self.num_cols),
-                                                 lg=self.lg,
-                                                 batch_size=self.batch_size,
-                                                 num_epoch=3,
-                                                 lr_0=0.005,
-                                                 lr_min=0.001
-                                                 )
+        self.actor_model = actor_model if actor_model is not None else self.__qval_model("Actor")
+        self.critic_model = critic_model if critic_model is not None else self.__qval_model("Critic")
         return
 
+    #
+    # The default (keras) model for the actor and critic.
+    #
+    def __qval_model(self,
+                     model_name: str) -> Model:
+        from examples.gridworld.GridWorldQValNNModel import GridWorldQValNNModel
+        return GridWorldQValNNModel(model_name=model_name,
+                                    input_dimension=self.input_dim,
+                                    num_actions=self.num_actions,
+                                    num_grid_cells=(self.num_rows * self.num_cols),
+                                    lg=self.lg,
+                                    batch_size=self.batch_size,
+                                    num_epoch=3,
+                                    lr_0=0.005,
+                                    lr_min=0.001
+                                    )
+
     #
     # Return the learning rate based on number of learning's to date
     #
@@ -99,7 +106,7 @@ class GridActorCritic:
     # after every n times the critic is trained on a replay memory batch.
     #
     def _update_actor_from_critic(self):
-        self.actor_model.clone_weights(self.critic_model)
+        self.actor_model.sync_weights(self.critic_model, self.tau)
         self.lg.debug("Update Actor From Critic")
         return
 
@@ -158,32 +165,35 @@ class GridActorCritic:
         return lst_state
 
     #
-    # What is the optimal QVal prediction for next curr_coords S'. Return zero if next curr_coords
-    # is the end of the episode.
+    # Actor predictions for a batch of (int) grid coords [n, 2] as one predict call, if actor is not able to
+    # predict, predict random. The override predictor is given each coords as a list of int, as the env gives.
     #
-    def _next_state_qval_prediction(self,
-                                    new_state: List[int],
-                                    last_state: List[int]) -> float:
-        qvp = 0
-        if not self.env_grid.episode_complete(new_state):
-            qvn = self._actor_prediction(curr_state=new_state)
-            allowable_actions = self.allowed_actions_no_return(state=new_state, last_state=last_state)
-            qvp = self.gamma * np.max(qvn[allowable_actions])  # Discounted max return from next curr_coords
-        return np.float(qvp)
+    def _actor_batch_prediction(self,
+                                coords: np.ndarray) -> np.ndarray:
+        if self.aux_actor_predictor is not None:
+            return np.stack([self.aux_actor_predictor(st) for st in coords.tolist()])
+        return self.actor_model.predict(coords.astype(DTypePolicy.float_dtype))
 
     #
-    # What is the qvalue (optimal) prediction given current curr_coords (state S)
+    # Boolean mask [n, actions] of the allowable actions from the given cells minus the action that would return
+    # the agent to the given last cells. Where the only allowable action is to return it is kept.
     #
-    def _curr_state_qval_prediction(self, curr_state: List[int]) -> List[np.float]:
-        qvs = np.zeros(self.num_actions)
-        if not self.env_grid.episode_complete(curr_state):
-            qvs = self._actor_prediction(curr_state)
-        return qvs
+    def _no_return_mask(self,
+                        cells: np.ndarray,
+                        last_cells: np.ndarray) -> np.ndarray:
+        cg = self.env_grid.compiled_grid()
+        legal = cg.legal[cells]
+        no_return = legal & (cg.next_cell[cells] != last_cells[:, None])
+        return np.where(np.any(no_return, axis=1)[:, None], no_return, legal)
 
     #
     # Get a random set of samples from the given QValues to select_action as a training
     # batch for the model.
     #
+    # The current and next states of all samples are predicted by the actor in a single batch. The qvalue
+    # of the next curr_coords S' is the discounted max over the actions allowed from S' other than the return
+    # to S, zero if S' is the end of the episode. The qvalues of S are zero if S is the end of the episode.
+    #
     def _get_sample_batch(self):
 
         try:
@@ -191,23 +201,27 @@ class GridActorCritic:
         except RareEventBiasReplayMemory.SampleMemoryTooSmall:
             return None, None
 
-        x = np.zeros((self.batch_size, self.input_dim))
-        y = np.zeros((self.batch_size, self.num_actions))
-        i = 0
-        for sample in samples:
-            cur_state, new_state, action, reward, done = sample
-            lr = self.learning_rate()
-            qvp = self._next_state_qval_prediction(new_state, cur_state)
-            qvs = self._curr_state_qval_prediction(cur_state)
-
-            qv = qvs[action]
-            qv = (qv * (1 - lr)) + (lr * (reward + qvp))  # updated expectation of current curr_coords/action
-            qvs[action] = qv
-
-            x[i] = cur_state
-            y[i] = qvs
-            i += 1
-
+        cg = self.env_grid.compiled_grid()
+        cur_state, new_state, action, reward, done = (list(c) for c in zip(*samples))
+        n = len(samples)
+        coords = np.asarray(cur_state, dtype=np.int64).reshape((n, self.input_dim))
+        new_coords = np.asarray(new_state, dtype=np.int64).reshape((n, self.input_dim))
+        x = coords.astype(DTypePolicy.float_dtype)
+        cells = (coords * [cg.cols, 1]).sum(axis=1)
+        new_cells = (new_coords * [cg.cols, 1]).sum(axis=1)
+        action = np.asarray(action, dtype=np.int64)
+        reward = np.asarray(reward, dtype=np.float64)
+
+        qv = self._actor_batch_prediction(np.concatenate([coords, new_coords]))
+        qvs = np.where(cg.terminal[cells][:, None], 0.0, qv[:n])
+        qvn = ActionMask.max_legal(qv[n:], self._no_return_mask(new_cells, cells))
+        qvp = np.where(np.isfinite(qvn) & ~cg.terminal[new_cells], self.gamma * qvn, 0.0)  # Discounted max return
+
+        lr = self.learning_rate()
+        rows = np.arange(n)
+        qvs[rows, action] = (qvs[rows, action] * (1 - lr)) + (lr * (reward + qvp))  # updated expectation
+
+        y = qvs.astype(DTypePolicy.float_dtype)
         return x, y
 
     #
@@ -286,27 +300,32 @@ class GridActorCritic:
         return actn
 
     #
-    # Return the Q Value Grid as predicted by the current state of the actor.
+    # The Q Values of every cell [rows, cols, actions] as predicted by the current state of the critic, in a
+    # single predict call.
+    #
+    def critic_qvalues(self) -> np.ndarray:
+        rw, cl = np.divmod(np.arange(self.num_rows * self.num_cols), self.num_cols)
+        st = np.stack([rw, cl], axis=1).astype(DTypePolicy.float_dtype)
+        return np.reshape(self.critic_model.predict(st), (self.num_rows, self.num_cols, self.num_actions))
+
+    #
+    # Return the Q Value Grid as predicted by the current state of the critic.
+    #
+    # average : the value of each cell is the mean Q Value of the allowable moves into it from adjacent cells,
+    # else the value of each cell is the max Q Value of the cell (zero where no moves are allowable).
     #
     def qvalue_grid(self,
-                    average: bool = True) -> List[np.float]:
-        qgrid = np.zeros((self.num_rows, self.num_cols))
-        for rw in range(0, self.num_rows):
-            for cl in range(0, self.num_cols):
-                st = np.array([rw, cl]).reshape((1, self.input_dim))
-                q_vals = self.critic_model.predict(st)[0]
-                for actn in self.allowed_actions_no_return(state=st[0]):
-                    if average:
-                        r, c = SimpleGridOne.coords_after_action(rw, cl, actn)
-                        if r >= 0 and c >= 0 and r < self.num_rows and c < self.num_cols:
-                            if qgrid[r][c] == np.float(0):
-                                qgrid[r][c] = q_vals[actn]
-                            else:
-                                qgrid[r][c] += q_vals[actn]
-                                qgrid[r][c] /= np.float(2)
-                    else:
-                        qgrid[rw][cl] = np.max(q_vals)
-        return qgrid
+                    average: bool = True) -> np.ndarray:
+        cg = self.env_grid.compiled_grid()
+        q_vals = self.critic_qvalues().reshape((cg.num_cells, self.num_actions))
+        if average:
+            into = cg.next_cell[cg.legal]
+            total = np.bincount(into, weights=q_vals[cg.legal], minlength=cg.num_cells)
+            count = np.bincount(into, minlength=cg.num_cells)
+            qgrid = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+        else:
+            qgrid = np.where(np.any(cg.legal, axis=1), np.max(q_vals, axis=1), 0.0)
+        return qgrid.reshape((self.num_rows, self.num_cols))
 
     #
     # Track change of episode.
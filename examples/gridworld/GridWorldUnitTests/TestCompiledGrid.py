@@ -0,0 +1,94 @@
+import unittest
+
+import numpy as np
+
+from examples.gridworld.CompiledGrid import CompiledGrid
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+
+
+class TestCompiledGrid(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+    moves = {SimpleGridOne.NORTH: (-1, 0), SimpleGridOne.SOUTH: (1, 0),
+             SimpleGridOne.EAST: (0, 1), SimpleGridOne.WEST: (0, -1)}
+
+    def grid(self):
+        grid_map = [
+            [self.step, self.blck, self.step],
+            [self.step, self.step, self.goal],
+            [self.fire, self.step, self.step]
+        ]
+        return CompiledGrid(grid_map, self.moves, SimpleGridOne.FIN, SimpleGridOne.BLCK)
+
+    #
+    # Tables agree with moving cell by cell on the grid.
+    #
+    def test_tables(self):
+        cg = self.grid()
+        self.assertEqual((3, 3), cg.shape())
+        self.assertEqual(9, cg.num_cells)
+        self.assertEqual([False, True, False, False, False, False, False, False, False], cg.blocked.tolist())
+        self.assertEqual([5], np.flatnonzero(cg.terminal).tolist())
+        self.assertEqual(self.fire, cg.reward[cg.cell((2, 0))])
+        self.assertEqual((1, 2), cg.coords(5))
+
+        for cell in range(0, cg.num_cells):
+            rw, cl = cg.coords(cell)
+            for actn, (drw, dcl) in self.moves.items():
+                nrw, ncl = rw + drw, cl + dcl
+                legal = (not cg.terminal[cell] and 0 <= nrw < 3 and 0 <= ncl < 3
+                         and not cg.blocked[cg.cell((nrw, ncl))])
+                self.assertEqual(legal, cg.legal[cell, actn])
+                self.assertEqual(cg.cell((nrw, ncl)) if legal else cell, cg.next_cell[cell, actn])
+
+        next_cell, legal, reward, terminal = cg.step_tables()
+        self.assertEqual(cg.next_cell.tolist(), next_cell)
+        self.assertEqual(cg.legal.tolist(), legal)
+        self.assertEqual(cg.reward.tolist(), reward)
+        self.assertEqual(cg.terminal.tolist(), terminal)
+        return
+
+    #
+    # Tables are shared so must be read only.
+    #
+    def test_read_only(self):
+        cg = self.grid()
+        with self.assertRaises(ValueError):
+            cg.next_cell[0, 0] = 1
+        with self.assertRaises(ValueError):
+            cg.legal[0, 0] = True
+        self.assertRaises(ValueError, CompiledGrid, [1.0, 2.0], self.moves, 1.0, 2.0)
+        return
+
+    #
+    # Stepping the compiled SimpleGridOne gives the same walk as the coordinate arithmetic.
+    #
+    def test_simple_grid_walk(self):
+        grid_map = [
+            [self.step, self.blck, self.step],
+            [self.step, self.step, self.goal],
+            [self.fire, self.step, self.step]
+        ]
+        sg = SimpleGridOne(0, grid_map, [0, 0])
+        walk = [(SimpleGridOne.SOUTH, [1, 0], self.step),
+                (SimpleGridOne.SOUTH, [2, 0], self.fire),
+                (SimpleGridOne.EAST, [2, 1], self.step),
+                (SimpleGridOne.NORTH, [1, 1], self.step),
+                (SimpleGridOne.EAST, [1, 2], self.goal)]
+        for actn, coords, reward in walk:
+            self.assertEqual(reward, sg.execute_action(actn))
+            self.assertEqual(coords, sg.curr_coords())
+        self.assertTrue(sg.episode_complete())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestCompiledGrid()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
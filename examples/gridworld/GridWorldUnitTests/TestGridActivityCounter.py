@@ -0,0 +1,116 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from examples.gridworld.GridActivityCounter import GridActivityCounter
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+
+
+class TestGridActivityCounter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    #
+    # Counts match a plain count of random steps, across buffer flushes.
+    #
+    def test_counts(self):
+        rows, cols, num_actions = 3, 5, 4
+        gac = GridActivityCounter(rows, cols, num_actions)
+        cells = np.random.randint(0, rows * cols, 10000)
+        actions = np.random.randint(0, num_actions, 10000)
+        next_cells = np.random.randint(0, rows * cols, 10000)
+        for c, a, n in zip(cells.tolist(), actions.tolist(), next_cells.tolist()):
+            gac.record(c, a, n)
+
+        self.assertEqual(10000, gac.steps())
+        expected = np.bincount(next_cells, minlength=rows * cols).reshape((rows, cols))
+        self.assertTrue(np.array_equal(expected, gac.cell_counts()))
+        self.assertEqual(np.int64, gac.cell_counts().dtype)
+        expected = np.bincount((cells * num_actions) + actions, minlength=rows * cols * num_actions)
+        self.assertTrue(np.array_equal(expected.reshape((rows, cols, num_actions)), gac.cell_action_counts()))
+
+        dist = gac.visit_distribution()
+        self.assertAlmostEqual(1.0, float(np.sum(dist)))
+        self.assertIs(dist, gac.visit_distribution())
+        gac.record(0, 0, 0)
+        self.assertIsNot(dist, gac.visit_distribution())
+
+        bonus = gac.exploration_bonus(np.asarray([1, 2]), beta=2.0)
+        self.assertEqual((2, num_actions), bonus.shape)
+        n = gac.cell_action_counts().reshape((rows * cols, num_actions))[1, 3]
+        self.assertAlmostEqual(2.0 / np.sqrt(1.0 + n), bonus[0, 3])
+        self.assertEqual(1.0, GridActivityCounter(1, 2, 4).exploration_bonus(1)[0])
+        return
+
+    #
+    # Recent counts halve every decay window, the totals do not.
+    #
+    def test_decay(self):
+        gac = GridActivityCounter(1, 2, 2, decay_every=4)
+        for _ in range(0, 7):
+            gac.record(0, 1, 1)
+        self.assertEqual([[0, 7]], gac.cell_counts().tolist())
+        self.assertEqual([[0, 5]], gac.cell_counts(recent=True).tolist())  # (4 >> 1) + 3
+        self.assertEqual(5, gac.cell_action_counts(recent=True)[0, 0, 1])
+        self.assertAlmostEqual(1.0 / np.sqrt(6.0), gac.exploration_bonus(0)[1])
+        self.assertRaises(ValueError, GridActivityCounter, 1, 2, 2, 0)
+        return
+
+    #
+    # Deltas sum to the snapshot.
+    #
+    def test_export(self):
+        gac = GridActivityCounter(4, 4, 4)
+        with tempfile.TemporaryDirectory() as tmp:
+            total_cells = np.zeros((4, 4), dtype=np.int64)
+            total_steps = 0
+            for i in range(0, 3):
+                for _ in range(0, 50):
+                    gac.record(random.randint(0, 15), random.randint(0, 3), random.randint(0, 15))
+                file_name = os.path.join(tmp, "delta" + str(i))
+                gac.save_delta(file_name)
+                cell_counts, cell_action_counts, steps = GridActivityCounter.load_counts(file_name)
+                self.assertEqual(50, steps)
+                self.assertEqual(50, np.sum(cell_action_counts))
+                total_cells += cell_counts
+                total_steps += steps
+
+            file_name = os.path.join(tmp, "snap")
+            gac.save_snapshot(file_name)
+            cell_counts, cell_action_counts, steps = GridActivityCounter.load_counts(file_name)
+            self.assertEqual(150, steps)
+            self.assertEqual(total_steps, steps)
+            self.assertTrue(np.array_equal(total_cells, cell_counts))
+            self.assertTrue(np.array_equal(gac.cell_action_counts(), cell_action_counts))
+        return
+
+    #
+    # SimpleGridOne counts the moves made on it.
+    #
+    def test_simple_grid(self):
+        step = SimpleGridOne.STEP
+        sg = SimpleGridOne(0, [[step, step], [step, SimpleGridOne.GOAL]], [0, 0], SimpleGridOne.RESPAWN_DEFAULT)
+        self.assertEqual([[0.0, 0.0], [0.0, 0.0]], sg.activity_matrix().tolist())
+        sg.execute_action(SimpleGridOne.EAST)
+        sg.execute_action(SimpleGridOne.WEST)
+        sg.execute_action(SimpleGridOne.EAST)
+        self.assertEqual([[1, 2], [0, 0]], sg.activity().cell_counts().tolist())
+        self.assertEqual(2, sg.activity().cell_action_counts()[0, 0, SimpleGridOne.EAST])
+        self.assertEqual([[1 / 3, 2 / 3], [0.0, 0.0]], sg.activity_matrix().tolist())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridActivityCounter()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,168 @@
+import logging
+import random
+import unittest
+from typing import List
+
+import numpy as np
+
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from .GridActorCritic import GridActorCritic
+
+
+#
+# Stand in for the actor & critic models, a fixed random Q Value per grid cell & action so it needs no keras.
+#
+class StubQValModel:
+    def __init__(self,
+                 rows: int,
+                 cols: int,
+                 num_actions: int):
+        self.cols = cols
+        self.q = np.random.randn(rows * cols, num_actions)
+        self.predicts = 0
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        self.predicts += 1
+        return self.q[((x[:, 0] * self.cols) + x[:, 1]).astype(np.int64)]
+
+    def qvalues(self, coords: List[int]) -> np.ndarray:
+        return self.q[(coords[0] * self.cols) + coords[1]]
+
+
+#
+# The batched actor critic sample targets must match the targets worked out one sample at a time.
+#
+
+class TestGridActorCriticBatch(unittest.TestCase):
+    __lg = None
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestGridActorCriticBatch",
+                                      "TestGridActorCriticBatch.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    #
+    # (0, 0) is a dead end, the only move out of it is back to where the agent came from.
+    #
+    def setUp(self):
+        grid_map = [
+            [self.step, self.blck, self.goal, self.step],
+            [self.step, self.step, self.step, self.step],
+            [self.fire, self.step, self.blck, self.step]
+        ]
+        self.sg = SimpleGridOne(0, grid_map, [1, 1])
+        self.actor = StubQValModel(3, 4, 4)
+        self.critic = StubQValModel(3, 4, 4)
+        self.gac = GridActorCritic(self.sg, self.__lg, 3, 4, actor_model=self.actor, critic_model=self.critic)
+
+    #
+    # Remember random moves from every open cell, including the moves into the dead end.
+    #
+    def __remember_random_moves(self, num_moves: int) -> None:
+        rows, cols = self.sg.shape()
+        open_cells = [[rw, cl] for rw in range(0, rows) for cl in range(0, cols)
+                      if len(self.sg.allowable_actions([rw, cl])) > 0 and not self.sg.episode_complete([rw, cl])]
+        for i in range(0, num_moves):
+            cur_state = open_cells[i % len(open_cells)]
+            action = random.choice(self.sg.allowable_actions(cur_state))
+            new_state = self.sg.coords_after_action(cur_state[0], cur_state[1], action)
+            self.gac.remember(cur_state, action, self.sg.reward(new_state[0], new_state[1]), new_state,
+                              self.sg.episode_complete(new_state))
+        for _ in range(0, num_moves // 10):
+            self.gac.remember([1, 0], SimpleGridOne.NORTH, self.sg.reward(0, 0), [0, 0], False)
+        return
+
+    #
+    # The sample batch and the samples it was made from.
+    #
+    def __sample_batch(self):
+        sampled = list()
+        get_random_memories = self.gac.replay_memory.get_random_memories
+
+        def record_samples(sample_size):
+            samples = get_random_memories(sample_size)
+            sampled.extend(samples)
+            return samples
+
+        self.gac.replay_memory.get_random_memories = record_samples
+        x, y = self.gac._get_sample_batch()
+        return x, y, sampled
+
+    #
+    # The targets one sample at a time, as taken before predictions were batched. Where the only move from S'
+    # is back to S that move is kept.
+    #
+    def __reference_batch(self, samples, predictor):
+        x = list()
+        y = list()
+        lr = self.gac.learning_rate()
+        for cur_state, new_state, action, reward, done in samples:
+            qvs = np.zeros(self.gac.num_actions)
+            if not self.sg.episode_complete(cur_state):
+                qvs = np.array(predictor(cur_state), dtype=np.float64)
+            qvp = 0.0
+            if not self.sg.episode_complete(new_state):
+                allowable_actions = self.gac.allowed_actions_no_return(state=new_state, last_state=cur_state)
+                if len(allowable_actions) == 0:
+                    allowable_actions = self.sg.allowable_actions(new_state)
+                qvp = self.gac.gamma * np.max(predictor(new_state)[allowable_actions])
+            qvs[action] = (qvs[action] * (1 - lr)) + (lr * (reward + qvp))
+            x.append(cur_state)
+            y.append(qvs)
+        return np.array(x, dtype=np.float64), np.array(y)
+
+    #
+    # All current and next states of the batch are predicted by the actor in one call.
+    #
+    def test_batch_matches_per_sample_model(self):
+        self.__remember_random_moves(200)
+        x, y, samples = self.__sample_batch()
+        self.assertEqual(1, self.actor.predicts)
+        self.assertEqual(0, self.critic.predicts)
+        self.assertTrue(any(sample[1] == [0, 0] for sample in samples))
+        x_ref, y_ref = self.__reference_batch(samples, self.actor.qvalues)
+        self.assertTrue(np.array_equal(x_ref, x))
+        self.assertTrue(np.allclose(y_ref, y, atol=1e-5))
+        return
+
+    #
+    # The override actor predictor is given the int coords of each state, as it would be given them by the env.
+    #
+    def test_batch_matches_per_sample_aux_predictor(self):
+        self.__remember_random_moves(200)
+        given = list()
+
+        def predictor(coords):
+            given.append(coords)
+            return self.actor.qvalues(coords)
+
+        self.gac.set_actor_predictor_function(predictor)
+        x, y, samples = self.__sample_batch()
+        self.assertEqual(0, self.actor.predicts)
+        self.assertEqual(2 * len(samples), len(given))
+        for coords in given:
+            self.assertIsInstance(coords, list)
+            self.assertTrue(all(type(c) is int for c in coords))
+        x_ref, y_ref = self.__reference_batch(samples, self.actor.qvalues)
+        self.assertTrue(np.array_equal(x_ref, x))
+        self.assertTrue(np.allclose(y_ref, y, atol=1e-5))
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridActorCriticBatch()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
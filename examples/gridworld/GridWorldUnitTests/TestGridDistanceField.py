@@ -0,0 +1,155 @@
+import random
+import time
+import unittest
+from collections import deque
+
+import numpy as np
+
+from examples.gridworld.GridDistanceField import GridDistanceField
+from examples.gridworld.PotentialShapedGrid import PotentialShapedGrid
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from examples.gridworld.SparseGridMap import SparseGridMap
+
+
+class TestGridDistanceField(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    #
+    # Distances by a plain breadth first search from each cell, moving cell by cell on the grid.
+    #
+    @classmethod
+    def reference_distances(cls, sg: SimpleGridOne) -> np.ndarray:
+        rows, cols = sg.shape()
+        dist = np.full((rows, cols), GridDistanceField.UNREACHABLE)
+        for rw in range(0, rows):
+            for cl in range(0, cols):
+                if sg.reward(rw, cl) == cls.blck:
+                    continue
+                seen = {(rw, cl)}
+                todo = deque([((rw, cl), 0)])
+                while len(todo) > 0:
+                    (r, c), d = todo.popleft()
+                    if sg.episode_complete([r, c]):
+                        dist[rw, cl] = d
+                        break
+                    for actn in sg.allowable_actions([r, c]):
+                        nxt = tuple(sg.coords_after_action(r, c, actn))
+                        if nxt not in seen:
+                            seen.add(nxt)
+                            todo.append((nxt, d + 1))
+        return dist
+
+    #
+    # Distances match the reference, with two goals, blocked cells and a boxed in corner.
+    #
+    def test_distances(self):
+        grid_map = [
+            [self.step, self.fire, self.goal, self.step, self.step],
+            [self.step, self.blck, self.blck, self.fire, self.step],
+            [self.step, self.blck, self.step, self.blck, self.step],
+            [self.step, self.step, self.blck, self.step, self.goal],
+            [self.step, self.step, self.blck, self.step, self.step]
+        ]
+        sg = SimpleGridOne(0, grid_map, [4, 0])
+        gdf = GridDistanceField(sg.compiled_grid())
+        dist = gdf.distance_grid()
+        self.assertTrue(np.array_equal(self.reference_distances(sg), dist))
+        self.assertEqual(GridDistanceField.UNREACHABLE, dist[2, 2])  # boxed in
+        self.assertEqual(GridDistanceField.UNREACHABLE, dist[1, 1])  # blocked
+        self.assertEqual(0, gdf.optimal_steps([3, 4]))
+        self.assertEqual(6, gdf.optimal_steps([4, 0]))
+        self.assertEqual([6, 1], gdf.optimal_steps([[4, 0], [0, 1]]).tolist())
+        self.assertEqual(int(np.max(dist)), gdf.max_distance())
+
+        self.assertEqual(3, gdf.optimality_gap([4, 0], 9))
+        self.assertIsNone(gdf.optimality_gap([2, 2], 9))
+        gap = gdf.optimality_gap([[4, 0], [2, 2]], [6, 9])
+        self.assertEqual(0.0, gap[0])
+        self.assertTrue(np.isnan(gap[1]))
+
+        for _ in range(0, 5):
+            mz = SparseGridMap.maze(15, 21, seed=random.randint(0, 1000), num_goals=3, loop_fraction=0.1)
+            sg = mz.simple_grid(1)
+            self.assertTrue(np.array_equal(self.reference_distances(sg),
+                                           GridDistanceField(sg.compiled_grid()).distance_grid()))
+        return
+
+    #
+    # Following the optimal actions reaches a goal in exactly the optimal number of steps.
+    #
+    def test_optimal_actions(self):
+        mz = SparseGridMap.random_obstacles(30, 30, seed=3, block_fraction=0.25, num_goals=2)
+        sg = mz.simple_grid(1)
+        cg = sg.compiled_grid()
+        gdf = GridDistanceField(cg)
+        optimal = gdf.optimal_actions()
+        for cell in np.flatnonzero(gdf.distances() > 0)[:50].tolist():
+            sg.reset(list(cg.coords(cell)))
+            steps = 0
+            while not sg.episode_complete():
+                sg.execute_action(int(np.flatnonzero(optimal[cg.cell(sg.curr_coords())])[0]))
+                steps += 1
+            self.assertEqual(gdf.distances()[cell], steps)
+        return
+
+    #
+    # Undiscounted, the shaping adds up to the potential difference from start to goal whatever path is taken.
+    #
+    def test_shaping(self):
+        grid_map = [
+            [self.step, self.step, self.step],
+            [self.step, self.blck, self.step],
+            [self.step, self.step, self.goal]
+        ]
+        sg = SimpleGridOne(0, grid_map, [0, 0], SimpleGridOne.RESPAWN_DEFAULT)
+        psg = PotentialShapedGrid(sg, gamma=1.0, scale=0.5)
+        self.assertEqual(4, psg.distance_field().optimal_steps([0, 0]))
+        for path in ([SimpleGridOne.EAST, SimpleGridOne.EAST, SimpleGridOne.SOUTH, SimpleGridOne.SOUTH],
+                     [SimpleGridOne.SOUTH, SimpleGridOne.NORTH, SimpleGridOne.SOUTH, SimpleGridOne.SOUTH,
+                      SimpleGridOne.EAST, SimpleGridOne.EAST]):
+            psg.reset([0, 0])
+            shaped = 0.0
+            unshaped = 0.0
+            for actn in path:
+                shaped += psg.execute_action(actn)
+                unshaped += sg.reward(*sg.curr_coords())
+            self.assertTrue(psg.episode_complete())
+            self.assertAlmostEqual(unshaped + (0.5 * 4), shaped)
+
+        psg.reset([0, 0])
+        self.assertAlmostEqual(self.step + 0.5, psg.execute_action(SimpleGridOne.EAST))  # closer
+        self.assertAlmostEqual(self.step - 0.5, psg.execute_action(SimpleGridOne.WEST))  # further away
+        cp = psg.deep_copy()
+        self.assertEqual(psg.curr_coords(), cp.curr_coords())
+        self.assertIs(psg.distance_field(), cp.distance_field())
+        return
+
+    #
+    # The search is quick on a large maze.
+    #
+    def test_large(self):
+        sg = SparseGridMap.maze(1001, 1001, seed=2, num_goals=5, loop_fraction=0.02).simple_grid(1)
+        cg = sg.compiled_grid()
+        st = time.time()
+        gdf = GridDistanceField(cg)
+        self.assertLess(time.time() - st, 10.0)
+        self.assertTrue(np.all((gdf.distances() >= 0) == ~cg.blocked))  # maze is connected
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridDistanceField()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,121 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from examples.gridworld.GridMapLoader import GridMapLoader
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from examples.gridworld.SparseGridMap import SparseGridMap
+
+
+class TestGridMapLoader(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    test_map = "; GridFactory test grid one\n" \
+               "\n" \
+               ".FG..\n" \
+               ".##F.\n" \
+               ".###.\n" \
+               "S....\n"
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def write(self, directory: str, name: str, text: str) -> str:
+        file_name = os.path.join(directory, name)
+        with open(file_name, 'w') as f:
+            f.write(text)
+        return file_name
+
+    #
+    # Text form parses to the same map as GridFactory.test_grid_one and back again.
+    #
+    def test_text(self):
+        sgm, start = GridMapLoader.parse_text(self.test_map)
+        expected = [
+            [self.step, self.fire, self.goal, self.step, self.step],
+            [self.step, self.blck, self.blck, self.fire, self.step],
+            [self.step, self.blck, self.blck, self.blck, self.step],
+            [self.step, self.step, self.step, self.step, self.step]
+        ]
+        self.assertEqual(expected, sgm.dense().tolist())
+        self.assertEqual([3, 0], start)
+        self.assertEqual(".FG..\n.##F.\n.###.\nS....\n", GridMapLoader.to_text(sgm, start))
+        self.assertIsNone(GridMapLoader.parse_text("..G\n")[1])
+
+        self.assertRaises(GridMapLoader.MapFormatError, GridMapLoader.parse_text, "..\n...\n")
+        self.assertRaises(GridMapLoader.MapFormatError, GridMapLoader.parse_text, "..X\n")
+        self.assertRaises(GridMapLoader.MapFormatError, GridMapLoader.parse_text, "S.S\n")
+        self.assertRaises(GridMapLoader.MapFormatError, GridMapLoader.parse_text, "; only a comment\n")
+        self.assertRaises(GridMapLoader.MapFormatError, GridMapLoader.to_text, sgm, [0, 1])
+        return
+
+    #
+    # Compiled grids are cached by content, whatever the file name or format.
+    #
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            gml = GridMapLoader(cache_dir=os.path.join(tmp, "cache"))
+            f1 = self.write(tmp, "one.txt", self.test_map)
+            f2 = self.write(tmp, "copy_of_one.txt", self.test_map)
+            f3 = self.write(tmp, "changed.txt", self.test_map.replace("S....", "S...G"))
+
+            cg1 = gml.compiled_grid(f1)
+            self.assertEqual((0, 1), (gml.cache_hits(), gml.cache_misses()))
+            cg2 = gml.compiled_grid(f2)
+            self.assertEqual((1, 1), (gml.cache_hits(), gml.cache_misses()))
+            gml.compiled_grid(f3)
+            self.assertEqual((1, 2), (gml.cache_hits(), gml.cache_misses()))
+
+            ref = SimpleGridOne.compile_map(GridMapLoader.parse_text(self.test_map)[0].dense())
+            for cg in (cg1, cg2):
+                self.assertEqual(ref.shape(), cg.shape())
+                for name in ('reward', 'terminal', 'blocked', 'next_cell', 'legal'):
+                    self.assertTrue(np.array_equal(getattr(ref, name), getattr(cg, name)))
+                    self.assertFalse(getattr(cg, name).flags.writeable)
+
+            sgm = SparseGridMap.maze(21, 21, seed=5)
+            fb = os.path.join(tmp, "maze.npz")
+            sgm.save(fb)
+            self.assertTrue(np.array_equal(sgm.dense(), gml.load_map(fb)[0].dense()))
+            gml.compiled_grid(fb)
+            cg = gml.compiled_grid(fb)
+            self.assertEqual((2, 3), (gml.cache_hits(), gml.cache_misses()))
+            self.assertTrue(np.array_equal(SimpleGridOne.compile_map(sgm.dense()).legal, cg.legal))
+        return
+
+    #
+    # A SimpleGridOne from file uses the (cached) compiled grid and the start on the map.
+    #
+    def test_simple_grid(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            gml = GridMapLoader(cache_dir=tmp)
+            f1 = self.write(tmp, "one.map", self.test_map)
+            gml.compiled_grid(f1)
+            sg1 = gml.simple_grid(f1, 3)
+            self.assertEqual(1, gml.cache_hits())
+            self.assertEqual([3, 0], sg1.curr_coords())
+            self.assertEqual([3, 0], sg1.start_coords())
+            for action in (SimpleGridOne.NORTH, SimpleGridOne.NORTH, SimpleGridOne.NORTH, SimpleGridOne.EAST):
+                reward = sg1.execute_action(action)
+            self.assertEqual(self.fire, reward)
+            self.assertIs(sg1.compiled_grid(), sg1.deep_copy().compiled_grid())
+            self.assertEqual(0, GridMapLoader().cache_hits())  # no cache
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridMapLoader()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,104 @@
+import random
+import time
+import unittest
+
+import numpy as np
+
+from examples.gridworld.GridValueIteration import GridValueIteration
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+
+
+class TestGridValueIteration(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+    gamma = 0.8
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def setUp(self):
+        self.grid_map = [
+            [self.step, self.blck, self.step, self.step],
+            [self.step, self.step, self.fire, self.goal],
+            [self.fire, self.step, self.step, self.step]
+        ]
+        self.sg = SimpleGridOne(0, self.grid_map, [0, 0])
+
+    #
+    # Reference value iteration, one cell & action at a time using the SimpleGridOne moves.
+    #
+    def reference_q(self, sg: SimpleGridOne, iterations: int = 500) -> np.ndarray:
+        rows, cols = sg.shape()
+        v = np.zeros((rows, cols))
+        q = np.full((rows, cols, 4), np.nan)
+        for _ in range(0, iterations):
+            for rw in range(0, rows):
+                for cl in range(0, cols):
+                    for actn in sg.allowable_actions([rw, cl]):
+                        nrw, ncl = sg.coords_after_action(rw, cl, actn)
+                        cont = 0.0 if sg.episode_complete([nrw, ncl]) else self.gamma * v[nrw, ncl]
+                        q[rw, cl, actn] = sg.reward(nrw, ncl) + cont
+            v = np.where(np.all(np.isnan(q), axis=2), 0.0, np.nanmax(np.where(np.isnan(q), -np.inf, q), axis=2))
+        return q
+
+    def test_matches_reference(self):
+        gvi = GridValueIteration(self.sg.compiled_grid(), self.gamma).solve()
+        q = gvi.q_grid()
+        ref = self.reference_q(self.sg)
+        self.assertTrue(np.array_equal(np.isnan(ref), np.isnan(q)))
+        self.assertTrue(np.allclose(ref[~np.isnan(ref)], q[~np.isnan(q)]))
+        self.assertEqual(0.0, gvi.v_grid()[1, 3])  # goal
+        self.assertEqual(SimpleGridOne.EAST, gvi.policy_grid()[0, 2])
+        self.assertEqual(-1, gvi.policy_grid()[1, 3])
+        return
+
+    def test_compare(self):
+        gvi = GridValueIteration(self.sg.compiled_grid(), self.gamma)
+        perfect = gvi.compare(gvi.q_grid())
+        self.assertEqual(0.0, perfect.q_max_abs_error)
+        self.assertEqual(1.0, perfect.policy_agreement)
+        self.assertTrue(perfect.passed(max_v_error=1e-9, min_policy_agreement=1.0, max_q_error=1e-9))
+
+        # Learned values as predicted by a network have values for illegal actions too
+        learned = np.nan_to_num(gvi.q_grid(), nan=100.0)
+        learned[0, 2] = [0.0, 0.0, -1.0, 0.0]  # greedy is now not east
+        cmp = gvi.compare(learned)
+        self.assertEqual([[0, 2]], cmp.policy_disagreements.tolist())
+        self.assertFalse(cmp.passed(min_policy_agreement=1.0))
+        self.assertTrue(cmp.passed(min_policy_agreement=0.5))
+        self.assertIn("cells not optimal [1]", cmp.report())
+
+        vcmp = gvi.compare(gvi.v_grid() + 0.1)
+        self.assertFalse(vcmp.compares_q)
+        self.assertAlmostEqual(0.1, vcmp.v_max_abs_error)
+        self.assertRaises(ValueError, gvi.compare, np.zeros((2, 2)))
+        return
+
+    def test_large_grid(self):
+        n = 100
+        grid_map = np.full((n, n), self.step)
+        grid_map[np.random.rand(n, n) < 0.2] = self.blck
+        grid_map[0, 0] = self.step
+        grid_map[n - 1, n - 1] = self.goal
+        sg = SimpleGridOne(1, grid_map.tolist(), [0, 0])
+        st = time.time()
+        gvi = GridValueIteration(sg.compiled_grid(), 0.99).solve()
+        self.assertLess(time.time() - st, 5.0)
+        self.assertTrue(gvi.iterations() > 0)
+        self.assertAlmostEqual(0.0, gvi.v_grid()[n - 1, n - 1])
+        self.assertRaises(ValueError, GridValueIteration, sg.compiled_grid(), 1.0)
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridValueIteration()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,101 @@
+import logging
+import random
+import unittest
+
+import numpy as np
+
+from examples.gridworld.GridDistanceField import GridDistanceField
+from examples.gridworld.GridWorld import GridWorld
+from examples.gridworld.GridWorldAgent import GridWorldAgent
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.EpisodeSummaryHistory import EpisodeSummaryHistory
+from reflrn.Interface.ExplorationStrategy import ExplorationStrategy
+from reflrn.Interface.Policy import Policy
+from reflrn.Interface.State import State
+
+
+#
+# Stand in exploration strategy that always acts at random, it is its own (stand in) policy.
+#
+class RandomExplorationStrategy(ExplorationStrategy):
+
+    def select_action(self, agent_name: str, state: State, possible_actions: [int]) -> int:
+        return random.choice(possible_actions)
+
+    def chose_action(self, agent_name: str, episode_number: int, state: State, possible_actions: [int]) -> int:
+        return self.select_action(agent_name, state, possible_actions)
+
+    def chose_action_policy(self, agent_name: str, episode_number: int, state: State,
+                            possible_actions: [int]) -> Policy:
+        return self
+
+    def update_strategy(self, agent_name: str, state: State, next_state: State, action: int, reward: float,
+                        episode_complete: bool):
+        pass
+
+
+class TestGridWorldAgent(unittest.TestCase):
+    __lg = None
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestGridWorldAgent",
+                                      "TestGridWorldAgent.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def grid(self) -> SimpleGridOne:
+        grid_map = [
+            [self.step, self.step, self.step, self.step],
+            [self.step, self.blck, self.step, self.fire],
+            [self.step, self.step, self.step, self.goal]
+        ]
+        return SimpleGridOne(0, grid_map, respawn_type=SimpleGridOne.RESPAWN_RANDOM)
+
+    #
+    # With a distance field the start cell and the optimality gap of each episode are recorded as it is played,
+    # the gap is the episode length less the fewest steps to a terminal from the start cell.
+    #
+    def test_optimality_gap(self):
+        sg = self.grid()
+        gdf = GridDistanceField(sg.compiled_grid())
+        agent = GridWorldAgent(1, "X", RandomExplorationStrategy(), self.__lg, distance_field=gdf)
+        GridWorld(agent, sg, self.__lg).run(20)
+
+        esh = agent.episode_summaries()
+        self.assertLess(0, esh.num_episodes())
+        start_cells = esh.column(GridWorldAgent.START_CELL)
+        self.assertTrue(np.all(start_cells >= 0))
+        optimal = gdf.distances()[start_cells]
+        gaps = esh.column(GridWorldAgent.OPTIMALITY_GAP)
+        self.assertTrue(np.array_equal(esh.column(EpisodeSummaryHistory.LENGTH) - optimal, gaps))
+        self.assertTrue(np.all(gaps >= 0))
+        return
+
+    #
+    # Without a distance field there are only the standard summary columns.
+    #
+    def test_no_distance_field(self):
+        sg = self.grid()
+        agent = GridWorldAgent(1, "X", RandomExplorationStrategy(), self.__lg)
+        GridWorld(agent, sg, self.__lg).run(5)
+        self.assertEqual(EpisodeSummaryHistory().column_names(), agent.episode_summaries().column_names())
+        self.assertLess(0, agent.episode_summaries().num_episodes())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridWorldAgent()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,127 @@
+import logging
+import unittest
+
+import numpy as np
+
+from examples.gridworld.GridWorldState import GridWorldState
+from examples.gridworld.GridWorldStateDecoder import GridWorldStateDecoder
+from examples.gridworld.GridWorldStateEncoder import GridWorldStateEncoder
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from reflrn.EncodedReplayMemory import EncodedReplayMemory
+from reflrn.EnvironmentLogging import EnvironmentLogging
+
+
+class TestGridWorldState(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    def grid(self) -> SimpleGridOne:
+        grid_map = [
+            [self.step, self.blck, self.step],
+            [self.step, self.step, self.goal]
+        ]
+        return SimpleGridOne(0, grid_map, [1, 0], respawn_type=SimpleGridOne.RESPAWN_DEFAULT)
+
+    #
+    # State is the location at the time it was taken, later moves on the grid do not change it.
+    #
+    def test_state(self):
+        grid = self.grid()
+        st = GridWorldState(grid)
+        grid.execute_action(SimpleGridOne.EAST)
+        self.assertEqual([1, 0], st.state())
+        self.assertEqual("1,0", st.state_as_string())
+        self.assertEqual("1,0", st.state_as_visualisation())
+        self.assertEqual(3, st.cell())
+        self.assertEqual([1, 1], GridWorldState(grid).state())
+        self.assertEqual("0,2", GridWorldState(grid, [0, 2]).state_as_string())
+        return
+
+    #
+    # States share the compiled grid and cache their array form as read only float32.
+    #
+    def test_shared_and_cached(self):
+        grid = self.grid()
+        st1 = GridWorldState(grid)
+        st2 = GridWorldState(grid.deep_copy())
+        self.assertIs(st1.grid(), st2.grid())
+        self.assertIs(grid.compiled_grid(), st1.grid())
+
+        arr = st1.state_as_array()
+        self.assertIs(arr, st1.state_as_array())
+        self.assertEqual(np.float32, arr.dtype)
+        self.assertEqual([1.0, 0.0], arr.tolist())
+        self.assertFalse(arr.flags.writeable)
+        self.assertIs(st1.state_as_string(), st1.state_as_string())
+        self.assertFalse(hasattr(st1, '__dict__'))
+        return
+
+    #
+    # The state rebuilt from its array form is the same location on the same grid.
+    #
+    def test_decoder(self):
+        grid = self.grid()
+        decoder = GridWorldStateDecoder(grid)
+        for coords in ([1, 0], [0, 2], [1, 2]):
+            st = GridWorldState(grid, coords)
+            dst = decoder(np.array(st.state_as_array()))
+            self.assertIsInstance(dst, GridWorldState)
+            self.assertEqual(coords, dst.state())
+            self.assertEqual(st.cell(), dst.cell())
+            self.assertIs(st.grid(), dst.grid())
+        self.assertTrue(grid.episode_complete(decoder(np.array([1.0, 2.0], dtype=np.float32)).state()))
+        return
+
+    #
+    # Every cell encodes to its (row, col) code and the code decodes to the X input of the state, from which the
+    # decoder rebuilds the same state.
+    #
+    def test_encode_decode(self):
+        grid = self.grid()
+        encoder = GridWorldStateEncoder()
+        decoder = GridWorldStateDecoder(grid)
+        states = [GridWorldState(grid, [rw, cl]) for rw in range(0, 2) for cl in range(0, 3)]
+        codes = np.array([encoder.encode(st) for st in states], dtype=encoder.code_dtype())
+        self.assertEqual((len(states),) + encoder.code_shape(), codes.shape)
+        self.assertEqual(len(states), len(np.unique(codes, axis=0)))
+        x = encoder.decode_batch(codes)
+        self.assertEqual((len(states), 2), x.shape)
+        for st, xi in zip(states, x):
+            self.assertTrue(np.array_equal(st.state_as_array(), xi))
+            self.assertEqual(st.state(), decoder(xi).state())
+        return
+
+    #
+    # Grid world states held in an encoded replay memory come back as the same states and X inputs.
+    #
+    def test_encoded_replay_memory(self):
+        grid = self.grid()
+        lg = EnvironmentLogging("TestGridWorldState", "TestGridWorldState.log", logging.DEBUG).get_logger()
+        erm = EncodedReplayMemory(lg, replay_mem_size=10, state_encoder=GridWorldStateEncoder())
+        moves = [[1, 0], [0, 0], [1, 0], [1, 1], [1, 2]]
+        for i in range(0, len(moves) - 1):
+            erm.append_memory(GridWorldState(grid, moves[i]), GridWorldState(grid, moves[i + 1]), i, float(-i),
+                              i == len(moves) - 2)
+        self.assertEqual(4, erm.state_dictionary().len())  # each distinct cell held once, [1, 0] is seen twice
+
+        _, x, nx, actions, rewards, complete, next_states = erm.get_random_batch_with_next_states(10)
+        self.assertEqual(len(moves) - 1, len(actions))
+        for i, a in enumerate(actions):
+            self.assertEqual(moves[a], x[i].astype(np.int64).tolist())
+            self.assertEqual(moves[a + 1], nx[i].astype(np.int64).tolist())
+            self.assertEqual(moves[a + 1], next_states[i].state())
+            self.assertEqual(float(-a), rewards[i])
+            self.assertEqual(a == len(moves) - 2, complete[i])
+        self.assertEqual(2, erm.get_last_memory(GridWorldState(grid, [1, 0]))[EncodedReplayMemory.mem_action])
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestGridWorldState()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
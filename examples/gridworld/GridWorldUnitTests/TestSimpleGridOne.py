@@ -215,6 +215,30 @@ class TestSimpleGridOne(unittest.TestCase):
 
         return
 
+    #
+    # Test the pre-computed legal action masks agree with the allowable actions and the disallowed actions.
+    #
+    def test_legal_action_mask(self):
+        grid = [
+            [self.step, self.blck, self.step],
+            [self.step, self.step, self.goal],
+            [self.fire, self.step, self.step]
+        ]
+        sg6 = SimpleGridOne(6,
+                            grid,
+                            [0, 0])
+        for rw in range(0, 3):
+            for cl in range(0, 3):
+                aac = sg6.allowable_actions([rw, cl])
+                msk = sg6.legal_action_mask([rw, cl])
+                self.assertEqual(sorted(aac), [a for a in sg6.actions() if msk[a]])
+                self.assertEqual(sg6.disallowed_actions(aac), [a for a in sg6.actions() if not msk[a]])
+        self.assertEqual([SimpleGridOne.SOUTH], sg6.allowable_actions())  # north is off grid, east blocked
+        self.assertEqual([], sg6.allowable_actions([1, 2]))  # goal => episode over
+        self.assertEqual([SimpleGridOne.SOUTH, SimpleGridOne.WEST, SimpleGridOne.EAST],
+                         sg6.allowable_actions([1, 1]))  # probe order, north blocked, east to goal is allowed
+        return
+
     #
     # Test the re-spawn mode where
     #
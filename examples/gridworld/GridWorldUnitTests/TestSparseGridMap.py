@@ -0,0 +1,129 @@
+import os
+import random
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from examples.gridworld.CompiledGrid import CompiledGrid
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from examples.gridworld.SparseGridMap import SparseGridMap
+
+
+class TestSparseGridMap(unittest.TestCase):
+    moves = {SimpleGridOne.NORTH: (-1, 0), SimpleGridOne.SOUTH: (1, 0),
+             SimpleGridOne.EAST: (0, 1), SimpleGridOne.WEST: (0, -1)}
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    #
+    # The open cells that can be reached from the given cell, by breadth first search over the compiled grid.
+    #
+    def reachable(self, sgm: SparseGridMap, cell: int) -> np.ndarray:
+        cg = CompiledGrid(sgm.dense(), self.moves, SimpleGridOne.BLCK + 1.0, SimpleGridOne.BLCK)  # no terminals
+        seen = np.zeros(cg.num_cells, dtype=np.bool_)
+        seen[cell] = True
+        frontier = np.asarray([cell])
+        while frontier.size > 0:
+            nxt = cg.next_cell[frontier][cg.legal[frontier]]
+            frontier = np.unique(nxt[~seen[nxt]])
+            seen[frontier] = True
+        return seen
+
+    #
+    # Sparse cells against the dense map.
+    #
+    def test_sparse(self):
+        sgm = SparseGridMap(3, 4, SimpleGridOne.STEP,
+                            [5, 0, 5, 11, 7],
+                            [SimpleGridOne.FIRE, SimpleGridOne.BLCK, SimpleGridOne.GOAL, SimpleGridOne.STEP,
+                             SimpleGridOne.BLCK])
+        self.assertEqual([0, 5, 7], sgm.cells().tolist())
+        self.assertEqual([SimpleGridOne.BLCK, SimpleGridOne.GOAL, SimpleGridOne.BLCK], sgm.rewards().tolist())
+        dense = sgm.dense()
+        self.assertEqual((3, 4), dense.shape)
+        self.assertEqual(SimpleGridOne.GOAL, dense[1, 1])
+        self.assertEqual(SimpleGridOne.STEP, dense[2, 3])
+        self.assertEqual(SimpleGridOne.GOAL, sgm.reward((1, 1)))
+        self.assertEqual(SimpleGridOne.STEP, sgm.reward((2, 2)))
+        self.assertEqual([[0, 0], [1, 3]], sgm.coords_with_reward(SimpleGridOne.BLCK).tolist())
+        self.assertEqual(9, len(sgm.coords_with_reward(SimpleGridOne.STEP)))
+
+        sg1 = sgm.simple_grid(1, [0, 1], SimpleGridOne.RESPAWN_DEFAULT)
+        self.assertEqual(SimpleGridOne.GOAL, sg1.execute_action(SimpleGridOne.SOUTH))
+        self.assertTrue(sg1.episode_complete())
+
+        self.assertRaises(ValueError, SparseGridMap, 3, 4, SimpleGridOne.STEP, [12], [SimpleGridOne.BLCK])
+        self.assertRaises(ValueError, SparseGridMap, 3, 4, SimpleGridOne.STEP, [1, 2], [1.0, 2.0, 3.0])
+        return
+
+    #
+    # Same seed same map, and maps survive a save and load.
+    #
+    def test_seed_save_load(self):
+        m1 = SparseGridMap.random_obstacles(50, 40, seed=7, block_fraction=0.2, fire_fraction=0.05, num_goals=3)
+        m2 = SparseGridMap.random_obstacles(50, 40, seed=7, block_fraction=0.2, fire_fraction=0.05, num_goals=3)
+        self.assertTrue(np.array_equal(m1.dense(), m2.dense()))
+        self.assertEqual(400, len(m1.coords_with_reward(SimpleGridOne.BLCK)))
+        self.assertEqual(100, len(m1.coords_with_reward(SimpleGridOne.FIRE)))
+        self.assertEqual(3, len(m1.coords_with_reward(SimpleGridOne.GOAL)))
+        m3 = SparseGridMap.random_obstacles(50, 40, seed=8, block_fraction=0.2, fire_fraction=0.05, num_goals=3)
+        self.assertFalse(np.array_equal(m1.dense(), m3.dense()))
+
+        mz = SparseGridMap.maze(31, 41, seed=3, num_goals=2, loop_fraction=0.1)
+        with tempfile.TemporaryDirectory() as tmp:
+            for sgm in (m1, mz):
+                file_name = os.path.join(tmp, "grid.map")
+                sgm.save(file_name)
+                ld = SparseGridMap.load(file_name)
+                self.assertEqual(sgm.shape(), ld.shape())
+                self.assertEqual(sgm.default_reward(), ld.default_reward())
+                self.assertTrue(np.array_equal(sgm.dense(), ld.dense()))
+        return
+
+    #
+    # Every open cell of a maze can be reached from every other, with and without loops.
+    #
+    def test_maze(self):
+        for loop_fraction in (0.0, 0.25):
+            mz = SparseGridMap.maze(21, 31, seed=11, num_goals=2, loop_fraction=loop_fraction)
+            self.assertEqual(SimpleGridOne.BLCK, mz.default_reward())
+            dense = mz.dense()
+            open_cells = (dense != SimpleGridOne.BLCK).ravel()
+            self.assertEqual(2, len(mz.coords_with_reward(SimpleGridOne.GOAL)))
+            self.assertTrue(np.array_equal(open_cells, self.reachable(mz, 0)))
+            if loop_fraction == 0.0:
+                self.assertEqual(((11 * 16) * 2) - 1, np.count_nonzero(open_cells))  # spanning tree, no loops
+            else:
+                self.assertGreater(np.count_nonzero(open_cells), ((11 * 16) * 2) - 1)
+        return
+
+    #
+    # 10^6 cell maps are quick to generate, save and load.
+    #
+    def test_large(self):
+        st = time.time()
+        mz = SparseGridMap.maze(1001, 1001, seed=1, num_goals=10, loop_fraction=0.05)
+        ro = SparseGridMap.random_obstacles(1000, 1000, seed=1, block_fraction=0.1, num_goals=10)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "big.npz")
+            ro.save(file_name)
+            ld = SparseGridMap.load(file_name)
+        self.assertLess(time.time() - st, 5.0)
+        self.assertEqual(100000 + 10, ld.cells().size)
+        self.assertEqual(10, len(mz.coords_with_reward(SimpleGridOne.GOAL)))
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestSparseGridMap()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -40,7 +40,7 @@ class TestTemporalDifferenceQValPolicy(unittest.TestCase):
         # Set Up
         agent = GridWorldAgent(self.__agent_id, self.__agent_name, self.__exploration_strategy, self.__lg)
         grid = GridFactory.test_grid_four()  # Create grid that matches the 20 by 20 test case.
-        state = GridWorldState(grid, agent)
+        state = GridWorldState(grid)
 
         tdavp = TemporalDifferenceQValPolicy(lg=self.__lg,
                                              filename="./greedy_policy_test_1.pb",
@@ -67,7 +67,7 @@ class TestTemporalDifferenceQValPolicy(unittest.TestCase):
             print(state.state_as_string())
             action = tdavp.select_action(agent.name(), state, grid.allowable_actions())
             grid.execute_action(action)
-            state = GridWorldState(grid, agent)
+            state = GridWorldState(grid)
             # self.assertEqual(expected_actions[i], action)
             i += 1
         return
@@ -0,0 +1,93 @@
+import random
+import unittest
+
+import numpy as np
+
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from examples.gridworld.VectorisedGridWorld import VectorisedGridWorld
+from examples.gridworld.exceptions.GridBlockedActionException import GridBlockedActionException
+
+
+class TestVectorisedGridWorld(unittest.TestCase):
+    step = SimpleGridOne.STEP
+    fire = SimpleGridOne.FIRE
+    blck = SimpleGridOne.BLCK
+    goal = SimpleGridOne.GOAL
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def setUp(self):
+        self.grid_map = [
+            [self.step, self.blck, self.step, self.step],
+            [self.step, self.step, self.fire, self.goal],
+            [self.fire, self.step, self.step, self.step]
+        ]
+        self.sg = SimpleGridOne(0, self.grid_map, [0, 0])
+
+    #
+    # K agents stepped together follow the same moves, rewards and terminals as single SimpleGridOne grids.
+    #
+    def test_matches_simple_grid(self):
+        k = 50
+        vgw = VectorisedGridWorld(self.sg.compiled_grid(), k, SimpleGridOne.RESPAWN_RANDOM)
+        for _ in range(0, 200):
+            coords = vgw.coords()
+            masks = vgw.legal_masks()
+            singles = [SimpleGridOne(0, self.grid_map, list(c)) for c in coords]
+            actions = np.array([np.random.choice(np.flatnonzero(m)) for m in masks])
+            next_coords, rewards, dones, legal = vgw.step(actions)
+            for i, sg in enumerate(singles):
+                self.assertEqual(sg.execute_action(actions[i]), rewards[i])
+                self.assertEqual(sg.curr_coords(), next_coords[i].tolist())
+                self.assertEqual(sg.episode_complete(), dones[i])
+                self.assertTrue(np.array_equal(sg.legal_action_mask(), legal[i]))
+        self.assertTrue(np.sum(vgw.episodes()) > 0)
+        # after re-spawn no agent is left on a blocked or terminal cell
+        cg = self.sg.compiled_grid()
+        self.assertFalse(np.any(cg.terminal[vgw.cells()] | cg.blocked[vgw.cells()]))
+        return
+
+    def test_respawn_modes(self):
+        cg = self.sg.compiled_grid()
+        vgw = VectorisedGridWorld(cg, 100, SimpleGridOne.RESPAWN_CORNER)
+        self.assertEqual({(0, 0), (0, 3), (2, 0), (2, 3)}, set(map(tuple, vgw.coords().tolist())))
+        vgw = VectorisedGridWorld(cg, 100, SimpleGridOne.RESPAWN_EDGE)
+        self.assertTrue(np.all((vgw.coords()[:, 0] % 2 == 0) | (vgw.coords()[:, 1] == 0)))
+        vgw = VectorisedGridWorld(cg, 3, SimpleGridOne.RESPAWN_DEFAULT, [2, 1])
+        self.assertEqual([[2, 1]] * 3, vgw.coords().tolist())
+        self.assertEqual(np.float32, vgw.states_as_array().dtype)
+        return
+
+    def test_episode_end(self):
+        vgw = VectorisedGridWorld(self.sg.compiled_grid(), 2, SimpleGridOne.RESPAWN_DEFAULT, [0, 3])
+        next_coords, rewards, dones, legal = vgw.step(np.array([SimpleGridOne.SOUTH, SimpleGridOne.WEST]))
+        self.assertEqual([[1, 3], [0, 2]], next_coords.tolist())
+        self.assertEqual([self.goal, self.step], rewards.tolist())
+        self.assertEqual([True, False], dones.tolist())
+        self.assertFalse(np.any(legal[0]))
+        self.assertEqual([1, 0], vgw.episodes().tolist())
+        self.assertEqual([0, 1], vgw.episode_steps().tolist())
+        self.assertEqual([[0, 3], [0, 2]], vgw.coords().tolist())  # agent 0 re-spawned
+        return
+
+    def test_illegal(self):
+        vgw = VectorisedGridWorld(self.sg.compiled_grid(), 2, SimpleGridOne.RESPAWN_DEFAULT, [0, 0])
+        self.assertRaises(GridBlockedActionException, vgw.step, np.array([SimpleGridOne.NORTH, SimpleGridOne.SOUTH]))
+        self.assertRaises(GridBlockedActionException, vgw.step, np.array([SimpleGridOne.EAST, SimpleGridOne.SOUTH]))
+        self.assertRaises(GridBlockedActionException, vgw.step, np.array([7, SimpleGridOne.SOUTH]))
+        self.assertRaises(ValueError, vgw.step, np.array([SimpleGridOne.SOUTH]))
+        self.assertEqual([[0, 0], [0, 0]], vgw.coords().tolist())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestVectorisedGridWorld()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
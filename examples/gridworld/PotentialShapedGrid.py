@@ -0,0 +1,104 @@
+from typing import List
+
+import numpy as np
+
+from .Grid import Grid
+from .GridDistanceField import GridDistanceField
+
+
+#
+# Wrap a grid so that every move is rewarded with the grid reward plus the potential based shaping term
+#
+#   F(s, s') = gamma * phi(s') - phi(s), phi(s) = -scale * (steps from s to the nearest goal)
+#
+# Moves towards a goal earn more than moves away, which guides learning on large maps, and as the shaping is
+# the difference of a potential (zero at goals) the optimal policy is unchanged. gamma must be the discount
+# factor the learner uses.
+#
+# All other calls are passed to the wrapped grid.
+#
+
+class PotentialShapedGrid(Grid):
+
+    def __init__(self,
+                 grid: Grid,
+                 gamma: float,
+                 scale: float = 1.0,
+                 distance_field: GridDistanceField = None):
+        self.__grid = grid
+        self.__gamma = gamma
+        self.__scale = scale
+        if distance_field is None:
+            distance_field = GridDistanceField(grid.compiled_grid())
+        self.__distance_field = distance_field
+        self.__potential = distance_field.potential(scale).tolist()
+        self.__cols = grid.compiled_grid().cols
+        return
+
+    def id(self) -> int:
+        return self.__grid.id()
+
+    def actions(self) -> List[int]:
+        return self.__grid.actions()
+
+    #
+    # Execute the action on the wrapped grid and return the shaped reward.
+    #
+    def execute_action(self, action: int) -> np.float:
+        phi = self.__potential[self.__cell(self.__grid.curr_coords())]
+        reward = self.__grid.execute_action(action)
+        phi_next = self.__potential[self.__cell(self.__grid.curr_coords())]
+        return reward + (self.__gamma * phi_next) - phi
+
+    def deep_copy(self):
+        return type(self)(self.__grid.deep_copy(), self.__gamma, self.__scale, self.__distance_field)
+
+    def compiled_grid(self):
+        return self.__grid.compiled_grid()
+
+    def allowable_actions(self,
+                          coords: List[int] = None) -> List[int]:
+        return self.__grid.allowable_actions(coords)
+
+    def disallowed_actions(self, allowable_actions: List[int]) -> List[int]:
+        return self.__grid.disallowed_actions(allowable_actions)
+
+    def legal_action_mask(self,
+                          coords: List[int] = None) -> np.ndarray:
+        return self.__grid.legal_action_mask(coords)
+
+    def coords_after_action(self, x: int, y: int, action: int) -> List[int]:
+        return self.__grid.coords_after_action(x, y, action)
+
+    #
+    # The (unshaped) reward of the wrapped grid
+    #
+    def reward(self, x: int, y: int) -> np.float:
+        return self.__grid.reward(x, y)
+
+    def reset(self, coords: List[int] = None):
+        return self.__grid.reset(coords)
+
+    def episode_complete(self, coords: List[int] = None) -> bool:
+        return self.__grid.episode_complete(coords)
+
+    def curr_coords(self) -> List[int]:
+        return self.__grid.curr_coords()
+
+    def last_coords(self) -> List[int]:
+        return self.__grid.last_coords()
+
+    def shape(self) -> List[int]:
+        return self.__grid.shape()
+
+    #
+    # The wrapped grid and the distance field the shaping is based on.
+    #
+    def base_grid(self) -> Grid:
+        return self.__grid
+
+    def distance_field(self) -> GridDistanceField:
+        return self.__distance_field
+
+    def __cell(self, coords: List[int]) -> int:
+        return (int(coords[Grid.ROW]) * self.__cols) + int(coords[Grid.COL])
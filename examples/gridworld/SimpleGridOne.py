@@ -4,6 +4,9 @@ from typing import List
 
 import numpy as np
 
+from reflrn.ActionMask import ActionMask
+from .CompiledGrid import CompiledGrid
+from .GridActivityCounter import GridActivityCounter
 from .Grid import Grid
 from examples.gridworld.exceptions.GridBlockedActionException import GridBlockedActionException
 from examples.gridworld.exceptions.GridEpisodeOverException import GridEpisodeOverException
@@ -13,6 +16,8 @@ from examples.gridworld.exceptions.GridEpisodeOverException import GridEpisodeOv
 # Simple (small grid) with the basic North, South, East, West moves (no diagonal moves)
 # The grid map of rewards is defined at construction time.
 #
+# The grid map is immutable so it is compiled (on first use) into flat tables by cell id (see CompiledGrid) that
+# are shared with deep copies. Stepping, legality and terminal checks are then table lookups on the current cell.
 #
 
 
@@ -29,6 +34,7 @@ class SimpleGridOne(Grid):
     EAST = np.int(2)
     WEST = np.int(3)
     __actions = {NORTH: (-1, 0), SOUTH: (1, 0), EAST: (0, 1), WEST: (0, -1)}  # N, S ,E, W (row-offset, col-offset)
+    __probe_order = (NORTH, SOUTH, WEST, EAST)  # order allowable actions are listed in
     RESPAWN_RANDOM = 0
     RESPAWN_CORNER = 1
     RESPAWN_EDGE = 2
@@ -44,7 +50,8 @@ class SimpleGridOne(Grid):
                  grid_id: int,
                  grid_map: [],
                  st_coords: List[int] = None,
-                 respawn_type=RESPAWN_RANDOM
+                 respawn_type=RESPAWN_RANDOM,
+                 compiled_grid: CompiledGrid = None
                  ):
         self.__grid_id = grid_id
         self.__num_actions = 4  # N,S,E,W
@@ -63,15 +70,16 @@ class SimpleGridOne(Grid):
             SimpleGridOne.RESPAWN_RANDOM: self.__respawn_random
         }
         self.__start = None
-        self.__curr = None
         if self.__st_coords is not None:
             self.__start = st_coords
-            self.__curr = list([self.__start[0], self.__start[1]])
         else:
             self.__start = list([0, 0])
-            self.__curr = deepcopy(self.__start)
+        self.__curr = self.__cell(self.__start)  # current location as cell id
 
-        self.__activity = np.zeros((self.__grid_rows, self.__grid_cols))
+        self.__activity = None  # created on first move so deep copies do not pay for it
+
+        self.__compiled = compiled_grid  # if given, must have been compiled from grid_map by compile_map()
+        self.__legal_actions = None
 
     def start_coords(self) -> List[int]:
         return (self.__respawn_operator[self.__respawn_type])()
@@ -131,7 +139,7 @@ class SimpleGridOne(Grid):
     # current "location" of the grid, i.e. the active cell location where the agent is.
     #
     def curr_coords(self) -> List[int]:
-        return deepcopy(self.__curr)
+        return self.__coords(self.__curr)
 
     #
     # Return the last coords before current curr_coords
@@ -145,41 +153,44 @@ class SimpleGridOne(Grid):
     def reset(self,
               coords: List[int] = None) -> None:
         if coords is None:
-            self.__curr = self.start_coords()
-        else:
-            self.__curr = [coords[self.ROW], coords[self.COL]]
+            coords = self.start_coords()
+        self.__curr = self.__cell(coords)
         return
 
     #
-    # Track what % of activity has happened by grid location.
+    # Count the action taken and the visit to the grid location it moved to.
     #
     def __track_activity(self,
-                         coords: List[int]) -> None:
-        self.__activity[coords[0]][coords[1]] += 1e-6
+                         cell: int,
+                         action: int,
+                         next_cell: int) -> None:
+        self.activity().record(cell, action, next_cell)
         return
 
     #
     # Execute the given action and return the reward earned for moving to the new grid location.
     #
     def execute_action(self, action: int) -> np.float:
-        if self.__episode_over():
+        next_cell, legal, reward, terminal = self.compiled_grid().step_tables()
+        if terminal[self.__curr]:
             raise GridEpisodeOverException("Episode already complete, agent at finish cell on grid")
-        if action not in self.allowable_actions():
+        if action not in self.__actions or not legal[self.__curr][action]:
             raise GridBlockedActionException("Illegal Grid Move, cell blocked or action would move out of grid")
 
-        self.__track_last_coords(self.__curr)
-        self.__curr = self.__new_coords_after_action(action)
-        if self.__episode_over():
+        prev = self.__curr
+        self.__track_last_coords(self.__coords(prev))
+        self.__curr = next_cell[prev][action]
+        if terminal[self.__curr]:
             self.__episode_reset()
 
-        self.__track_activity(self.__curr)
-        return self.__grid_reward(self.__curr)
+        self.__track_activity(prev, action, self.__curr)
+        return reward[self.__curr]
 
     #
     # What is the reward for the given grid location.
     #
     def reward(self, rw: int, cl: int) -> np.float:
-        return self.__grid_reward([rw, cl])
+        return self.compiled_grid().step_tables()[2][self.__cell((rw, cl))]
 
     #
     # What is the list of all possible actions.
@@ -199,8 +210,10 @@ class SimpleGridOne(Grid):
     def deep_copy(self) -> Grid:
         cp = type(self)(self.id(),
                         self.__grid,
-                        self.__start)
+                        self.__start,
+                        compiled_grid=self.__compiled)
         cp.__curr = self.__curr
+        cp.__legal_actions = self.__legal_actions
         return cp
 
     #
@@ -208,35 +221,11 @@ class SimpleGridOne(Grid):
     #
     def episode_complete(self,
                          coords: List[int] = None) -> bool:
+        terminal = self.compiled_grid().step_tables()[3]
         if coords is not None:
-            return self.__episode_over(coords)
-        else:
-            return self.__episode_over(self.__curr)
-
-    #
-    # Is the current location at a defined terminal (finish) location.
-    #
-    def __episode_over(self,
-                       coords: List[int] = None) -> bool:
-        if coords is None:
-            nw = deepcopy(self.__curr)
+            return terminal[self.__cell(coords)]
         else:
-            nw = coords
-        return self.__grid_reward(nw) == self.FIN
-
-    #
-    # What will the new current coordinates be if the given action
-    # was applied.
-    #
-    def __new_coords_after_action(self,
-                                  action: int,
-                                  coords: List[int] = None) -> List[int]:
-        mv = self.__actions[action]
-        if coords is None:
-            nw = deepcopy(self.__curr)
-        else:
-            nw = coords
-        return list((nw[self.ROW] + mv[self.ROW], nw[self.COL] + mv[self.COL]))
+            return terminal[self.__curr]
 
     #
     # What *would* the coordinates be if the given action were to be executed
@@ -248,52 +237,58 @@ class SimpleGridOne(Grid):
         return list((rw + mv[cls.ROW], cl + mv[cls.COL]))
 
     #
-    # What is the defined reward for the given grid location.
+    # The grid compiled into tables by cell id, compiled on first use and shared by deep copies.
+    #
+    def compiled_grid(self) -> CompiledGrid:
+        if self.__compiled is None:
+            self.__compiled = self.compile_map(self.__grid)
+        return self.__compiled
+
+    #
+    # Compile the given grid map into tables as per the moves, terminal and blocked cells of this grid.
     #
-    def __grid_reward(self, coords: List[int]) -> np.float:
-        return self.__grid[coords[self.ROW]][coords[self.COL]]
+    @classmethod
+    def compile_map(cls,
+                    grid_map) -> CompiledGrid:
+        return CompiledGrid(grid_map=grid_map,
+                            moves=cls.__actions,
+                            terminal_reward=cls.FIN,
+                            blocked_reward=cls.BLCK)
 
     #
-    # Is the given grid location defined as blocked ?
+    # Cell id <-> coordinates.
     #
-    def __blocked(self, coords: List[int]) -> bool:
-        return self.__grid[coords[self.ROW]][coords[self.COL]] == self.BLCK
+    def __cell(self, coords: List[int]) -> int:
+        return (int(coords[self.ROW]) * self.__grid_cols) + int(coords[self.COL])
+
+    def __coords(self, cell: int) -> List[int]:
+        return list(divmod(cell, self.__grid_cols))
 
     #
     # Convert the allowable actions into a boolean mask.
     #
     def disallowed_actions(self, allowable_actions: List[int]) -> List[int]:
-        da = []
-        for i in range(0, self.__num_actions):
-            if i not in allowable_actions:
-                da.append(i)
-        return da
+        return ActionMask.illegal_actions(ActionMask.from_actions(allowable_actions, self.__num_actions)).tolist()
 
     #
     # List of allowable actions from the current position
     #
     def allowable_actions(self,
                           origin: List[int] = None) -> List[int]:
-        ams = list()
-        if origin is None:
-            coords = deepcopy(self.__curr)
-        else:
-            coords = deepcopy(origin)
-        if self.__episode_over(coords):
-            return []
-        new_coords = self.__new_coords_after_action(self.NORTH, coords)
-        if new_coords[self.ROW] >= 0 and not self.__blocked(new_coords):
-            ams.append(self.NORTH)
-        new_coords = self.__new_coords_after_action(self.SOUTH, coords)
-        if new_coords[self.ROW] < self.__grid_rows and not self.__blocked(new_coords):
-            ams.append(self.SOUTH)
-        new_coords = self.__new_coords_after_action(self.WEST, coords)
-        if new_coords[self.COL] >= 0 and not self.__blocked(new_coords):
-            ams.append(self.WEST)
-        new_coords = self.__new_coords_after_action(self.EAST, coords)
-        if new_coords[self.COL] < self.__grid_cols and not self.__blocked(new_coords):
-            ams.append(self.EAST)
-        return ams
+        cell = self.__curr if origin is None else self.__cell(origin)
+        if self.__legal_actions is None:
+            probe_legal = self.compiled_grid().legal[:, list(self.__probe_order)].tolist()
+            self.__legal_actions = [tuple(a for a, ok in zip(self.__probe_order, lgl) if ok) for lgl in probe_legal]
+        return list(self.__legal_actions[cell])
+
+    #
+    # Boolean mask of the allowable actions from the given (or current) position, the masks are shared so
+    # are read only.
+    #
+    def legal_action_mask(self,
+                          coords: List[int] = None) -> np.ndarray:
+        cell = self.__curr if coords is None else self.__cell(coords)
+        return self.compiled_grid().legal[cell]
 
     #
     # Reset at end of episode.
@@ -309,7 +304,16 @@ class SimpleGridOne(Grid):
         self.__last_coords = coords
         return
 
-    def activity_matrix(self) -> List[float]:
-        act = deepcopy(self.__activity)
-        act /= np.sum(act)
-        return act
+    #
+    # Visits by grid location as a fraction of all visits [rows, cols], read only.
+    #
+    def activity_matrix(self) -> np.ndarray:
+        return self.activity().visit_distribution()
+
+    #
+    # The visit and action counts of this grid.
+    #
+    def activity(self) -> GridActivityCounter:
+        if self.__activity is None:
+            self.__activity = GridActivityCounter(self.__grid_rows, self.__grid_cols, self.__num_actions)
+        return self.__activity
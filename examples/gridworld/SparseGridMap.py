@@ -0,0 +1,227 @@
+from typing import List
+
+import numpy as np
+
+from .SimpleGridOne import SimpleGridOne
+
+
+#
+# A grid map held as a default reward plus the (sorted) ids of the cells that differ from it and their rewards,
+# so very large maps (10^6+ cells) cost memory in proportion to what is on them rather than to their size.
+#
+# Cell ids are row * cols + col as per CompiledGrid. Mazes are mostly walls so they are held as a map with a
+# default of blocked and the open cells as the exceptions.
+#
+# Maps are generated from a seed so the same seed always gives the same map, and are saved / loaded as
+# uncompressed numpy archives (.npz) which are a straight copy of the arrays in and out.
+#
+
+class SparseGridMap:
+    __format_version = 1
+
+    #
+    # cells : ids of the cells that do not have the default reward, rewards : the reward of each of those cells.
+    # Where a cell is given more than once the last reward given for it is kept.
+    #
+    def __init__(self,
+                 rows: int,
+                 cols: int,
+                 default_reward: float = SimpleGridOne.STEP,
+                 cells: np.ndarray = None,
+                 rewards: np.ndarray = None):
+        if rows < 1 or cols < 1:
+            raise ValueError("Grid must have at least one row and one column given [" + str(rows) + ", " + str(
+                cols) + "]")
+        self.__rows = int(rows)
+        self.__cols = int(cols)
+        self.__default_reward = float(default_reward)
+
+        cells = np.zeros(0, dtype=np.int64) if cells is None else np.asarray(cells, dtype=np.int64).ravel()
+        rewards = np.zeros(0) if rewards is None else np.asarray(rewards, dtype=np.float64).ravel()
+        if rewards.size == 1 and cells.size > 1:
+            rewards = np.full(cells.size, rewards[0])
+        if cells.size != rewards.size:
+            raise ValueError("Expected one reward per cell, given [" + str(cells.size) + "] cells and [" + str(
+                rewards.size) + "] rewards")
+        if cells.size > 0 and (np.min(cells) < 0 or np.max(cells) >= self.num_cells()):
+            raise ValueError("Cell ids must be in the range 0 to [" + str(self.num_cells() - 1) + "]")
+
+        # keep the last reward given for each cell and drop cells that just have the default reward.
+        last = cells.size - 1 - np.unique(cells[::-1], return_index=True)[1]
+        keep = last[rewards[last] != self.__default_reward]
+        self.__cells = cells[keep]
+        self.__rewards = rewards[keep]
+        for table in (self.__cells, self.__rewards):
+            table.setflags(write=False)
+        return
+
+    def rows(self) -> int:
+        return self.__rows
+
+    def cols(self) -> int:
+        return self.__cols
+
+    def shape(self) -> List[int]:
+        return [self.__rows, self.__cols]
+
+    def num_cells(self) -> int:
+        return self.__rows * self.__cols
+
+    def default_reward(self) -> float:
+        return self.__default_reward
+
+    #
+    # The (sorted) ids of the cells that do not have the default reward, read only.
+    #
+    def cells(self) -> np.ndarray:
+        return self.__cells
+
+    #
+    # The rewards of the cells given by cells(), read only.
+    #
+    def rewards(self) -> np.ndarray:
+        return self.__rewards
+
+    #
+    # The reward of the cell at the given (row, col)
+    #
+    def reward(self,
+               coords: List[int]) -> float:
+        cell = (int(coords[0]) * self.__cols) + int(coords[1])
+        i = np.searchsorted(self.__cells, cell)
+        if i < self.__cells.size and self.__cells[i] == cell:
+            return float(self.__rewards[i])
+        return self.__default_reward
+
+    #
+    # The (row, col) of all cells with the given reward [n, 2], e.g. all the goals.
+    #
+    def coords_with_reward(self,
+                           reward: float) -> np.ndarray:
+        if reward == self.__default_reward:
+            cells = np.setdiff1d(np.arange(self.num_cells()), self.__cells, assume_unique=True)
+        else:
+            cells = self.__cells[self.__rewards == reward]
+        return np.stack(np.divmod(cells, self.__cols), axis=1)
+
+    #
+    # The full map of rewards [rows, cols], read only.
+    #
+    def dense(self) -> np.ndarray:
+        dense = np.full(self.num_cells(), self.__default_reward)
+        dense[self.__cells] = self.__rewards
+        dense = dense.reshape(self.__rows, self.__cols)
+        dense.setflags(write=False)
+        return dense
+
+    #
+    # A SimpleGridOne over the (dense) map.
+    #
+    def simple_grid(self,
+                    grid_id: int,
+                    st_coords: List[int] = None,
+                    respawn_type=SimpleGridOne.RESPAWN_RANDOM) -> SimpleGridOne:
+        return SimpleGridOne(grid_id, self.dense(), st_coords, respawn_type)
+
+    #
+    # Save as an uncompressed numpy archive.
+    #
+    def save(self,
+             file_name: str) -> None:
+        with open(file_name, 'wb') as f:
+            np.savez(f,
+                     version=np.int64(self.__format_version),
+                     shape=np.asarray([self.__rows, self.__cols], dtype=np.int64),
+                     default_reward=np.float64(self.__default_reward),
+                     cells=self.__cells,
+                     rewards=self.__rewards)
+        return
+
+    #
+    # Load a map saved by save()
+    #
+    @classmethod
+    def load(cls,
+             file_name: str) -> 'SparseGridMap':
+        with np.load(file_name) as arc:
+            if int(arc['version']) != cls.__format_version:
+                raise ValueError("Grid map file [" + file_name + "] is format version [" + str(
+                    int(arc['version'])) + "] expected [" + str(cls.__format_version) + "]")
+            rows, cols = arc['shape'].tolist()
+            return cls(rows, cols, float(arc['default_reward']), arc['cells'], arc['rewards'])
+
+    #
+    # A map of open (step) cells with the given fraction of the cells blocked and the given fraction on fire,
+    # and num_goals goals. Goals are placed on cells that are neither blocked nor on fire, but may be boxed in
+    # by blocked cells.
+    #
+    @classmethod
+    def random_obstacles(cls,
+                         rows: int,
+                         cols: int,
+                         seed: int,
+                         block_fraction: float = 0.2,
+                         fire_fraction: float = 0.0,
+                         num_goals: int = 1) -> 'SparseGridMap':
+        num_cells = rows * cols
+        num_blocks = int(num_cells * block_fraction)
+        num_fires = int(num_cells * fire_fraction)
+        if num_blocks + num_fires + num_goals > num_cells:
+            raise ValueError("Not enough cells for [" + str(num_blocks) + "] blocks, [" + str(
+                num_fires) + "] fires and [" + str(num_goals) + "] goals on [" + str(num_cells) + "] cells")
+        rng = np.random.RandomState(seed)
+        cells = rng.choice(num_cells, num_blocks + num_fires + num_goals, replace=False)
+        rewards = np.empty(cells.size)
+        rewards[:num_blocks] = SimpleGridOne.BLCK
+        rewards[num_blocks:num_blocks + num_fires] = SimpleGridOne.FIRE
+        rewards[num_blocks + num_fires:] = SimpleGridOne.GOAL
+        return cls(rows, cols, SimpleGridOne.STEP, cells, rewards)
+
+    #
+    # A maze with corridors one cell wide where every open cell can reach every other.
+    #
+    # The maze is on the cells with an even row and even column, joined by carving through the cell between
+    # them. Each cell is joined to the cell above or to its left at random (the binary tree maze), which is a
+    # spanning tree and so a perfect maze, and it is vectorised so a 10^6 cell maze takes well under a second.
+    # It does have a bias, the top row and left column are always open corridors. loop_fraction of the
+    # remaining walls between cells are then removed to give more than one route.
+    #
+    # Grids with an odd number of rows and columns give a maze with no blocked outer row or column.
+    #
+    @classmethod
+    def maze(cls,
+             rows: int,
+             cols: int,
+             seed: int,
+             num_goals: int = 1,
+             loop_fraction: float = 0.0,
+             fire_fraction: float = 0.0) -> 'SparseGridMap':
+        rng = np.random.RandomState(seed)
+        rw, cl = np.mgrid[0:rows:2, 0:cols:2]
+        rw = rw.ravel()
+        cl = cl.ravel()
+        go_north = rng.randint(0, 2, rw.size).astype(np.bool_)
+        go_north = np.where(rw == 0, False, np.where(cl == 0, True, go_north))
+        carve = (rw > 0) | (cl > 0)
+        walls = np.where(go_north, ((rw - 1) * cols) + cl, (rw * cols) + cl - 1)[carve]
+        nodes = (rw * cols) + cl
+
+        if loop_fraction > 0.0:
+            # walls between two maze cells that were not carved.
+            hrw, hcl = np.mgrid[0:rows:2, 1:cols - 1:2]
+            vrw, vcl = np.mgrid[1:rows - 1:2, 0:cols:2]
+            between = np.concatenate([((hrw * cols) + hcl).ravel(), ((vrw * cols) + vcl).ravel()])
+            between = np.setdiff1d(between, walls, assume_unique=True)
+            knock = rng.choice(between.size, int(between.size * loop_fraction), replace=False)
+            walls = np.concatenate([walls, between[knock]])
+
+        open_cells = np.concatenate([nodes, walls])
+        rewards = np.full(open_cells.size, SimpleGridOne.STEP)
+        num_fires = int(open_cells.size * fire_fraction)
+        if num_fires + num_goals > open_cells.size:
+            raise ValueError("Not enough open cells in maze for [" + str(num_fires) + "] fires and [" + str(
+                num_goals) + "] goals")
+        special = rng.choice(open_cells.size, num_fires + num_goals, replace=False)
+        rewards[special[:num_fires]] = SimpleGridOne.FIRE
+        rewards[special[num_fires:]] = SimpleGridOne.GOAL
+        return cls(rows, cols, SimpleGridOne.BLCK, open_cells, rewards)
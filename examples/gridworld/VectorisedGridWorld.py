@@ -0,0 +1,149 @@
+import numpy as np
+
+from examples.gridworld.CompiledGrid import CompiledGrid
+from examples.gridworld.SimpleGridOne import SimpleGridOne
+from examples.gridworld.exceptions.GridBlockedActionException import GridBlockedActionException
+from reflrn.DTypePolicy import DTypePolicy
+
+
+#
+# K independent agents on one shared compiled grid, all stepped by a single call with an array of actions.
+#
+# Each agent has its own position and episode counter. When an agent reaches a terminal cell the step reports
+# the terminal position, reward and done for that agent and the agent is then re-spawned as per the
+# SimpleGridOne re-spawn modes, so the next step continues from the new episode's start cell.
+#
+# Agents are only re-spawned onto cells that can be moved from, i.e. neither blocked nor terminal.
+#
+
+class VectorisedGridWorld:
+
+    def __init__(self,
+                 compiled_grid: CompiledGrid,
+                 num_agents: int,
+                 respawn_type: int = SimpleGridOne.RESPAWN_RANDOM,
+                 start_coords=None):
+        if num_agents < 1:
+            raise ValueError("At least one agent is needed, given [" + str(num_agents) + "]")
+        self.__grid = compiled_grid
+        self.__num_agents = num_agents
+        self.__respawn_type = respawn_type
+        self.__respawn_cells = self.__respawn_candidates(compiled_grid, respawn_type, start_coords)
+        if self.__respawn_cells.size == 0:
+            raise ValueError("No cells to re-spawn on for re-spawn type [" + str(respawn_type) + "]")
+
+        self.__cells = np.zeros(num_agents, dtype=np.int64)
+        self.__episodes = np.zeros(num_agents, dtype=np.int64)
+        self.__episode_steps = np.zeros(num_agents, dtype=np.int64)
+        self.reset()
+        return
+
+    #
+    # Re-spawn all agents, or those where the given boolean mask is True, and start new episodes for them.
+    #
+    def reset(self,
+              agents: np.ndarray = None) -> np.ndarray:
+        if agents is None:
+            agents = np.ones(self.__num_agents, dtype=np.bool_)
+        n = int(np.count_nonzero(agents))
+        if n > 0:
+            self.__cells[agents] = self.__respawn_cells[np.random.randint(0, self.__respawn_cells.size, n)]
+            self.__episode_steps[agents] = 0
+        return self.coords()
+
+    #
+    # Take one action per agent.
+    #
+    # return : next coords [K, 2], rewards [K], dones [K] and legal action masks [K, actions] at the next coords.
+    #
+    # Agents that are done are re-spawned once the step is complete, coords() and legal_masks() then give the
+    # positions (and masks) to select the next actions from.
+    #
+    def step(self,
+             actions: np.ndarray):
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.__num_agents,):
+            raise ValueError("Expected one action per agent [" + str(self.__num_agents) + "] given shape " +
+                             str(actions.shape))
+        if np.any((actions < 0) | (actions >= self.__grid.num_actions)):
+            raise GridBlockedActionException("Action out of range for grid")
+        if not np.all(self.__grid.legal[self.__cells, actions]):
+            illegal = np.flatnonzero(~self.__grid.legal[self.__cells, actions])
+            raise GridBlockedActionException("Illegal Grid Move for agent(s) " + str(illegal.tolist()) +
+                                             ", cell blocked, episode over or action would move out of grid")
+
+        nxt = self.__grid.next_cell[self.__cells, actions]
+        rewards = self.__grid.reward[nxt]
+        dones = self.__grid.terminal[nxt]
+        next_coords = np.stack(np.divmod(nxt, self.__grid.cols), axis=1)
+        legal = self.__grid.legal[nxt]
+
+        self.__cells = nxt
+        self.__episode_steps += 1
+        if np.any(dones):
+            self.__episodes[dones] += 1
+            self.reset(dones)
+        return next_coords, rewards, dones, legal
+
+    #
+    # Current (row, col) of every agent [K, 2]
+    #
+    def coords(self) -> np.ndarray:
+        return np.stack(np.divmod(self.__cells, self.__grid.cols), axis=1)
+
+    #
+    # Current coords of every agent as network inputs [K, 2], as per GridWorldState.state_as_array()
+    #
+    def states_as_array(self) -> np.ndarray:
+        return self.coords().astype(DTypePolicy.float_dtype)
+
+    #
+    # Current cell id of every agent [K]
+    #
+    def cells(self) -> np.ndarray:
+        return self.__cells.copy()
+
+    #
+    # Legal action masks at the current positions [K, actions]
+    #
+    def legal_masks(self) -> np.ndarray:
+        return self.__grid.legal[self.__cells]
+
+    #
+    # Completed episodes by agent [K]
+    #
+    def episodes(self) -> np.ndarray:
+        return self.__episodes.copy()
+
+    #
+    # Steps taken in the current episode by agent [K]
+    #
+    def episode_steps(self) -> np.ndarray:
+        return self.__episode_steps.copy()
+
+    def num_agents(self) -> int:
+        return self.__num_agents
+
+    def grid(self) -> CompiledGrid:
+        return self.__grid
+
+    #
+    # The cells agents can be re-spawned on for the given re-spawn type.
+    #
+    @classmethod
+    def __respawn_candidates(cls,
+                             grid: CompiledGrid,
+                             respawn_type: int,
+                             start_coords) -> np.ndarray:
+        rw, cl = np.divmod(np.arange(grid.num_cells), grid.cols)
+        if respawn_type == SimpleGridOne.RESPAWN_RANDOM:
+            where = np.ones(grid.num_cells, dtype=np.bool_)
+        elif respawn_type == SimpleGridOne.RESPAWN_CORNER:
+            where = ((rw == 0) | (rw == grid.rows - 1)) & ((cl == 0) | (cl == grid.cols - 1))
+        elif respawn_type == SimpleGridOne.RESPAWN_EDGE:
+            where = (rw == 0) | (rw == grid.rows - 1) | (cl == 0) | (cl == grid.cols - 1)
+        elif respawn_type == SimpleGridOne.RESPAWN_DEFAULT:
+            where = np.arange(grid.num_cells) == grid.cell(start_coords if start_coords is not None else (0, 0))
+        else:
+            raise ValueError("Unknown re-spawn type [" + str(respawn_type) + "]")
+        return np.flatnonzero(where & ~grid.blocked & ~grid.terminal)
@@ -1,5 +1,6 @@
 import logging
 from random import randint
+from typing import List
 
 import numpy as np
 
@@ -19,6 +20,18 @@ class TicTacToe(Environment):
     __no_agent = None
     __win_mask = np.full((1, 3), 3, np.int8)
     __actions = {0: (0, 0), 1: (0, 1), 2: (0, 2), 3: (1, 0), 4: (1, 1), 5: (1, 2), 6: (2, 0), 7: (2, 1), 8: (2, 2)}
+    # Legal action mask & legal action ids for all 2^9 patterns of empty cells, indexed by the empty cell bits
+    __cell_bits = np.power(2, np.arange(9))
+    __legal_masks = ((np.arange(512).reshape(-1, 1) // __cell_bits) % 2).astype(np.bool_)
+    __legal_masks.setflags(write=False)
+    __legal_ids = [np.flatnonzero(m) for m in __legal_masks]
+    for __ids in __legal_ids:
+        __ids.setflags(write=False)
+    del __ids
+    # The cells (of the flattened board) of each of the 8 lines of three, rows, columns then diagonals
+    __lines = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8],
+                        [0, 3, 6], [1, 4, 7], [2, 5, 8],
+                        [0, 4, 8], [2, 4, 6]])
     __drawn = "draw"
     __games = "games"
     __states = "states"
@@ -204,7 +217,58 @@ class TicTacToe(Environment):
         if state is None:
             return TicTacToe.__actions
         else:
-            return np.array(list(TicTacToe.__actions.keys()))[np.isnan(state.state()).reshape(9)]
+            return TicTacToe.__legal_ids[cls.__empty_cell_index(state.state())]
+
+    #
+    # Boolean mask of the legal actions in the given state (or the current state), True where the cell is
+    # empty. The masks are pre-computed and shared so are read only.
+    #
+    def legal_action_mask(self,
+                          state: State = None) -> np.ndarray:
+        if state is None:
+            return TicTacToe.__legal_masks[self.__empty_cell_index(self.__board)]
+        return TicTacToe.__legal_masks[self.__empty_cell_index(state.state())]
+
+    #
+    # Legal action masks [n, 9] for a list of states, looked up in the pre-computed tables for all states at once.
+    #
+    def legal_action_masks(self,
+                           states: List[State]) -> np.ndarray:
+        return TicTacToe.__legal_masks[self.__empty_cell_indices(self.__boards(states))]
+
+    #
+    # Episode complete [n] for a list of states, tested for all states at once. As episode_complete(), a board
+    # is complete if any line of three is held by one agent or if there are no empty cells.
+    #
+    def episode_complete_batch(self,
+                               states: List[State]) -> np.ndarray:
+        boards = self.__boards(states)
+        won = np.any(np.abs(np.sum(boards[:, TicTacToe.__lines], axis=2)) == 3, axis=1)  # nan (empty) never 3
+        return won | (self.__empty_cell_indices(boards) == 0)
+
+    #
+    # The boards of the given states as flattened boards [n, 9]
+    #
+    @classmethod
+    def __boards(cls,
+                 states: List[State]) -> np.ndarray:
+        return np.reshape(np.array([st.state() for st in states], dtype=np.float64), (len(states), 9))
+
+    #
+    # The indices of the boards' [n, 9] patterns of empty cells in the pre-computed legal action tables.
+    #
+    @classmethod
+    def __empty_cell_indices(cls,
+                             boards: np.ndarray) -> np.ndarray:
+        return np.isnan(boards).astype(np.int64) @ cls.__cell_bits
+
+    #
+    # The index of the board's pattern of empty cells in the pre-computed legal action tables.
+    #
+    @classmethod
+    def __empty_cell_index(cls,
+                           board: np.ndarray) -> int:
+        return int(np.dot(np.isnan(board).reshape(9), cls.__cell_bits))
 
     #
     # Assume the play_action has been validated by play_action method
@@ -309,9 +373,7 @@ class TicTacToe(Environment):
                                    board=None):
         if board is None:
             board = self.__board
-        alt = np.reshape(board, board.size)
-        alt = np.fromiter(self.actions().keys(), int)[np.isnan(alt)]
-        return alt
+        return TicTacToe.__legal_ids[self.__empty_cell_index(board)]
 
     #
     # The episode is over if one agent has made a line of three on
@@ -58,6 +58,7 @@ class TicTacToeAgent(Agent):
     # Environment call back when episode is completed
     #
     def episode_complete(self, state: State):
+        self.__policy.episode_complete(state)
         return
 
     #
@@ -1,5 +1,6 @@
 import numpy as np
 
+from reflrn.DTypePolicy import DTypePolicy
 from reflrn.Interface.Agent import Agent
 from reflrn.Interface.State import State
 
@@ -91,7 +92,7 @@ class TicTacToeState(State):
     # from a linear vector for a simple Sequential model to an 3D array for a
     # multi layer convolutional model.
     #
+    # The board is given in the DTypePolicy board dtype (float32 or int8) with empty cells as the unused id.
+    #
     def state_as_array(self) -> np.ndarray:
-        bc = np.copy(self.__board)
-        bc[np.isnan(bc)] = self.__unused
-        return bc
+        return DTypePolicy.as_board(np.where(np.isnan(self.__board), self.__unused, self.__board))
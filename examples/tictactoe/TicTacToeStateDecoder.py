@@ -0,0 +1,32 @@
+import numpy as np
+
+from examples.tictactoe.TicTacToeState import TicTacToeState
+from reflrn.Interface.Agent import Agent
+
+
+#
+# Rebuild a TicTacToeState from its array form (TicTacToeState.state_as_array()), for replay memories that only
+# hold the array form of a state (FixedRecordLayout). Empty cells are held as the unused id and are given back
+# as np.nan so the rebuilt state works with TicTacToe episode_complete, actions & legal_action_mask.
+#
+# Used as the state_decoder of the replay memory, where the memory is passed to a spawned process the decoder
+# (and so the agents) must be picklable.
+#
+
+class TicTacToeStateDecoder:
+
+    def __init__(self,
+                 agent_x: Agent,
+                 agent_o: Agent):
+        self.__agent_x = agent_x
+        self.__agent_o = agent_o
+        self.__unused = agent_x.id() + agent_o.id()
+        return
+
+    #
+    # The TicTacToeState for the given array form of a board.
+    #
+    def __call__(self,
+                 state_as_array: np.ndarray) -> TicTacToeState:
+        brd = np.asarray(state_as_array, dtype=np.float64).reshape((3, 3))
+        return TicTacToeState(np.where(brd == self.__unused, np.nan, brd), self.__agent_x, self.__agent_o)
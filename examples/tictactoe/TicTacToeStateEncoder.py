@@ -0,0 +1,48 @@
+import numpy as np
+
+from reflrn.DTypePolicy import DTypePolicy
+from reflrn.Interface.State import State
+from reflrn.Interface.StateEncoder import StateEncoder
+
+
+#
+# Encode a TicTacToe board as a single base-3 int16, cell i contributes 3^i * (0 = empty, 1 = x, 2 = o).
+# All 3^9 boards fit in an int16 and decode rebuilds the same X input as TicTacToeState.state_as_array().
+#
+
+class TicTacToeStateEncoder(StateEncoder):
+    __num_cells = 9
+    __powers = np.power(3, np.arange(9)).astype(np.int16)
+
+    def __init__(self,
+                 x_id: int,
+                 o_id: int):
+        self.__x_id = x_id
+        self.__o_id = o_id
+        # cell value by base 3 digit, empty cells are given as the unused id (sum of ids) as per TicTacToeState
+        self.__cell_values = np.array([x_id + o_id, x_id, o_id], dtype=DTypePolicy.board_dtype())
+        return
+
+    def code_dtype(self) -> np.dtype:
+        return np.dtype(np.int16)
+
+    def code_shape(self) -> tuple:
+        return ()
+
+    #
+    # The base 3 code for the board of the given state.
+    #
+    def encode(self, state: State) -> np.ndarray:
+        brd = np.reshape(state.state(), self.__num_cells)
+        digits = np.zeros(self.__num_cells, dtype=np.int16)
+        digits[brd == self.__x_id] = 1
+        digits[brd == self.__o_id] = 2
+        return np.int16(np.dot(digits, self.__powers))
+
+    #
+    # The network inputs for the given codes as [n, 9].
+    #
+    def decode_batch(self, codes: np.ndarray) -> np.ndarray:
+        c = np.asarray(codes, dtype=np.int32).reshape(-1, 1)
+        digits = (c // self.__powers.astype(np.int32)) % 3
+        return self.__cell_values[digits]
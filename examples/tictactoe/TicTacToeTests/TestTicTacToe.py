@@ -55,6 +55,34 @@ class TestTicTacToe(unittest.TestCase):
             ttt.import_state(test_case)
             self.assertEqual(ttt.export_state(), test_case)
 
+    def test_legal_action_mask(self):
+        print("Test legal action masks")
+        test_cases = ("", "1:0", "-1:0~1:2~-1:4~1:6~-1:8", "1:0~-1:1~1:2~-1:3~1:4~-1:5~1:6~-1:7~1:8")
+        agent_o = TestAgent(1, "O")
+        agent_x = TestAgent(-1, "X")
+        for test_case in test_cases:
+            ttt = TicTacToe(agent_x, agent_o, None)
+            ttt.import_state(test_case)
+            empty = np.isnan(ttt.state().state()).reshape(9)
+            self.assertTrue(np.array_equal(empty, ttt.legal_action_mask()))
+            self.assertTrue(np.array_equal(empty, ttt.legal_action_mask(ttt.state())))
+            self.assertEqual(np.flatnonzero(empty).tolist(), ttt.actions(ttt.state()).tolist())
+        return
+
+    def test_batch_episode_complete_and_legal_action_masks(self):
+        print("Test batch episode complete & legal action masks")
+        agent_o = TestAgent(1, "O")
+        agent_x = TestAgent(-1, "X")
+        ttt = TicTacToe(agent_x, agent_o, None)
+        np.random.seed(42)
+        states = [TicTacToeState(np.random.choice([np.nan, 1, -1], (3, 3)), agent_x, agent_o) for _ in range(0, 500)]
+        complete = ttt.episode_complete_batch(states)
+        self.assertEqual([ttt.episode_complete(st) for st in states], complete.tolist())
+        self.assertTrue(0 < np.count_nonzero(complete) < len(states))
+        self.assertTrue(np.array_equal(np.stack([ttt.legal_action_mask(st) for st in states]),
+                                       ttt.legal_action_masks(states)))
+        return
+
     def test_tic_tac_toe_state(self):
         ao = TestAgent(1, "O")
         ax = TestAgent(-1, "X")
@@ -0,0 +1,100 @@
+import logging
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from examples.tictactoe.TicTacToe import TicTacToe
+from examples.tictactoe.TicTacToeState import TicTacToeState
+from examples.tictactoe.TicTacToeStateDecoder import TicTacToeStateDecoder
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.MemoryMappedReplayMemory import MemoryMappedReplayMemory
+from .TestAgent import TestAgent
+
+
+#
+# Unit Test Suite for rebuilding TicTacToe states from the array form held by fixed record replay memories.
+#
+
+
+class TestTicTacToeStateDecoder(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestTicTacToeStateDecoder",
+                                      "TestTicTacToeStateDecoder.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def setUp(self):
+        self.agent_o = TestAgent(1, "O")
+        self.agent_x = TestAgent(-1, "X")
+        self.ttt = TicTacToe(self.agent_x, self.agent_o, None)
+        self.decoder = TicTacToeStateDecoder(self.agent_x, self.agent_o)
+
+    def __state(self, moves: str) -> TicTacToeState:
+        ttt = TicTacToe(self.agent_x, self.agent_o, None)
+        if len(moves) > 0:
+            ttt.import_state(moves)
+        return ttt.state()
+
+    #
+    # The decoded state has the same board (empty cells as nan) and so gives the same answers from the
+    # environment as the original.
+    #
+    def __assert_same_state(self,
+                            st: TicTacToeState,
+                            dst: TicTacToeState) -> None:
+        self.assertIsInstance(dst, TicTacToeState)
+        self.assertTrue(np.array_equal(st.state(), dst.state(), equal_nan=True))
+        self.assertEqual(st.state_as_string(), dst.state_as_string())
+        self.assertEqual(self.ttt.episode_complete(st), self.ttt.episode_complete(dst))
+        self.assertTrue(np.array_equal(self.ttt.legal_action_mask(st), self.ttt.legal_action_mask(dst)))
+        self.assertTrue(np.array_equal(self.ttt.actions(st), self.ttt.actions(dst)))
+        return
+
+    def test_decode(self):
+        for moves in ["", "1:0", "1:0~-1:4", "1:0~-1:4~1:1~-1:8~1:2", "1:0~-1:1~1:2~1:3~-1:4~-1:5~-1:6~1:7~-1:8"]:
+            st = self.__state(moves)
+            self.__assert_same_state(st, self.decoder(np.array(st.state_as_array())))
+        return
+
+    #
+    # Memories restored from a re-opened memory mapped replay file are TicTacToe states again.
+    #
+    def test_resume_memory_mapped_replay(self):
+        moves = ["", "1:0", "1:0~-1:4", "1:0~-1:4~1:1", "1:0~-1:4~1:1~-1:8", "1:0~-1:4~1:1~-1:8~1:2"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "replay.mm")
+            mmrm = MemoryMappedReplayMemory(self.__lg, filename, 10, 9, state_decoder=self.decoder)
+            for i in range(0, len(moves) - 1):
+                mmrm.append_memory(self.__state(moves[i]), self.__state(moves[i + 1]), i, float(i),
+                                   i == len(moves) - 2)
+            mmrm.close()
+
+            mmrm = MemoryMappedReplayMemory(self.__lg, filename, 10, 9, state_decoder=self.decoder)
+            samples = mmrm.get_random_memories(10)
+            self.assertEqual(len(moves) - 1, len(samples))
+            for sample in samples:
+                a = sample[MemoryMappedReplayMemory.mem_action]
+                self.__assert_same_state(self.__state(moves[a]), sample[MemoryMappedReplayMemory.mem_state])
+                self.__assert_same_state(self.__state(moves[a + 1]),
+                                         sample[MemoryMappedReplayMemory.mem_next_state])
+            self.assertTrue(self.ttt.episode_complete(mmrm.get_last_memory()[MemoryMappedReplayMemory.mem_next_state]))
+            mmrm.close()
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestTicTacToeStateDecoder()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
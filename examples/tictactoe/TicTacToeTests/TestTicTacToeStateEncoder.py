@@ -0,0 +1,134 @@
+import logging
+import random
+import unittest
+
+import numpy as np
+
+from examples.tictactoe.TicTacToe import TicTacToe
+from examples.tictactoe.TicTacToeState import TicTacToeState
+from examples.tictactoe.TicTacToeStateEncoder import TicTacToeStateEncoder
+from reflrn.EncodedReplayMemory import EncodedReplayMemory
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.StateDictionary import StateDictionary
+from .TestAgent import TestAgent
+
+
+#
+# Unit Test Suite for the compact TicTacToe state encoding and the encoded replay memory.
+#
+
+
+class TestTicTacToeStateEncoder(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestTicTacToeStateEncoder",
+                                      "TestTicTacToeStateEncoder.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def setUp(self):
+        self.agent_o = TestAgent(1, "O")
+        self.agent_x = TestAgent(-1, "X")
+        self.encoder = TicTacToeStateEncoder(self.agent_x.id(), self.agent_o.id())
+
+    def __state(self, moves: str):
+        ttt = TicTacToe(self.agent_x, self.agent_o, None)
+        if len(moves) > 0:
+            ttt.import_state(moves)
+        return ttt.state()
+
+    def test_encode_decode(self):
+        states = [self.__state(""),
+                  self.__state("1:0"),
+                  self.__state("1:0~-1:4"),
+                  self.__state("1:0~-1:1~1:2~1:3~-1:4~-1:5~-1:6~1:7~-1:8")]
+        codes = np.array([self.encoder.encode(s) for s in states], dtype=self.encoder.code_dtype())
+        self.assertEqual(0, codes[0])
+        self.assertEqual(len(states), len(np.unique(codes)))
+        x = self.encoder.decode_batch(codes)
+        self.assertEqual((len(states), 9), x.shape)
+        for st, xi in zip(states, x):
+            self.assertTrue(np.array_equal(np.reshape(st.state_as_array(), 9), xi))
+        return
+
+    def test_encoded_replay_memory(self):
+        shared = StateDictionary()
+        erm = EncodedReplayMemory(self.__lg, replay_mem_size=4, state_encoder=self.encoder, state_dictionary=shared)
+        moves = ["", "1:0", "1:0~-1:4", "1:0~-1:4~1:8", "1:0~-1:4~1:8~-1:2", "1:0~-1:4~1:8~-1:2~1:6"]
+        for i in range(0, len(moves) - 1):
+            erm.append_memory(self.__state(moves[i]), self.__state(moves[i + 1]), i, float(i), i == len(moves) - 2)
+        self.assertEqual(4, erm.len())
+        self.assertEqual(len(moves) - 1, shared.len())  # held once and moves[0] went with the evicted memory
+
+        last = erm.get_last_memory()
+        self.assertEqual(4, last[EncodedReplayMemory.mem_action])
+        self.assertTrue(last[EncodedReplayMemory.mem_complete])
+        by_state = erm.get_last_memory(self.__state(moves[2]))
+        self.assertEqual(2, by_state[EncodedReplayMemory.mem_action])
+        self.assertIsNone(erm.get_last_memory(self.__state(moves[0])))  # evicted
+
+        episodes, x, nx, actions, rewards, complete = erm.get_random_batch(10)
+        self.assertEqual(4, len(actions))
+        for i, a in enumerate(actions):
+            self.assertTrue(np.array_equal(np.reshape(self.__state(moves[a]).state_as_array(), 9), x[i]))
+            self.assertTrue(np.array_equal(np.reshape(self.__state(moves[a + 1]).state_as_array(), 9), nx[i]))
+            self.assertEqual(float(a), rewards[i])
+
+        for mem in erm.get_random_memories(4):
+            a = mem[EncodedReplayMemory.mem_action]
+            self.assertEqual(self.__state(moves[a]).state_as_string(),
+                             mem[EncodedReplayMemory.mem_state].state_as_string())
+        return
+
+    #
+    # An entry added more than once is held until it has been released as many times.
+    #
+    def test_state_dictionary_references(self):
+        sd = StateDictionary()
+        st = self.__state("1:0")
+        code = self.encoder.encode(st)
+        sd.add(code, st)
+        sd.add(code, self.__state("1:0"))
+        self.assertEqual(1, sd.len())
+        sd.release(code)
+        self.assertIs(st, sd.get(code))
+        sd.release(code)
+        self.assertEqual(0, sd.len())
+        self.assertRaises(StateDictionary.UnknownStateCode, sd.get, code)
+        self.assertRaises(StateDictionary.UnknownStateCode, sd.release, code)
+        return
+
+    #
+    # States of evicted memories are dropped, so the dictionary is bounded by the memory not by the number of
+    # distinct states ever seen.
+    #
+    def test_state_dictionary_bounded_by_memory(self):
+        shared = StateDictionary()
+        erm = EncodedReplayMemory(self.__lg, replay_mem_size=10, state_encoder=self.encoder, state_dictionary=shared)
+        cells = [np.nan, self.agent_x.id(), self.agent_o.id()]
+        for i in range(0, 500):
+            boards = np.random.choice(cells, (2, 3, 3))
+            erm.append_memory(TicTacToeState(boards[0], self.agent_x, self.agent_o),
+                              TicTacToeState(boards[1], self.agent_x, self.agent_o),
+                              i % 9, float(0), i % 5 == 4)
+            self.assertLessEqual(shared.len(), 2 * erm.len())
+        held = set()
+        for mem in erm.get_random_memories(10):
+            held.add(mem[EncodedReplayMemory.mem_state].state_as_string())
+            held.add(mem[EncodedReplayMemory.mem_next_state].state_as_string())
+        self.assertEqual(len(held), shared.len())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestTicTacToeStateEncoder()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
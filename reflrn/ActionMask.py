@@ -0,0 +1,66 @@
+import numpy as np
+
+
+#
+# Boolean legal action masks, mask[a] is True if action a is legal.
+#
+# Masks are applied to q-values with np.where so illegal actions are never selected as greedy, this works the
+# same for a single state [num_actions] or a batch of states [n, num_actions].
+#
+
+class ActionMask:
+
+    #
+    # The mask for the given legal action ids.
+    #
+    @classmethod
+    def from_actions(cls,
+                     legal_actions,
+                     num_actions: int) -> np.ndarray:
+        mask = np.zeros(num_actions, dtype=np.bool_)
+        mask[np.asarray(legal_actions, dtype=np.int64)] = True
+        return mask
+
+    #
+    # The ids of the legal actions in the given mask.
+    #
+    @classmethod
+    def legal_actions(cls,
+                      mask: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(mask)
+
+    #
+    # The ids of the illegal actions in the given mask.
+    #
+    @classmethod
+    def illegal_actions(cls,
+                        mask: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(~np.asarray(mask))
+
+    #
+    # The q-values with illegal actions set to -inf.
+    #
+    @classmethod
+    def apply(cls,
+              q: np.ndarray,
+              mask: np.ndarray) -> np.ndarray:
+        return np.where(mask, q, -np.inf)
+
+    #
+    # The greedy legal action; for a batch the greedy legal action of each row. A row with no legal actions
+    # gives action 0, callers should not ask for the greedy action of a terminal state.
+    #
+    @classmethod
+    def greedy(cls,
+               q: np.ndarray,
+               mask: np.ndarray):
+        return np.argmax(cls.apply(q, mask), axis=-1)
+
+    #
+    # The max q-value over the legal actions; -inf where there are none.
+    #
+    @classmethod
+    def max_legal(cls,
+                  q: np.ndarray,
+                  mask: np.ndarray):
+        return np.max(cls.apply(q, mask), axis=-1)
@@ -1,20 +1,33 @@
+import logging
 import os
+import threading
 from copy import deepcopy
 from typing import Tuple
 
 import numpy as np
 
 from examples.tictactoe.RenderQValuesAsStr import RenderQValues
+from reflrn.ActionMask import ActionMask
 from reflrn.ActorCriticPolicyTelemetry import ActorCriticPolicyTelemetry
+from reflrn.AsyncLearner import AsyncLearner
+from reflrn.BatchBuffers import BatchBuffers
+from reflrn.CriticLossMonitor import CriticLossMonitor
+from reflrn.DTypePolicy import DTypePolicy
+from reflrn.DequeReplayMemory import DequeReplayMemory
 from reflrn.DictReplayMemory import DictReplayMemory
 from reflrn.GeneralModelParams import GeneralModelParams
 from reflrn.Interface.Environment import Environment
+from reflrn.Interface.MetricsSink import MetricsSink
 from reflrn.Interface.ModelParams import ModelParams
 from reflrn.Interface.NeuralNetwork import NeuralNetwork
 from reflrn.Interface.Policy import Policy
+from reflrn.Interface.ReplayMemory import ReplayMemory
 from reflrn.Interface.State import State
+from reflrn.LoggingMetricsSink import LoggingMetricsSink
+from reflrn.NStepReplayMemory import NStepReplayMemory
 from reflrn.QValNNModel import QValNNModel
 from reflrn.SimpleLearningRate import SimpleLearningRate
+from reflrn.SynchronisedReplayMemory import SynchronisedReplayMemory
 
 
 #
@@ -27,6 +40,14 @@ from reflrn.SimpleLearningRate import SimpleLearningRate
 class ActorCriticPolicyTDQVal(Policy):
     __replay_mem_size = 1000
 
+    # Learner modes
+    #   inline : train critic in update_policy and act with the critic (default)
+    #   async : train critic on a background learner thread and act with the last published critic weights
+    #   deterministic : as async, but the learner step is run in update_policy so results are reproducible
+    LEARNER_INLINE = 'inline'
+    LEARNER_ASYNC = 'async'
+    LEARNER_DETERMINISTIC = 'deterministic'
+
     __static_test_action_list = None  # Static list of actions for Policy testing
     __next_test_action = 0
 
@@ -34,7 +55,9 @@ class ActorCriticPolicyTDQVal(Policy):
                  lg,
                  network: NeuralNetwork,
                  policy_params: GeneralModelParams = None,
-                 env: Environment = None):
+                 env: Environment = None,
+                 replay_memory: ReplayMemory = None,
+                 metrics_sink: MetricsSink = None):
 
         self.env = env  # If Env not passed, then must be bound via link_to_env() method.
         self.lg = lg
@@ -53,10 +76,17 @@ class ActorCriticPolicyTDQVal(Policy):
         self.epsilon = pp.get_parameter(ModelParams.epsilon)  # exploration factor.
         self.epsilon_decay = pp.get_parameter(ModelParams.epsilon_decay)
         self.gamma = pp.get_parameter(ModelParams.gamma)  # Discount Factor Applied to reward
+        self.discount_returns = pp.get_parameter(ModelParams.discount_returns)  # False => gamma not applied
+        self.__discount = self.gamma if self.discount_returns else float(1)
         self.verbose = pp.get_parameter(ModelParams.verbose)  # Verbose output from model while training.
         self.train_every = pp.get_parameter(ModelParams.train_every)
         self.save_every = 1000
         self.num_states = pp.get_parameter(ModelParams.num_states)
+        self.n_step = pp.get_parameter(ModelParams.n_step)  # Steps of actual reward before bootstrap from actor
+        self.tau = pp.get_parameter(ModelParams.tau)  # 1.0 => actor is a hard copy of critic, else Polyak update
+        self.learner_mode = pp.get_parameter(ModelParams.learner_mode)
+        if self.learner_mode not in (self.LEARNER_INLINE, self.LEARNER_ASYNC, self.LEARNER_DETERMINISTIC):
+            raise ValueError("Unknown learner mode [" + str(self.learner_mode) + "]")
 
         self.__training = True  # by default we train actor/critic as we take actions
         self.__train_invocations = 0
@@ -66,9 +96,22 @@ class ActorCriticPolicyTDQVal(Policy):
         self.__explore = True
 
         #
-        # Replay memory needed to model a stationary target.
+        # Replay memory needed to model a stationary target. This can be given so that it can be
+        # shared, e.g. between actor processes and a learner. For n_step > 1 the replay memory pre computes
+        # the n-step returns so that it is not re-done for every sample.
+        #
+        # A replay memory that can be sampled as columns (e.g. EncodedReplayMemory) is, so the network inputs
+        # of a training batch are built in bulk rather than one state at a time.
         #
-        self.__replay_memory = DictReplayMemory(lg, self.__replay_mem_size)
+        self.__replay_memory = replay_memory
+        if self.__replay_memory is None:
+            if self.n_step > 1:
+                self.__replay_memory = NStepReplayMemory(lg, self.__replay_mem_size, self.n_step, self.__discount)
+            else:
+                self.__replay_memory = DictReplayMemory(lg, self.__replay_mem_size)
+        self.__column_sampled = hasattr(self.__replay_memory, 'get_random_batch_with_next_states')
+        if self.learner_mode == self.LEARNER_ASYNC:
+            self.__replay_memory = SynchronisedReplayMemory(self.__replay_memory)
 
         #
         # Create the actor / critic NN models that will work as the function approximations for Q Vals.
@@ -92,6 +135,55 @@ class ActorCriticPolicyTDQVal(Policy):
         self.explain = False
 
         self.__telemetry = ActorCriticPolicyTelemetry()
+        self.__batch_buffers = BatchBuffers()
+
+        #
+        # Critic loss is tracked against a fixed evaluation set and reported to the metrics sink. The evaluation
+        # set is made of whole episodes given to update_policy that are held out of the replay memory, so the
+        # critic is never trained on them. Where the replay memory is filled elsewhere (e.g. by actor processes)
+        # nothing is held out for the learner and no loss is reported.
+        #
+        if metrics_sink is None:
+            metrics_sink = LoggingMetricsSink(lg, logging.DEBUG)
+        eval_set_size = pp.get_parameter(ModelParams.loss_eval_size)
+        if self.n_step > 1:
+            eval_memory = NStepReplayMemory(lg, eval_set_size, self.n_step, self.__discount)
+        else:
+            eval_memory = DequeReplayMemory(lg, eval_set_size)
+        if self.learner_mode == self.LEARNER_ASYNC:
+            eval_memory = SynchronisedReplayMemory(eval_memory)
+        self.__loss_monitor = CriticLossMonitor(lg,
+                                                eval_memory,
+                                                metrics_sink,
+                                                evaluate_every=pp.get_parameter(ModelParams.loss_eval_every),
+                                                eval_set_size=eval_set_size,
+                                                hold_out_every=pp.get_parameter(ModelParams.loss_hold_out_every))
+
+        #
+        # Where the learner is decoupled from acting, actions are predicted by a separate acting model that
+        # takes the critic weights published by the learner. The learner only ever swaps the reference to the
+        # published weights, they are applied to the acting model by the acting thread.
+        #
+        # The critic & actor models are only changed under the model lock, so weights set by the caller can not
+        # interleave with a learner step running on the learner thread.
+        #
+        self.__model_lock = threading.Lock()
+        self.__acting_model = None
+        self.__pending_weights = None
+        self.__applied_weights = None
+        self.__learner = None
+        if self.learner_mode != self.LEARNER_INLINE:
+            self.__acting_model = QValNNModel(model_name="Acting",
+                                              input_dimension=self.input_dim,
+                                              num_actions=self.num_actions,
+                                              network=network,
+                                              lg=self.lg,
+                                              model_params=self._model_params()
+                                              )
+            self.__pending_weights = self.critic_model.get_weights()
+        if self.learner_mode == self.LEARNER_ASYNC:
+            self.__learner = AsyncLearner(lg, self._learner_step, name="ActorCriticLearner")
+            self.__learner.start()
 
         return
 
@@ -152,13 +244,26 @@ class ActorCriticPolicyTDQVal(Policy):
         if episode_complete:
             self.__episode_complete_reset()
 
-        self.__replay_memory.append_memory(state,
-                                           next_state,
-                                           action,
-                                           reward,
-                                           episode_complete)
+        if not self.__loss_monitor.hold_out(state, next_state, action, reward, episode_complete):
+            self.__replay_memory.append_memory(state,
+                                               next_state,
+                                               action,
+                                               reward,
+                                               episode_complete)
         self._train(self.train_every)
 
+    #
+    # The environment has ended the episode, close the open episode of the replay memory (if it holds one) and
+    # of the loss evaluation hold out as the last transition this policy was given may not have been flagged
+    # episode complete.
+    #
+    def episode_complete(self, state: State) -> None:
+        end_episode = getattr(self.__replay_memory, 'end_episode', None)
+        if end_episode is not None:
+            end_episode()
+        self.__loss_monitor.end_episode()
+        return
+
     #
     # Select a random allowable action in the current state
     #
@@ -173,18 +278,27 @@ class ActorCriticPolicyTDQVal(Policy):
     #
     def __critic_prediction(self,
                             state: State):
-        return (self.critic_model.predict(state.state_as_array().reshape(1, self.input_dim)))[0]
+        return (self.__acting_critic().predict(state.state_as_array().reshape(1, self.input_dim)))[0]
+
+    #
+    # The model to predict actions with, for the non inline learner modes this is the acting model
+    # after taking any weights published by the learner.
+    #
+    def __acting_critic(self):
+        if self.__acting_model is None:
+            return self.critic_model
+        weights = self.__pending_weights  # Only the learner writes this reference
+        if weights is not self.__applied_weights:
+            self.__acting_model.set_weights(weights)
+            self.__applied_weights = weights
+        return self.__acting_model
 
     #
     # Predict an action based on current policy.
     #
     def __predict_action(self,
                          state: State) -> int:
-        actions_allowed_in_current_state = self._env().actions(state)
-        actions_not_allowed_in_current_state = self.actions_taken(actions_allowed_in_current_state)
-        qvals = self.__critic_prediction(state)
-        if len(actions_not_allowed_in_current_state) > 0:
-            qvals[actions_not_allowed_in_current_state] = np.finfo(np.float).min
+        qvals = ActionMask.apply(self.__critic_prediction(state), self._env().legal_action_mask(state))
         if self.explain:
             print(RenderQValues.render_simple(qvals))
             print(self.__telemetry.state_observation_telemetry(state.state_as_array()))
@@ -236,17 +350,14 @@ class ActorCriticPolicyTDQVal(Policy):
         if self.__static_test_action_list is not None:
             return self.__select_static_test_action()
 
-        qvals = (self.critic_model.predict(state.state_as_array().reshape(1, self.input_dim)))[0]
+        qvals = self.__critic_prediction(state)
         actn = np.argmax(qvals)
         return actn
 
     def actions_taken(self,
                       actions_remaining: np.ndarray) -> np.ndarray:
-        actns = list()
-        for a in self._env().actions():
-            if a not in actions_remaining:
-                actns.append(a)
-        return np.asarray(actns)
+        all_actions = np.fromiter(self._env().actions(), dtype=np.int64)
+        return all_actions[~np.isin(all_actions, actions_remaining)]
 
     #
     # Persist the current Policy
@@ -295,6 +406,16 @@ class ActorCriticPolicyTDQVal(Policy):
         if not self.__training:
             return
 
+        if self.learner_mode != self.LEARNER_INLINE:
+            self.__train_invocations += 1
+            if self.__train_invocations % train_every == 0:
+                self.__train_invocations = 0
+                if self.__learner is not None:
+                    self.__learner.request_step()
+                else:
+                    self._learner_step(update_every)
+            return
+
         self.__train_invocations += 1
 
         if self._sufficient_experience_to_start_training():
@@ -313,75 +434,210 @@ class ActorCriticPolicyTDQVal(Policy):
         return
 
     #
-    # Get actor prediction, if actor is not able to predict, predict random
+    # One step of the decoupled learner, train the critic and every update_every trainings update the
+    # actor (target) and publish the critic weights for acting.
     #
-    def _actor_prediction(self,
-                          curr_state: State) -> np.ndarray:
-        st = np.array(curr_state.state_as_array()).reshape((1, self.input_dim))  # Shape needed for NN
-        p = self.actor_model.predict(st)[0]  # Can predict even if model is not trained, just predicts random.
-        return p
+    def _learner_step(self,
+                      update_every: int = 5) -> None:
+        if not self._sufficient_experience_to_start_training():
+            return
+        with self.__model_lock:
+            self._train_critic()
+            self.__critic_train_count += 1
+            if self.__critic_train_count % update_every == 0:
+                self._update_actor_from_critic()
+                self.__pending_weights = self.critic_model.get_weights()  # Atomic swap of reference
+            if self.__critic_train_count % self.save_every == 0:
+                self.save("ActorCriticPolicy1")
+        return
 
     #
-    # The projected reward if for taking greedy actions until the end of the episode.
-    # However, if this is a terminal state by definition the best possible reward is always zero.
+    # Stop the background learner, if there is one.
     #
-    def _next_state_qval_prediction(self,
-                                    new_state: State,
-                                    done: bool) -> float:
-        qvp = 0
-        if not (self._env().episode_complete(new_state) or done):
-            qvn = self._actor_prediction(curr_state=new_state)
-            allowable_actions = self._env().actions(new_state)
-            qvp = np.max(qvn[allowable_actions])  # Greedy reward from current state
-        return np.float(qvp)
+    def stop_learner(self,
+                     timeout: float = None) -> None:
+        if self.__learner is not None:
+            self.__learner.stop(timeout)
+        return
 
     #
-    # What is the q_value model prediction given current state S, by definition of this is a
-    # terminal state all rewards are zero.
+    # Train the critic on one batch from replay memory regardless of the train_every cadence and update
+    # the actor from the critic every update_every critic trainings. This is the learner side step when
+    # the replay memory is being filled by other (actor) processes.
     #
-    def _curr_state_qval_prediction(self,
-                                    curr_state: State,
-                                    done: bool) -> np.ndarray:
-        qvs = np.zeros(self.num_actions)
-        if not done:
-            qvs = self._actor_prediction(curr_state=curr_state)
-        return qvs
-
-    # Get a random set of samples from the given QValues to select_action as a test or training
-    # batch for the model.
+    # return True if the critic was trained.
     #
-    def _get_sample_batch(self) -> Tuple[np.ndarray, np.ndarray]:
-
-        batch_size = self._model_params().get_parameter(ModelParams.batch_size)
-        samples = self.__replay_memory.get_random_memories(batch_size)
+    def train_from_replay(self,
+                          update_every: int = 5) -> bool:
+        if not self._sufficient_experience_to_start_training():
+            return False
+        with self.__model_lock:
+            self._train_critic()
+            self.__critic_train_count += 1
+            if self.__critic_train_count % update_every == 0:
+                self._update_actor_from_critic()
+        return True
 
-        x = np.zeros((batch_size, self.input_dim))
-        y = np.zeros((batch_size, self.num_actions))
-        i = 0
-        for sample in samples:
-            _, cur_state, new_state, action, reward, done = sample
-            lr = self.learning_rate.learning_rate(self.episode)
-            qvp = self._next_state_qval_prediction(new_state, done)
-            qvs = self._curr_state_qval_prediction(cur_state, done)
+    #
+    # The current critic weights, these are the weights to publish to actors.
+    #
+    def get_weights(self) -> list:
+        with self.__model_lock:
+            return self.critic_model.get_weights()
 
-            qv = qvs[action]
-            qv = (qv * (1 - lr)) + (lr * (reward + qvp))  # updated expectation of current state/action
-            # qv = reward + (self.gamma * qvp)  # updated expectation of current state/action
+    #
+    # Set both actor and critic to the given (published) weights, waiting for any learner step in progress.
+    #
+    def set_weights(self,
+                    weights: list) -> None:
+        with self.__model_lock:
+            self.critic_model.set_weights(weights)
+            self.actor_model.set_weights(weights)
+            if self.__acting_model is not None:
+                self.__pending_weights = weights
+        return
 
-            qvs[action] = qv
+    #
+    # The reward, state to bootstrap from, bootstrap done flag and discount to apply to the bootstrap
+    # prediction for the given sample. Where the replay memory holds n-step returns these are used in place
+    # of the single step reward and next state.
+    #
+    # The discount is the same for both, gamma if discount_returns is set else 1 (no discounting) for the
+    # single step bootstrap and for the rewards and bootstrap of the n-step memory the policy creates. A
+    # given n-step memory applies its own gamma, so it should be created with the same discount.
+    #
+    def _sample_target_terms(self,
+                             sample) -> Tuple[float, State, bool, float]:
+        if len(sample) > NStepReplayMemory.mem_done_n:
+            return (sample[NStepReplayMemory.mem_return_n],
+                    sample[NStepReplayMemory.mem_bootstrap_state],
+                    sample[NStepReplayMemory.mem_done_n],
+                    self.__replay_memory.bootstrap_discount())
+        return sample[4], sample[2], sample[5], self.__discount
 
-            x[i] = (cur_state.state_as_array()).reshape(1, self.input_dim)
-            y[i] = qvs
-            i += 1
+    #
+    # Actor predictions for a batch of states [n, input_dim] in a single call to the model, as a (float32) copy
+    # that can be updated in place.
+    #
+    def _actor_batch_prediction(self,
+                                x: np.ndarray) -> np.ndarray:
+        return np.array(self.actor_model.predict(x), dtype=DTypePolicy.float_dtype)
 
-        return x, y
+    # Get a random set of samples from the given QValues to select_action as a test or training
+    # batch for the model.
+    #
+    def _get_sample_batch(self) -> Tuple[np.ndarray, np.ndarray]:
+        batch_size = self._model_params().get_parameter(ModelParams.batch_size)
+        if self.__column_sampled:
+            return self._column_batch_targets(self.__replay_memory.get_random_batch_with_next_states(batch_size))
+        return self._batch_targets(self.__replay_memory.get_random_memories(batch_size))
+
+    #
+    # The (x, y) training / evaluation batch for the given list of replay memories.
+    #
+    # The samples are stacked such that the actor is called once for all of the current states together with
+    # all of the states to bootstrap from. The terminal flags & legal action masks of the bootstrap states are
+    # asked of the environment for the whole batch in one call each, and they and the update of the expected
+    # value of the current state/action are then applied across the whole batch.
+    #
+    # x is a view onto a re-used batch buffer so is only valid until the next call.
+    #
+    def _batch_targets(self,
+                       samples: list) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(samples)
+        if n == 0:
+            return None, None
+
+        xs = self.__batch_buffers.get("x", 2 * n, self.input_dim)  # current states then bootstrap states
+        x = xs[:n]
+        xb = xs[n:]
+        actions = np.zeros(n, dtype=np.int64)
+        rewards = np.zeros(n)
+        discounts = np.zeros(n)
+        done = np.zeros(n, dtype=np.bool_)
+        bootstrap_done = np.zeros(n, dtype=np.bool_)
+        bootstrap_states = [None] * n
+        for i, sample in enumerate(samples):
+            _, cur_state, _, actions[i], _, done[i] = sample[:6]
+            rewards[i], bootstrap_states[i], bootstrap_done[i], discounts[i] = self._sample_target_terms(sample)
+            x[i] = np.reshape(cur_state.state_as_array(), self.input_dim)
+            xb[i] = np.reshape(bootstrap_states[i].state_as_array(), self.input_dim)
+        return self.__targets(xs, actions, rewards, discounts, done, bootstrap_done, bootstrap_states)
+
+    #
+    # The (x, y) training batch for a column sample of the replay memory, as given by
+    # get_random_batch_with_next_states. The network inputs come from the memory for the whole sample, and as
+    # such memories hold single step returns the next state is the state to bootstrap from.
+    #
+    # x is a view onto a re-used batch buffer so is only valid until the next call.
+    #
+    def _column_batch_targets(self,
+                              batch: tuple) -> Tuple[np.ndarray, np.ndarray]:
+        _, x, nx, actions, rewards, done, next_states = batch
+        n = len(actions)
+        if n == 0:
+            return None, None
+
+        xs = self.__batch_buffers.get("x", 2 * n, self.input_dim)  # current states then bootstrap states
+        xs[:n] = np.reshape(x, (n, self.input_dim))
+        xs[n:] = np.reshape(nx, (n, self.input_dim))
+        done = np.asarray(done, dtype=np.bool_)
+        return self.__targets(xs,
+                              np.asarray(actions, dtype=np.int64),
+                              np.asarray(rewards, dtype=np.float64),
+                              np.full(n, self.__discount),
+                              done,
+                              done,
+                              next_states)
+
+    #
+    # The (x, y) batch given the current states followed by the states to bootstrap from (xs [2n, input_dim]),
+    # and the per sample columns.
+    #
+    def __targets(self,
+                  xs: np.ndarray,
+                  actions: np.ndarray,
+                  rewards: np.ndarray,
+                  discounts: np.ndarray,
+                  done: np.ndarray,
+                  bootstrap_done: np.ndarray,
+                  bootstrap_states: list) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(actions)
+        x = xs[:n]
+        xb = xs[n:]
+
+        # False => no future reward to bootstrap from, only the bootstrap states with a future are predicted so
+        # they are packed together straight after x
+        bootstrap = ~(bootstrap_done | self._env().episode_complete_batch(bootstrap_states))
+        legal = self._env().legal_action_masks(bootstrap_states)
+        nb = int(np.count_nonzero(bootstrap))
+        xb[:nb] = xb[bootstrap]
+
+        # What is the q_value model prediction given current state S, by definition if this is a
+        # terminal state all rewards are zero.
+        qva = self._actor_batch_prediction(xs[:n + nb])
+        qvs = qva[:n]
+        qvs[done] = 0
+
+        # The projected reward for taking greedy (legal) actions until the end of the episode.
+        qvp = np.zeros(n)
+        if nb > 0:
+            qvp[bootstrap] = ActionMask.max_legal(qva[n:], legal[bootstrap])
+
+        lr = self.learning_rate.learning_rate(self.episode)
+        rows = np.arange(n)
+        # updated expectation of current state/action
+        qvs[rows, actions] = (qvs[rows, actions] * (1 - lr)) + (lr * (rewards + (discounts * qvp)))
+
+        return x, qvs
 
     #
     # Actor is not trained, but instead clones the trainable parameters from the critic
     # after every n times the critic is trained on a replay memory batch.
     #
     def _update_actor_from_critic(self) -> None:
-        self.actor_model.clone_weights(self.critic_model)
+        self.actor_model.sync_weights(self.critic_model, self.tau)
+        self.__loss_monitor.actor_updated()
         self.lg.debug("Update Actor From Critic")
         return
 
@@ -396,26 +652,10 @@ class ActorCriticPolicyTDQVal(Policy):
             self.critic_model.train(rw, cl)
             trained = True
             self.lg.debug("Critic Trained")
-            self._model_loss(self.critic_model)
-            self.update_telemetry_for_training_batch(rw)
+            self.update_telemetry_for_training_batch(rw)  # before rw (a batch buffer view) is re-used for eval
+            self.__loss_monitor.trained(self._batch_targets, self.critic_model.evaluate)
         return trained
 
-    #
-    # Establish the model loss
-    #
-    def _model_loss(self,
-                    mdl) -> float:
-        rw, cl = self._get_sample_batch()
-        loss = None
-        if rw is not None:
-            scores = mdl.evaluate(rw, cl)
-            if type(scores) == list:
-                loss = scores[0]
-            else:
-                loss = scores
-            print("Loss: {}".format(loss))
-        return loss
-
     #
     # Indirection to exploration factor so we can turn exploration on/off so when we play
     # we only play greedy actions.
@@ -455,6 +695,13 @@ class ActorCriticPolicyTDQVal(Policy):
                                  [ModelParams.gamma, float(0.8)],
                                  [ModelParams.verbose, int(0)],
                                  [ModelParams.train_every, int(100)],
+                                 [ModelParams.n_step, int(1)],  # 1 = single step TD as before
+                                 [ModelParams.discount_returns, False],  # False = rewards not discounted as before
+                                 [ModelParams.loss_eval_every, int(10)],  # Critic trainings between loss evaluation
+                                 [ModelParams.loss_eval_size, int(64)],  # Memories in the loss evaluation set
+                                 [ModelParams.loss_hold_out_every, int(10)],  # Episodes between held out episodes
+                                 [ModelParams.learner_mode, cls.LEARNER_INLINE],
+                                 [ModelParams.tau, float(1)],
                                  [ModelParams.num_states, int(1)]  # Env Specific - should be overridden
                                  ],
                                 )
@@ -1,5 +1,7 @@
 import logging
-from collections import deque
+from collections import OrderedDict
+
+import numpy as np
 
 from reflrn.Interface.ExplorationMemory import ExplorationMemory
 from reflrn.Interface.Policy import Policy
@@ -7,20 +9,34 @@ from reflrn.Interface.State import State
 
 
 #
-# Store memories in a DEQUE and index such that memories can be extracted by episode id or Memory Type
+# Store memories in a fixed size ring and index such that memories can be extracted by episode id or Memory Type
+#
+# Every memory is given a monotonic sequence number, the memory with sequence number s is held in ring slot
+# s % size and is in memory while s >= the base (oldest retained) sequence number. Episodes are indexed by the
+# sequence numbers of their first and (one past) last memory so they stay valid as the ring wraps, and when the
+# last memory of an episode is overwritten the episode is pruned from all of the indexes.
 #
 
 class AgentExplorationMemory(ExplorationMemory):
     __START = 0
     __END = 1
+    __OPEN = -1
+
+    __column_types = {ExplorationMemory.Memory.EPISODE: np.int64,
+                      ExplorationMemory.Memory.ACTION: np.int64,
+                      ExplorationMemory.Memory.REWARD: np.float64,
+                      ExplorationMemory.Memory.EPISODE_COMPLETE: np.bool_}
 
     #
-    # Initialise the Deque to requested size.
+    # Initialise the ring to requested size.
     #
     def __init__(self,
                  lg: logging,
                  replay_mem_size: int = 100000):  # 100K Entries Max
-        self.__memory = deque([], maxlen=replay_mem_size)
+        self.__size = replay_mem_size
+        self.__memory = [None] * replay_mem_size
+        self.__base_seq = 0  # Sequence number of the oldest memory held
+        self.__next_seq = 0  # Sequence number the next memory will be given
         self.__lg = lg
         self.__index = dict()
         self.__index[ExplorationMemory.Memory.EPISODE] = dict()
@@ -28,11 +44,12 @@ class AgentExplorationMemory(ExplorationMemory):
         self.__index[ExplorationMemory.Memory.AGENT] = dict()
         self.__index[ExplorationMemory.Memory.STATE] = dict()
         self.__index[ExplorationMemory.Memory.ACTION] = dict()
+        self.__episode_keys = dict()  # The (index type, key) pairs each episode appears under, for pruning
         self.__current_episode_id = None
         return
 
     #
-    # Add to the DEQUE and index.
+    # Add to the ring and index.
     #
     def add(self,
             episode_id: int,
@@ -44,20 +61,25 @@ class AgentExplorationMemory(ExplorationMemory):
             reward: float,
             episode_complete: bool):
 
+        if self.__next_seq - self.__base_seq == self.__size:
+            self.__evict_oldest()
+
         # Added in the order of the offsets as defined in
         # ExplorationMemory.Memory
-        self.__memory.append((episode_id,
-                              policy,
-                              agent_name,
-                              state,
-                              next_state,
-                              action,
-                              reward,
-                              episode_complete)
-                             )
+        seq = self.__next_seq
+        self.__memory[seq % self.__size] = (episode_id,
+                                            policy,
+                                            agent_name,
+                                            state,
+                                            next_state,
+                                            action,
+                                            reward,
+                                            episode_complete)
+        self.__next_seq += 1
+
         # A subset of the overall fields are indexed as per the ExplorationMemory.SUPPORTED_GETBY_INDEX list.
         # in addition was always add the episode as an index.
-        self.__track_episodes(episode_id)
+        self.__track_episodes(episode_id, seq)
         self.__update_index(ExplorationMemory.Memory.POLICY, policy, episode_id)
         self.__update_index(ExplorationMemory.Memory.AGENT, agent_name, episode_id)
         self.__update_index(ExplorationMemory.Memory.STATE, state, episode_id)
@@ -69,10 +91,13 @@ class AgentExplorationMemory(ExplorationMemory):
     # Get the set of memories for the given memory type that can be found in the
     # given episode.
     #
+    # If columnar the result is a list of one numpy array per memory field, in ExplorationMemory.Memory order.
+    #
     def get_memories_by_type(self,
                              get_by: ExplorationMemory.Memory,
                              value: object,
-                             last_only: bool = False
+                             last_only: bool = False,
+                             columnar: bool = False
                              ) -> [[], [], [], [], [], [], [], []]:
 
         if get_by not in ExplorationMemory.SUPPORTED_GETBY_INDEX:
@@ -83,25 +108,35 @@ class AgentExplorationMemory(ExplorationMemory):
                                                                   last_only
                                                                   ),
                                    get_by,
-                                   value
+                                   value,
+                                   columnar
                                    )
 
     #
     # Get the set of memories that correspond to the given episode.
     #
-    def get_memories_by_episode(self, episode: int) -> [[], [], [], [], [], [], [], []]:
-        return self.__get_memories([episode])
+    def get_memories_by_episode(self,
+                                episode: int,
+                                columnar: bool = False) -> [[], [], [], [], [], [], [], []]:
+        return self.__get_memories([episode], columnar=columnar)
 
     #
-    # Keep track of the start and end of every episode in the Deque
+    # Number of memories currently held.
+    #
+    def len(self) -> int:
+        return self.__next_seq - self.__base_seq
+
+    #
+    # Keep track of the start and end (sequence number) of every episode
     #
     def __track_episodes(self,
-                         episode_id: int) -> None:
+                         episode_id: int,
+                         seq: int) -> None:
 
         if self.__current_episode_id != episode_id:
             if self.__current_episode_id is not None:
-                self.__episode_end(self.__current_episode_id, len(self.__memory) - 1)
-            self.__episode_start(episode_id, len(self.__memory) - 1)
+                self.__episode_end(self.__current_episode_id, seq)
+            self.__episode_start(episode_id, seq)
         return
 
     #
@@ -109,28 +144,57 @@ class AgentExplorationMemory(ExplorationMemory):
     #
     def __episode_start(self,
                         episode_id: int,
-                        start_idx: int) -> None:
+                        start_seq: int) -> None:
 
         if episode_id not in self.__index[ExplorationMemory.Memory.EPISODE]:
-            self.__index[ExplorationMemory.Memory.EPISODE][episode_id] = [start_idx, -1]
+            self.__index[ExplorationMemory.Memory.EPISODE][episode_id] = [start_seq, self.__OPEN]
+            self.__episode_keys[episode_id] = list()
             self.__current_episode_id = episode_id
         return
 
     #
-    # Record the start position of a new episode
+    # Record the end position of an episode
     #
     def __episode_end(self,
                       episode_id: int,
-                      end_idx: int) -> None:
+                      end_seq: int) -> None:
 
-        eidx = self.__index[ExplorationMemory.Memory.EPISODE][episode_id]
-        eidx[self.__END] = end_idx
-        self.__index[ExplorationMemory.Memory.EPISODE][episode_id] = eidx
+        eidx = self.__index[ExplorationMemory.Memory.EPISODE].get(episode_id, None)
+        if eidx is not None:
+            eidx[self.__END] = end_seq
+        return
+
+    #
+    # Drop the oldest memory, if it was the last memory held for its episode then prune that
+    # episode from all indexes.
+    #
+    def __evict_oldest(self) -> None:
+        slot = self.__base_seq % self.__size
+        episode_id = self.__memory[slot][ExplorationMemory.Memory.EPISODE]
+        self.__memory[slot] = None
+        self.__base_seq += 1
+
+        eidx = self.__index[ExplorationMemory.Memory.EPISODE].get(episode_id, None)
+        if eidx is not None and eidx[self.__END] != self.__OPEN and eidx[self.__END] <= self.__base_seq:
+            self.__prune_episode(episode_id)
+        return
 
+    #
+    # Remove the episode from the episode index and every key index it appears in.
+    #
+    def __prune_episode(self,
+                        episode_id: int) -> None:
+        del self.__index[ExplorationMemory.Memory.EPISODE][episode_id]
+        for idx_type, idx_key in self.__episode_keys.pop(episode_id, []):
+            episodes = self.__index[idx_type].get(idx_key, None)
+            if episodes is not None:
+                episodes.pop(episode_id, None)
+                if len(episodes) == 0:
+                    del self.__index[idx_type][idx_key]
         return
 
     #
-    # Keep a track of all the episodes the given key appears in.
+    # Keep a track of all the episodes the given key appears in, as an insertion ordered set.
     #
     def __update_index(self,
                        idx_type: ExplorationMemory.Memory,
@@ -138,9 +202,11 @@ class AgentExplorationMemory(ExplorationMemory):
                        episode_id: int) -> None:
 
         if idx_key not in self.__index[idx_type]:
-            self.__index[idx_type][idx_key] = list()
+            self.__index[idx_type][idx_key] = OrderedDict()
         if episode_id not in self.__index[idx_type][idx_key]:
-            self.__index[idx_type][idx_key].append(episode_id)
+            self.__index[idx_type][idx_key][episode_id] = None
+            if episode_id in self.__episode_keys:
+                self.__episode_keys[episode_id].append((idx_type, idx_key))
         return
 
     #
@@ -157,7 +223,7 @@ class AgentExplorationMemory(ExplorationMemory):
         episodes = None
         if get_by in self.__index:
             if value in self.__index[get_by]:
-                episodes = self.__index[get_by][value]
+                episodes = list(self.__index[get_by][value].keys())
 
         if episodes is not None and last_only:
             episodes = [episodes[-1]]
@@ -165,42 +231,50 @@ class AgentExplorationMemory(ExplorationMemory):
         return episodes
 
     #
-    # Return all the Deque entries for the given list of episode id's
+    # Return all the memories for the given list of episode id's
     #
     def __get_memories(self,
                        episodes: [],
                        get_by: ExplorationMemory.Memory = None,
-                       value: object = None) -> [[], [], [], [], [], [], [], []]:
+                       value: object = None,
+                       columnar: bool = False) -> [[], [], [], [], [], [], [], []]:
 
         if episodes is None:
             return None
 
-        episode_deque = deque([])
-        sorted_episodes = sorted(episodes)
-        for episode in sorted_episodes:
+        memories = list()
+        for episode in sorted(episodes):
             if episode not in self.__index[ExplorationMemory.Memory.EPISODE]:
                 raise ExplorationMemory.ExplorationMemoryNoSuchEpisode(str(episode) + " does not exist in memory")
-            st_idx, ed_idx = self.__index[ExplorationMemory.Memory.EPISODE][episode]
-            if ed_idx == -1:
-                ed_idx = len(self.__memory)
-            for idx in range(st_idx, ed_idx):
-                if get_by is not None and value is not None:
-                    if self.__memory_match(self.__memory[idx], get_by, value):
-                        episode_deque.append(self.__memory[idx])
-                else:
-                    episode_deque.append(self.__memory[idx])
-
-        cols = [[None for i in range(8)] for j in
-                range(len(episode_deque))]  # episode_id, policy, agent, curr_coords, next_state,
-        # action,
-        # reward
-        i = 0
-        j = 0
-        for mem in episode_deque:
-            for j in range(0, len(mem)):
-                cols[i][j] = mem[j]
-            i += 1
+            st_seq, ed_seq = self.__index[ExplorationMemory.Memory.EPISODE][episode]
+            st_seq = max(st_seq, self.__base_seq)  # Start of the episode may have been overwritten
+            if ed_seq == self.__OPEN:
+                ed_seq = self.__next_seq
+            episode_memories = [self.__memory[seq % self.__size] for seq in range(st_seq, ed_seq)]
+            if get_by is not None and value is not None:
+                episode_memories = [m for m in episode_memories if self.__memory_match(m, get_by, value)]
+            memories.extend(episode_memories)
+
+        if columnar:
+            return self.__as_columns(memories)
+        return [list(mem) for mem in memories]
 
+    #
+    # Convert the list of memories to a list of numpy arrays, one per field in ExplorationMemory.Memory order.
+    #
+    @classmethod
+    def __as_columns(cls,
+                     memories: []) -> [np.ndarray]:
+        cols = list()
+        for mem_type in ExplorationMemory.Memory.MEM_TYPES:
+            col_type = cls.__column_types.get(mem_type, None)
+            if col_type is not None:
+                col = np.array([mem[mem_type] for mem in memories], dtype=col_type)
+            else:
+                col = np.empty(len(memories), dtype=object)  # Element wise so sequence like objects are kept whole
+                for i, mem in enumerate(memories):
+                    col[i] = mem[mem_type]
+            cols.append(col)
         return cols
 
     #
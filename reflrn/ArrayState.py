@@ -0,0 +1,36 @@
+import numpy as np
+
+from reflrn.Interface.State import State
+
+
+#
+# A minimal immutable State that simply wraps the numpy array form of a state. This is what is
+# handed back by replay memories that only persist the array encoding of a state and so have no
+# environment specific State object to rebuild.
+#
+
+class ArrayState(State):
+
+    def __init__(self,
+                 state_as_array: np.ndarray):
+        self.__st = np.array(state_as_array, copy=True)  # State must be immutable
+        self.__st.setflags(write=False)
+        return
+
+    #
+    # An environment specific representation for Env. State
+    #
+    def state(self) -> object:
+        return self.__st
+
+    #
+    # An string representation of the environment state
+    #
+    def state_as_string(self) -> str:
+        return np.array2string(np.reshape(self.__st, np.size(self.__st)), separator=',')
+
+    #
+    # The array form of the state, as given at construction.
+    #
+    def state_as_array(self) -> np.ndarray:
+        return self.__st
@@ -0,0 +1,90 @@
+import logging
+import threading
+from typing import Callable
+
+
+#
+# Run a learner step function on a background thread each time a step is requested.
+#
+# Requests made while a step is running are coalesced into a single following step, so the requesting
+# (acting) thread never waits on the learner. If a step fails the error is logged and raised in the
+# requesting thread at the next request.
+#
+
+class AsyncLearner:
+
+    def __init__(self,
+                 lg: logging,
+                 step: Callable[[], None],
+                 name: str = "Learner"):
+        self.__lg = lg
+        self.__step = step
+        self.__name = name
+        self.__requested = threading.Event()
+        self.__stopping = threading.Event()
+        self.__thread = None
+        self.__steps = 0
+        self.__error = None
+        return
+
+    #
+    # Start the learner thread.
+    #
+    def start(self) -> None:
+        if self.__thread is not None:
+            raise RuntimeError("Learner [" + self.__name + "] already started")
+        self.__stopping.clear()
+        self.__thread = threading.Thread(target=self.__run, name=self.__name, daemon=True)
+        self.__thread.start()
+        return
+
+    #
+    # Ask for a learner step to be run.
+    #
+    def request_step(self) -> None:
+        if self.__error is not None:
+            raise AsyncLearner.LearnerFailed("Learner [" + self.__name + "] failed") from self.__error
+        self.__requested.set()
+        return
+
+    #
+    # Stop the learner thread, any step in progress is allowed to complete.
+    #
+    def stop(self,
+             timeout: float = None) -> None:
+        if self.__thread is not None:
+            self.__stopping.set()
+            self.__requested.set()
+            self.__thread.join(timeout)
+            self.__thread = None
+        return
+
+    #
+    # The number of learner steps completed.
+    #
+    def steps(self) -> int:
+        return self.__steps
+
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def __run(self) -> None:
+        while not self.__stopping.is_set():
+            self.__requested.wait()
+            self.__requested.clear()
+            if self.__stopping.is_set():
+                break
+            try:
+                self.__step()
+                self.__steps += 1
+            except Exception as exc:
+                self.__lg.error("Learner [" + self.__name + "] step failed: " + str(exc))
+                self.__error = exc
+                break
+        return
+
+    # The learner thread stopped on an error.
+    #
+    class LearnerFailed(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
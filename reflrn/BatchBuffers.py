@@ -0,0 +1,36 @@
+import numpy as np
+
+from reflrn.DTypePolicy import DTypePolicy
+
+
+#
+# Named, re-usable batch buffers.
+#
+# A buffer is allocated the first time it is asked for and then re-used for every following batch, it is only
+# re-allocated if a larger batch or a different width is asked for. The buffer is returned as a view of the
+# first rows so the contents are only valid until the next get of the same name, and are not cleared.
+#
+
+class BatchBuffers:
+
+    def __init__(self,
+                 dtype=DTypePolicy.float_dtype):
+        self.__dtype = np.dtype(dtype)
+        self.__buffers = dict()
+        return
+
+    #
+    # A [rows, cols] view onto the named buffer.
+    #
+    def get(self,
+            name: str,
+            rows: int,
+            cols: int) -> np.ndarray:
+        buf = self.__buffers.get(name, None)
+        if buf is None or buf.shape[0] < rows or buf.shape[1] != cols:
+            buf = np.empty((rows, cols), dtype=self.__dtype)
+            self.__buffers[name] = buf
+        return buf[:rows]
+
+    def dtype(self) -> np.dtype:
+        return self.__dtype
@@ -0,0 +1,145 @@
+import logging
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from reflrn.Interface.MetricsSink import MetricsSink
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+
+
+#
+# Track the loss of a critic model against a fixed evaluation set of memories.
+#
+# The evaluation set is held out of training. Memories are offered to hold_out() before they are added to the
+# training replay memory, every hold_out_every'th episode is diverted (whole, so n-step returns are not broken)
+# into the evaluation memory until it holds eval_set_size memories. The caller must not add a held out memory
+# to the training replay memory.
+#
+# The evaluation set is drawn from the evaluation memory once it is full, the training targets for it depend
+# on the actor so are only rebuilt after the actor has been updated. The loss is evaluated every
+# evaluate_every trainings and recorded in the metrics sink.
+#
+
+class CriticLossMonitor:
+
+    def __init__(self,
+                 lg: logging,
+                 eval_memory: ReplayMemory,
+                 metrics_sink: MetricsSink,
+                 evaluate_every: int = 10,
+                 eval_set_size: int = 64,
+                 hold_out_every: int = 10,
+                 metric_name: str = "critic_loss"):
+        if evaluate_every < 1:
+            raise ValueError("evaluate_every must be >= 1")
+        if hold_out_every < 1:
+            raise ValueError("hold_out_every must be >= 1")
+        self.__lg = lg
+        self.__eval_memory = eval_memory
+        self.__metrics_sink = metrics_sink
+        self.__evaluate_every = evaluate_every
+        self.__eval_set_size = eval_set_size
+        self.__hold_out_every = hold_out_every
+        self.__metric_name = metric_name
+        self.__episode = 0
+        self.__in_episode = False
+        self.__holding = False
+        self.__eval_set = None
+        self.__x = None
+        self.__y = None
+        self.__targets_stale = True
+        self.__train_count = 0
+        return
+
+    #
+    # The actor has been updated, so targets for the evaluation set must be rebuilt before next use.
+    #
+    def actor_updated(self) -> None:
+        self.__targets_stale = True
+        return
+
+    #
+    # Offer a memory before it is added to the training replay memory.
+    #
+    # return True if the memory has been held out for evaluation, in which case it must not be trained on.
+    #
+    def hold_out(self,
+                 state: State,
+                 next_state: State,
+                 action: int,
+                 reward: float,
+                 episode_complete: bool) -> bool:
+        if not self.__in_episode:
+            self.__in_episode = True
+            self.__episode += 1
+            self.__holding = (self.__episode % self.__hold_out_every == 0 and
+                              self.__eval_memory.len() < self.__eval_set_size)
+        held = self.__holding
+        if held:
+            self.__eval_memory.append_memory(state, next_state, action, reward, episode_complete)
+        if episode_complete:
+            self.end_episode()
+        return held
+
+    #
+    # The episode is over, close the open episode of the evaluation memory (if it holds one and the episode
+    # was held out) as the last memory offered may not have been flagged episode complete.
+    #
+    def end_episode(self) -> None:
+        if self.__in_episode:
+            if self.__holding:
+                end_episode = getattr(self.__eval_memory, 'end_episode', None)
+                if end_episode is not None:
+                    end_episode()
+            self.__in_episode = False
+            self.__holding = False
+        return
+
+    #
+    # Drop the current evaluation set, a new one will be drawn from the evaluation memory at the next
+    # evaluation.
+    #
+    def reset_evaluation_set(self) -> None:
+        self.__eval_set = None
+        self.__targets_stale = True
+        return
+
+    #
+    # Note that the critic has been trained, and if due evaluate its loss.
+    #
+    # build_targets : given a list of memories return the (x, y) to evaluate against, these may be views onto
+    #                 re-used batch buffers so are copied.
+    # evaluate : given (x, y) return the loss (or [loss, metrics..]) of the model.
+    #
+    # return the loss if evaluated else None
+    #
+    def trained(self,
+                build_targets: Callable[[List], Tuple[np.ndarray, np.ndarray]],
+                evaluate: Callable[[np.ndarray, np.ndarray], object]) -> float:
+        self.__train_count += 1
+        if self.__train_count % self.__evaluate_every != 0:
+            return None
+
+        if self.__eval_set is None:
+            if self.__eval_memory.len() < self.__eval_set_size:
+                return None  # Not enough held out to evaluate yet, try again next time
+            self.__eval_set = self.__eval_memory.get_random_memories(self.__eval_set_size)
+            self.__targets_stale = True
+        if self.__targets_stale:
+            x, y = build_targets(self.__eval_set)
+            if x is not None:
+                x, y = np.copy(x), np.copy(y)
+            self.__x, self.__y = x, y
+            self.__targets_stale = False
+        if self.__x is None:
+            return None
+
+        scores = evaluate(self.__x, self.__y)
+        if type(scores) == list:
+            loss = scores[0]
+        else:
+            loss = scores
+        loss = float(loss)
+        self.__metrics_sink.record(self.__metric_name, self.__train_count, loss)
+        return loss
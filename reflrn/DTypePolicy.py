@@ -0,0 +1,73 @@
+import numpy as np
+
+
+#
+# The dtypes used for network inputs across reflrn.
+#
+# All network inputs are float32 at source (the dtype the Keras models compute in) so batches are not cast on
+# every call. Boards may optionally be held as int8, they are then widened to float32 once as they are written
+# into the (float32) batch buffers.
+#
+# In assert mode any float64 array handed to a model raises Float64Promotion, this flags code that has
+# accidentally promoted an input (e.g. np.zeros without a dtype) rather than silently paying for the cast.
+#
+
+class DTypePolicy:
+    float_dtype = np.dtype(np.float32)
+
+    __board_dtypes = (np.dtype(np.float32), np.dtype(np.int8))
+    __board_dtype = np.dtype(np.float32)
+    __assert_mode = False
+
+    class Float64Promotion(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
+
+    #
+    # The dtype board (state) arrays are created with, float32 or int8.
+    #
+    @classmethod
+    def board_dtype(cls) -> np.dtype:
+        return cls.__board_dtype
+
+    @classmethod
+    def set_board_dtype(cls,
+                        dtype) -> None:
+        dt = np.dtype(dtype)
+        if dt not in cls.__board_dtypes:
+            raise ValueError("Board dtype must be one of " + str([str(d) for d in cls.__board_dtypes]) +
+                             " given [" + str(dt) + "]")
+        cls.__board_dtype = dt
+        return
+
+    #
+    # When True a float64 model input raises Float64Promotion.
+    #
+    @classmethod
+    def assert_mode(cls) -> bool:
+        return cls.__assert_mode
+
+    @classmethod
+    def set_assert_mode(cls,
+                        on: bool) -> None:
+        cls.__assert_mode = on
+        return
+
+    #
+    # The given array as a network input, no copy is made if it is already float32.
+    #
+    @classmethod
+    def as_input(cls,
+                 x,
+                 where: str = "model input") -> np.ndarray:
+        if cls.__assert_mode and np.asarray(x).dtype == np.float64:
+            raise DTypePolicy.Float64Promotion("float64 passed as " + where + ", expected " + str(cls.float_dtype))
+        return np.asarray(x, dtype=cls.float_dtype)
+
+    #
+    # The given array as a board of the configured board dtype.
+    #
+    @classmethod
+    def as_board(cls,
+                 x) -> np.ndarray:
+        return np.asarray(x, dtype=cls.__board_dtype)
@@ -0,0 +1,175 @@
+import logging
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+from reflrn.Interface.StateEncoder import StateEncoder
+from reflrn.StateDictionary import StateDictionary
+
+
+#
+# Replay memory that stores each memory as a row of small numpy columns, where states are held as the
+# integer code given by a StateEncoder. The State objects themselves are held once per distinct state in a
+# (shareable) StateDictionary, each memory holds a reference to its two states which is released when the
+# memory is overwritten.
+#
+# get_random_memories returns the usual [episode, state, next_state, action, reward, complete] records,
+# get_random_batch returns the columns with the network inputs rebuilt in bulk from the codes.
+#
+
+class EncodedReplayMemory(ReplayMemory):
+    # Memory List Entry Off Sets
+    mem_episode_id = 0
+    mem_state = 1
+    mem_next_state = 2
+    mem_action = 3
+    mem_reward = 4
+    mem_complete = 5
+
+    def __init__(self,
+                 lg: logging,
+                 replay_mem_size: int,
+                 state_encoder: StateEncoder,
+                 state_dictionary: StateDictionary = None):
+        self.__lg = lg
+        self.__capacity = replay_mem_size
+        self.__encoder = state_encoder
+        self.__states = state_dictionary
+        if self.__states is None:
+            self.__states = StateDictionary()
+
+        code_shape = (replay_mem_size,) + tuple(state_encoder.code_shape())
+        self.__episode = np.zeros(replay_mem_size, dtype=np.int32)
+        self.__state = np.zeros(code_shape, dtype=state_encoder.code_dtype())
+        self.__next_state = np.zeros(code_shape, dtype=state_encoder.code_dtype())
+        self.__action = np.zeros(replay_mem_size, dtype=np.int16)
+        self.__reward = np.zeros(replay_mem_size, dtype=np.float32)
+        self.__complete = np.zeros(replay_mem_size, dtype=np.bool_)
+
+        self.__head = 0
+        self.__count = 0
+        self.__episode_id = 0
+        return
+
+    #
+    # The dictionary of states referred to by this memory.
+    #
+    def state_dictionary(self) -> StateDictionary:
+        return self.__states
+
+    #
+    # Add a memory to the reply memory, but tag it with the episode id such that whole episodes
+    # can later be recovered for training.
+    #
+    def append_memory(self,
+                      state: State,
+                      next_state: State,
+                      action: int,
+                      reward: float,
+                      episode_complete: bool) -> None:
+        sc = self.__encoder.encode(state)
+        nsc = self.__encoder.encode(next_state)
+        self.__states.add(sc, state)
+        self.__states.add(nsc, next_state)
+
+        i = self.__head
+        if self.__count == self.__capacity:  # evict the oldest memory
+            self.__states.release(self.__state[i])
+            self.__states.release(self.__next_state[i])
+        self.__episode[i] = self.__episode_id
+        self.__state[i] = sc
+        self.__next_state[i] = nsc
+        self.__action[i] = action
+        self.__reward[i] = reward
+        self.__complete[i] = episode_complete
+
+        self.__head = (self.__head + 1) % self.__capacity
+        self.__count = min(self.__count + 1, self.__capacity)
+        if episode_complete:
+            self.__episode_id += 1
+        return
+
+    #
+    # How many items in the replay memory
+    #
+    def len(self) -> int:
+        return self.__count
+
+    #
+    # Return the memory at the given slot as a list
+    #
+    def __memory(self, i: int) -> [int, State, State, int, float, bool]:
+        return [int(self.__episode[i]),
+                self.__states.get(self.__state[i]),
+                self.__states.get(self.__next_state[i]),
+                int(self.__action[i]),
+                float(self.__reward[i]),
+                bool(self.__complete[i])]
+
+    def __random_indices(self, sample_size: int) -> np.ndarray:
+        return np.random.choice(self.__count, min(self.__count, sample_size), replace=False)
+
+    #
+    # Get a random set of memories
+    #
+    # return list of elements [episode, curr_state, next_state, action, reward, complete]
+    #
+    def get_random_memories(self,
+                            sample_size: int) -> [[int, State, State, int, float, bool]]:
+        samples = [self.__memory(i) for i in self.__random_indices(sample_size)]
+        return random.sample(samples, len(samples))
+
+    #
+    # Get a random set of memories as columns, with states and next states as network inputs
+    #
+    # return episode ids, state inputs, next state inputs, actions, rewards, complete flags
+    #
+    def get_random_batch(self,
+                         sample_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                    np.ndarray, np.ndarray, np.ndarray]:
+        return self.__batch(self.__random_indices(sample_size))
+
+    #
+    # As get_random_batch, with the list of next states appended for where they are needed as States (e.g. to
+    # ask the environment if they are terminal)
+    #
+    # return episode ids, state inputs, next state inputs, actions, rewards, complete flags, next states
+    #
+    def get_random_batch_with_next_states(self,
+                                          sample_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                                     np.ndarray, np.ndarray, np.ndarray,
+                                                                     List[State]]:
+        idx = self.__random_indices(sample_size)
+        return self.__batch(idx) + ([self.__states.get(code) for code in self.__next_state[idx]],)
+
+    #
+    # The memories at the given slots as columns, with states and next states as network inputs
+    #
+    def __batch(self, idx: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                np.ndarray, np.ndarray, np.ndarray]:
+        return (self.__episode[idx],
+                self.__encoder.decode_batch(self.__state[idx]),
+                self.__encoder.decode_batch(self.__next_state[idx]),
+                self.__action[idx],
+                self.__reward[idx],
+                self.__complete[idx])
+
+    #
+    # Get just the last memory with respect to the given state. If given state is
+    # None return the last memory overall.
+    #
+    def get_last_memory(self, state: State = None) -> [int, State, State, int, float, bool]:
+        if self.__count == 0:
+            return None
+        # Slots from most to least recent.
+        order = (self.__head - 1 - np.arange(self.__count)) % self.__capacity
+        if state is None:
+            return self.__memory(int(order[0]))
+        sc = self.__encoder.encode(state)
+        match = (self.__state[order] == sc).reshape(self.__count, -1).all(axis=1)
+        if not match.any():
+            return None
+        return self.__memory(int(order[int(np.argmax(match))]))
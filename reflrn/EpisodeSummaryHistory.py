@@ -0,0 +1,168 @@
+import numpy as np
+
+
+#
+# Per episode summaries kept as running totals that are updated as each step is taken, so closing an episode
+# costs the same however long the episode was.
+#
+# Closed episodes are appended as rows to a columnar history (one numpy array per column that grows by
+# doubling), so whole columns can be queried or exported in one go.
+#
+# Columns:
+#   episode : the episode id given when the episode was closed
+#   length : number of steps taken
+#   total_reward : sum of rewards over the episode
+#   min_reward, max_reward : smallest and largest single step reward, nan for an episode with no steps
+#   distinct_states : number of different states (by state as string) seen in the episode
+#
+# Environment specific columns can be added by name and numpy dtype, their values are given when each episode is
+# closed.
+#
+
+class EpisodeSummaryHistory:
+    EPISODE = 'episode'
+    LENGTH = 'length'
+    TOTAL_REWARD = 'total_reward'
+    MIN_REWARD = 'min_reward'
+    MAX_REWARD = 'max_reward'
+    DISTINCT_STATES = 'distinct_states'
+    __columns = {EPISODE: np.int64,
+                 LENGTH: np.int64,
+                 TOTAL_REWARD: np.float64,
+                 MIN_REWARD: np.float64,
+                 MAX_REWARD: np.float64,
+                 DISTINCT_STATES: np.int64}
+
+    class UnknownColumn(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
+
+    def __init__(self,
+                 initial_capacity: int = 1024,
+                 extra_columns: dict = None):
+        self.__column_types = dict(self.__columns)
+        self.__extra_columns = list()
+        if extra_columns is not None:
+            for name, dtype in extra_columns.items():
+                if name in self.__column_types:
+                    raise ValueError("Episode summary column [" + name + "] already exists")
+                self.__column_types[name] = dtype
+                self.__extra_columns.append(name)
+        self.__num_rows = 0
+        self.__history = {name: np.zeros(max(1, initial_capacity), dtype=dtype)
+                          for name, dtype in self.__column_types.items()}
+        self.__reset_episode()
+        return
+
+    #
+    # Start the running totals for a new episode.
+    #
+    def __reset_episode(self) -> None:
+        self.__length = 0
+        self.__total_reward = float(0)
+        self.__min_reward = float('inf')
+        self.__max_reward = float('-inf')
+        self.__states = set()
+        return
+
+    #
+    # Add a step from the given state to the given next state (states by their string form) to the current
+    # episode.
+    #
+    def step(self,
+             state: str,
+             next_state: str,
+             reward: float) -> None:
+        self.__length += 1
+        self.__total_reward += reward
+        if reward < self.__min_reward:
+            self.__min_reward = reward
+        if reward > self.__max_reward:
+            self.__max_reward = reward
+        self.__states.add(state)
+        self.__states.add(next_state)
+        return
+
+    #
+    # Number of steps in the (still open) current episode.
+    #
+    def current_length(self) -> int:
+        return self.__length
+
+    #
+    # Sum of rewards in the (still open) current episode.
+    #
+    def current_total_reward(self) -> float:
+        return self.__total_reward
+
+    #
+    # Close the current episode, add it to the history and return its row as a dictionary by column name. A
+    # value must be given for every extra column.
+    #
+    def close_episode(self,
+                      episode: int,
+                      extra_values: dict = None) -> dict:
+        extra_values = extra_values if extra_values is not None else dict()
+        for name in extra_values:
+            if name not in self.__extra_columns:
+                raise EpisodeSummaryHistory.UnknownColumn("No extra episode summary column [" + name + "]")
+        for name in self.__extra_columns:
+            if name not in extra_values:
+                raise ValueError("No value given for episode summary column [" + name + "]")
+        if self.__num_rows == self.__history[self.EPISODE].size:
+            for name in self.__history:
+                self.__history[name] = np.concatenate([self.__history[name],
+                                                       np.zeros_like(self.__history[name])])
+        row = {self.EPISODE: episode,
+               self.LENGTH: self.__length,
+               self.TOTAL_REWARD: self.__total_reward,
+               self.MIN_REWARD: self.__min_reward if self.__length > 0 else np.nan,
+               self.MAX_REWARD: self.__max_reward if self.__length > 0 else np.nan,
+               self.DISTINCT_STATES: len(self.__states)}
+        row.update(extra_values)
+        for name, value in row.items():
+            self.__history[name][self.__num_rows] = value
+        self.__num_rows += 1
+        self.__reset_episode()
+        return row
+
+    def num_episodes(self) -> int:
+        return self.__num_rows
+
+    def column_names(self):
+        return list(self.__column_types.keys())
+
+    #
+    # All closed episodes for the named column, read only view.
+    #
+    def column(self,
+               name: str) -> np.ndarray:
+        if name not in self.__history:
+            raise EpisodeSummaryHistory.UnknownColumn("No episode summary column [" + name + "]")
+        col = self.__history[name][:self.__num_rows]
+        col.setflags(write=False)
+        return col
+
+    #
+    # The closed episodes as a dictionary of column name to a copy of the column.
+    #
+    def as_columns(self) -> dict:
+        return {name: self.column(name).copy() for name in self.__column_types}
+
+    #
+    # Export all closed episodes as a compressed numpy archive of the columns.
+    #
+    def save(self,
+             file_name: str) -> None:
+        with open(file_name, 'wb') as f:
+            np.savez_compressed(f, **self.as_columns())
+        return
+
+    #
+    # Load the columns of an exported history.
+    #
+    @classmethod
+    def load_columns(cls,
+                     file_name: str) -> dict:
+        with np.load(file_name) as arc:
+            return {name: arc[name] for name in arc.files}
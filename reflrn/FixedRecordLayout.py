@@ -0,0 +1,121 @@
+from typing import Callable
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.Interface.State import State
+
+
+#
+# The fixed size binary record used by replay memories that live outside of the Python heap (memory
+# mapped files, shared memory). Each record holds one [episode, state, next_state, action, reward, complete]
+# memory where the states are stored by their (flattened) array encoding.
+#
+# Field order matches the DequeReplayMemory mem_<?> offsets so decoded memories are interchangeable.
+#
+# States are rebuilt by the state_decoder, by default as an ArrayState which only gives back the array form.
+# Policies that pass the sampled states to their environment (episode_complete, actions, legal_action_mask)
+# need the environment's own State back, so must be given the environment's decoder, e.g.
+# TicTacToeStateDecoder or GridWorldStateDecoder.
+#
+
+class FixedRecordLayout:
+    EPISODE = 'episode'
+    STATE = 'state'
+    NEXT_STATE = 'next_state'
+    ACTION = 'action'
+    REWARD = 'reward'
+    COMPLETE = 'complete'
+    SEQ = 'seq'
+
+    def __init__(self,
+                 state_dim: int,
+                 state_encoder: Callable[[State], np.ndarray] = None,
+                 state_decoder: Callable[[np.ndarray], State] = None):
+        if state_dim is None or state_dim < 1:
+            raise ValueError("State dimension must be >= 1")
+        self.__state_dim = state_dim
+        self.__state_encoder = state_encoder
+        if self.__state_encoder is None:
+            self.__state_encoder = self.__default_encoder
+        self.__state_decoder = state_decoder
+        if self.__state_decoder is None:
+            self.__state_decoder = ArrayState
+        self.__dtype = np.dtype([(self.SEQ, np.int64),
+                                 (self.EPISODE, np.int64),
+                                 (self.STATE, np.float32, (state_dim,)),
+                                 (self.NEXT_STATE, np.float32, (state_dim,)),
+                                 (self.ACTION, np.int32),
+                                 (self.REWARD, np.float64),
+                                 (self.COMPLETE, np.bool_)])
+        return
+
+    #
+    # The numpy structured type of a single record.
+    #
+    @property
+    def dtype(self) -> np.dtype:
+        return self.__dtype
+
+    @property
+    def state_dim(self) -> int:
+        return self.__state_dim
+
+    #
+    # Write the given memory into slot idx of the given record array. The seq stamp is cleared first
+    # and written last so readers that check it never see a half written record as committed.
+    #
+    def write(self,
+              records: np.ndarray,
+              idx: int,
+              seq: int,
+              episode_id: int,
+              state: State,
+              next_state: State,
+              action: int,
+              reward: float,
+              episode_complete: bool) -> None:
+        st = self.__encode(state)
+        nst = self.__encode(next_state)
+        rec = records[idx:idx + 1]
+        rec[self.SEQ] = 0
+        rec[self.EPISODE] = episode_id
+        rec[self.STATE] = st
+        rec[self.NEXT_STATE] = nst
+        rec[self.ACTION] = action
+        rec[self.REWARD] = reward
+        rec[self.COMPLETE] = episode_complete
+        rec[self.SEQ] = seq
+        return
+
+    #
+    # Rebuild the memory held in the given record as [episode, state, next_state, action, reward, complete]
+    #
+    def read(self,
+             record) -> [int, State, State, int, float, bool]:
+        return [int(record[self.EPISODE]),
+                self.__state_decoder(np.array(record[self.STATE])),
+                self.__state_decoder(np.array(record[self.NEXT_STATE])),
+                int(record[self.ACTION]),
+                float(record[self.REWARD]),
+                bool(record[self.COMPLETE])]
+
+    #
+    # The flattened array form of the state as will be held in the record.
+    #
+    def encode(self,
+               state: State) -> np.ndarray:
+        return self.__encode(state)
+
+    def __encode(self,
+                 state: State) -> np.ndarray:
+        enc = np.asarray(self.__state_encoder(state), dtype=np.float32).reshape(-1)
+        if enc.size != self.__state_dim:
+            raise ValueError("State encodes to [" + str(enc.size) + "] values, record expects [" +
+                             str(self.__state_dim) + "]")
+        return enc
+
+    @classmethod
+    def __default_encoder(cls,
+                          state: State) -> np.ndarray:
+        return state.state_as_array()
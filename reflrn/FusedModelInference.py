@@ -0,0 +1,43 @@
+from typing import List
+
+import numpy as np
+from keras.layers import Input
+from keras.models import Model
+
+from reflrn.DTypePolicy import DTypePolicy
+
+
+#
+# A single inference graph over a set of Keras models that take the same input, e.g. an actor and a critic.
+#
+# Each model is called on one shared input tensor so a single predict returns the output of every model (head)
+# rather than one dispatch per model. The models are called as layers, so the fused graph holds the very same
+# weight variables as the models themselves; training, set_weights or load_weights on a model is seen by the
+# next fused prediction with no copy. Only if a model object is replaced (e.g. by keras.models.load_model) does
+# the fused graph need to be rebuilt.
+#
+
+class FusedModelInference:
+
+    def __init__(self,
+                 models: list,
+                 input_shape: tuple):
+        if len(models) == 0:
+            raise ValueError("At least one model is needed to build a fused inference graph")
+        self.__models = list(models)
+        inp = Input(shape=input_shape)
+        self.__fused = Model(inputs=inp, outputs=[m(inp) for m in self.__models])
+        return
+
+    #
+    # The output of every model for the batch x, in the order the models were given.
+    #
+    def predict(self,
+                x: np.ndarray) -> List[np.ndarray]:
+        out = self.__fused.predict_on_batch(DTypePolicy.as_input(x, "fused predict X"))
+        if len(self.__models) == 1:
+            out = [out]
+        return [np.asarray(o) for o in out]
+
+    def num_heads(self) -> int:
+        return len(self.__models)
@@ -0,0 +1,36 @@
+from typing import List, Tuple
+
+from reflrn.Interface.MetricsSink import MetricsSink
+
+
+#
+# Keep metrics in memory as a list of (step, value) per metric name.
+#
+
+class InMemoryMetricsSink(MetricsSink):
+
+    def __init__(self):
+        self.__metrics = dict()
+        return
+
+    def record(self,
+               name: str,
+               step: int,
+               value: float) -> None:
+        if name not in self.__metrics:
+            self.__metrics[name] = list()
+        self.__metrics[name].append((step, value))
+        return
+
+    #
+    # The (step, value) history of the named metric
+    #
+    def history(self,
+                name: str) -> List[Tuple[int, float]]:
+        return list(self.__metrics.get(name, list()))
+
+    #
+    # The names of all metrics recorded
+    #
+    def names(self) -> List[str]:
+        return list(self.__metrics.keys())
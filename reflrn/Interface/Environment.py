@@ -1,4 +1,7 @@
 import abc
+from typing import List
+
+import numpy as np
 
 from reflrn.Interface.State import State
 
@@ -36,6 +39,18 @@ class Environment(metaclass=abc.ABCMeta):
                 state: State = None) -> [int]:
         pass
 
+    #
+    # Boolean mask over all actions, True where the action is legal in the given state (or the current state
+    # if no state is supplied). Environments that can should override this with masks pre-computed or cached
+    # by state, this default builds the mask from actions(state).
+    #
+    def legal_action_mask(self,
+                          state: State = None) -> np.ndarray:
+        all_actions = np.fromiter(self.actions(), dtype=np.int64)
+        if state is None:
+            state = self.state()
+        return np.isin(all_actions, np.asarray(self.actions(state)))
+
     #
     # True if the current episode in the environment has reached a terminal point. If a state is supplied
     # the function returns True if the given state represents a terminal state.
@@ -45,6 +60,24 @@ class Environment(metaclass=abc.ABCMeta):
                          state: State = None) -> bool:
         pass
 
+    #
+    # Boolean [n], True where the given state is terminal. Environments that can should override this to
+    # test all of the states at once, this default asks episode_complete of each state.
+    #
+    def episode_complete_batch(self,
+                               states: List[State]) -> np.ndarray:
+        return np.fromiter((self.episode_complete(st) for st in states), dtype=np.bool_, count=len(states))
+
+    #
+    # Boolean mask [n, actions] of the legal actions in each of the given states. Environments that can should
+    # override this to build all of the masks at once, this default asks legal_action_mask of each state.
+    #
+    def legal_action_masks(self,
+                           states: List[State]) -> np.ndarray:
+        if len(states) == 0:
+            return np.zeros((0, len(self.actions())), dtype=np.bool_)
+        return np.stack([self.legal_action_mask(st) for st in states])
+
     #
     # Save the current Environment State
     #
@@ -0,0 +1,20 @@
+import abc
+
+
+#
+# Destination for training metrics such as model loss, so they can be logged, kept or exported rather
+# than printed.
+#
+
+
+class MetricsSink(metaclass=abc.ABCMeta):
+
+    #
+    # Record the value of the named metric at the given step.
+    #
+    @abc.abstractmethod
+    def record(self,
+               name: str,
+               step: int,
+               value: float) -> None:
+        pass
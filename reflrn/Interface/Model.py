@@ -62,6 +62,15 @@ class Model(metaclass=abc.ABCMeta):
     def get_weights(self):
         pass
 
+    #
+    # Update the weights of this model in place from an identical model, as a hard copy if tau = 1 else as a
+    # soft (Polyak) update weights = tau * model weights + (1 - tau) * weights.
+    #
+    def sync_weights(self, model: 'Model', tau: float = 1.0) -> None:
+        if tau != 1.0:
+            raise NotImplementedError("Soft weight sync is not supported by [" + type(self).__name__ + "]")
+        self.clone_weights(model)
+
     #
     # Load the current curr_coords of the model from a file that was saved
     # from the same Keras model architecture as the new_model method
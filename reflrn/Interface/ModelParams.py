@@ -21,6 +21,14 @@ class ModelParams(metaclass=abc.ABCMeta):
     verbose = 'verbose'
     num_states = 'num_states'
     train_every = ' train_every'
+    n_step = 'n_step'
+    loss_eval_every = 'loss_eval_every'
+    loss_eval_size = 'loss_eval_size'
+    loss_hold_out_every = 'loss_hold_out_every'
+    prediction_cache_size = 'prediction_cache_size'
+    learner_mode = 'learner_mode'
+    tau = 'tau'
+    discount_returns = 'discount_returns'
 
     #
     # Getter Methods For model parameters
@@ -61,6 +61,14 @@ class Policy(metaclass=abc.ABCMeta):
     def load(self, filename: str = None):
         pass
 
+    #
+    # The environment has ended the current episode. This is called whether or not the last update_policy
+    # for the episode was flagged episode_complete, which for multi agent environments it may not be. By
+    # default there is nothing to do.
+    #
+    def episode_complete(self, state: State) -> None:
+        return
+
     # Can only link to one environment in lifetime of policy.
     #
     class PolicyAlreadyLinkedToEnvironment(Exception):
@@ -10,6 +10,7 @@ import numpy as np
 
 
 class State(metaclass=abc.ABCMeta):
+    __slots__ = ()  # so implementations can be slotted
 
     #
     # An environment specific representation for Env. State
@@ -0,0 +1,42 @@
+import abc
+
+import numpy as np
+
+from reflrn.Interface.State import State
+
+
+#
+# Encode a State as a small fixed shape integer code so that replay memories can hold states compactly, and
+# rebuild the network (X) input for a batch of codes in one go.
+#
+
+
+class StateEncoder(metaclass=abc.ABCMeta):
+
+    #
+    # The numpy dtype of the code.
+    #
+    @abc.abstractmethod
+    def code_dtype(self) -> np.dtype:
+        pass
+
+    #
+    # The shape of the code for a single state, () for a scalar code.
+    #
+    @abc.abstractmethod
+    def code_shape(self) -> tuple:
+        pass
+
+    #
+    # The code for the given state.
+    #
+    @abc.abstractmethod
+    def encode(self, state: State) -> np.ndarray:
+        pass
+
+    #
+    # The network input for each of the given codes, shape [n, input dimension].
+    #
+    @abc.abstractmethod
+    def decode_batch(self, codes: np.ndarray) -> np.ndarray:
+        pass
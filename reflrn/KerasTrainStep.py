@@ -0,0 +1,58 @@
+from typing import Callable
+
+import numpy as np
+from keras import backend
+
+
+#
+# Train a compiled Keras model with train_on_batch rather than fit.
+#
+# fit builds callbacks and a data adapter and runs the epoch machinery on every call, which for the small
+# batches used here costs far more than the gradient steps. This does the same number of passes over the
+# batch (in shuffled mini batches of batch_size) and sets the learning rate on the optimizer directly from the
+# given schedule at the start of every pass, as a LearningRateScheduler callback would.
+#
+
+class KerasTrainStep:
+
+    def __init__(self,
+                 batch_size: int,
+                 passes: int):
+        self.__batch_size = batch_size
+        self.__passes = passes
+        self.__lr = None
+        self.__optimizer = None
+        return
+
+    #
+    # Train the model on (x, y), return the loss of the last step.
+    #
+    def train(self,
+              model,
+              x: np.ndarray,
+              y: np.ndarray,
+              lr_schedule: Callable[[], float]):
+        n = len(x)
+        loss = None
+        for _ in range(0, self.__passes):
+            self.__set_learning_rate(model, lr_schedule())
+            if n <= self.__batch_size:
+                loss = model.train_on_batch(x, y)
+            else:
+                idx = np.random.permutation(n)
+                for st in range(0, n, self.__batch_size):
+                    mb = idx[st:st + self.__batch_size]
+                    loss = model.train_on_batch(x[mb], y[mb])
+        return loss
+
+    #
+    # Only touch the optimizer when the learning rate (or the optimizer, e.g. after a load) changes.
+    #
+    def __set_learning_rate(self,
+                            model,
+                            lr: float) -> None:
+        if lr != self.__lr or model.optimizer is not self.__optimizer:
+            backend.set_value(model.optimizer.lr, lr)
+            self.__lr = lr
+            self.__optimizer = model.optimizer
+        return
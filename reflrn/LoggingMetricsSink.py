@@ -0,0 +1,24 @@
+import logging
+
+from reflrn.Interface.MetricsSink import MetricsSink
+
+
+#
+# Write metrics to the given logger.
+#
+
+class LoggingMetricsSink(MetricsSink):
+
+    def __init__(self,
+                 lg: logging,
+                 level: int = logging.INFO):
+        self.__lg = lg
+        self.__level = level
+        return
+
+    def record(self,
+               name: str,
+               step: int,
+               value: float) -> None:
+        self.__lg.log(self.__level, name + " [" + str(step) + "] : " + str(value))
+        return
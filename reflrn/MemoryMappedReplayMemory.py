@@ -0,0 +1,189 @@
+import logging
+import os
+import random
+from typing import Callable
+
+import numpy as np
+
+from reflrn.FixedRecordLayout import FixedRecordLayout
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+
+
+#
+# Replay memory held in a fixed record memory mapped file, so capacity is not bounded by RAM (the OS pages
+# records in as they are sampled) and the memory survives a restart of the training process. A re-opened
+# memory carries on from where the previous session stopped.
+#
+# Only the array form of states is held, give the environment's state_decoder (see FixedRecordLayout) so the
+# memories restored from file can be trained on by a policy linked to that environment.
+#
+# File Layout
+#   Header  : HEADER_LEN x int64 [magic, version, capacity, state_dim, head, count, episode_id, seq]
+#   Records : capacity x FixedRecordLayout records, used as a ring buffer with head as next write slot.
+#
+
+class MemoryMappedReplayMemory(ReplayMemory):
+    # Memory List Entry Off Sets
+    mem_episode_id = 0
+    mem_state = 1
+    mem_next_state = 2
+    mem_action = 3
+    mem_reward = 4
+    mem_complete = 5
+
+    # Header Off Sets
+    __MAGIC = 0
+    __VERSION = 1
+    __CAPACITY = 2
+    __STATE_DIM = 3
+    __HEAD = 4
+    __COUNT = 5
+    __EPISODE_ID = 6
+    __SEQ = 7
+    HEADER_LEN = 8
+
+    MAGIC = 0x524D4D52  # 'RMMR'
+    VERSION = 1
+
+    def __init__(self,
+                 lg: logging,
+                 filename: str,
+                 replay_mem_size: int,
+                 state_dim: int,
+                 state_encoder: Callable[[State], np.ndarray] = None,
+                 state_decoder: Callable[[np.ndarray], State] = None):
+        self.__lg = lg
+        self.__filename = filename
+        self.__layout = FixedRecordLayout(state_dim=state_dim,
+                                          state_encoder=state_encoder,
+                                          state_decoder=state_decoder)
+        exists = os.path.isfile(filename) and os.path.getsize(filename) > 0
+        if not exists:
+            open(filename, 'wb').close()
+
+        self.__header = np.memmap(filename, dtype=np.int64, mode='r+', shape=(self.HEADER_LEN,))
+        if exists:
+            self.__check_header(replay_mem_size, state_dim)
+            self.__lg.debug("Replay memory re-opened from [" + filename + "] with [" + str(self.len()) + "] memories")
+        else:
+            self.__header[:] = 0
+            self.__header[self.__MAGIC] = self.MAGIC
+            self.__header[self.__VERSION] = self.VERSION
+            self.__header[self.__CAPACITY] = replay_mem_size
+            self.__header[self.__STATE_DIM] = state_dim
+            self.__header.flush()
+
+        self.__capacity = int(self.__header[self.__CAPACITY])
+        self.__records = np.memmap(filename,
+                                   dtype=self.__layout.dtype,
+                                   mode='r+',
+                                   offset=self.HEADER_LEN * np.dtype(np.int64).itemsize,
+                                   shape=(self.__capacity,))
+        return
+
+    #
+    # A re-opened file must have been created with the same geometry.
+    #
+    def __check_header(self,
+                       replay_mem_size: int,
+                       state_dim: int) -> None:
+        if self.__header[self.__MAGIC] != self.MAGIC or self.__header[self.__VERSION] != self.VERSION:
+            raise MemoryMappedReplayMemory.ReplayFileFormatError(
+                "File [" + self.__filename + "] is not a version " + str(self.VERSION) + " replay memory file")
+        if self.__header[self.__CAPACITY] != replay_mem_size or self.__header[self.__STATE_DIM] != state_dim:
+            raise MemoryMappedReplayMemory.ReplayFileFormatError(
+                "File [" + self.__filename + "] holds capacity [" + str(self.__header[self.__CAPACITY]) +
+                "] state dim [" + str(self.__header[self.__STATE_DIM]) + "] but [" + str(replay_mem_size) +
+                "] [" + str(state_dim) + "] was requested")
+        return
+
+    #
+    # Add a memory to the reply memory, but tag it with the episode id such that whole episodes
+    # can later be recovered for training.
+    #
+    def append_memory(self,
+                      state: State,
+                      next_state: State,
+                      action: int,
+                      reward: float,
+                      episode_complete: bool) -> None:
+        head = int(self.__header[self.__HEAD])
+        seq = int(self.__header[self.__SEQ]) + 1
+        self.__layout.write(self.__records,
+                            head,
+                            seq,
+                            int(self.__header[self.__EPISODE_ID]),
+                            state,
+                            next_state,
+                            action,
+                            reward,
+                            episode_complete)
+        self.__header[self.__SEQ] = seq
+        self.__header[self.__HEAD] = (head + 1) % self.__capacity
+        self.__header[self.__COUNT] = min(int(self.__header[self.__COUNT]) + 1, self.__capacity)
+        if episode_complete:
+            self.__header[self.__EPISODE_ID] += 1
+        return
+
+    #
+    # How many items in the replay memory
+    #
+    def len(self) -> int:
+        return int(self.__header[self.__COUNT])
+
+    #
+    # Get a random set of memories.
+    #
+    # return list of elements [episode, curr_state, next_state, action, reward, complete]
+    #
+    def get_random_memories(self,
+                            sample_size: int) -> [[int, State, State, int, float, bool]]:
+        ln = self.len()
+        indices = np.random.choice(ln, min(ln, sample_size), replace=False)
+        samples = list()
+        for rec in self.__records[np.sort(indices)]:  # sorted so pages are touched in file order
+            samples.append(self.__layout.read(rec))
+
+        # Ensure results are random order
+        return random.sample(samples, len(samples))
+
+    #
+    # Get just the last memory with respect to the given state. If given state is
+    # None return the last memory overall.
+    #
+    def get_last_memory(self, state: State = None) -> [int, State, State, int, float, bool]:
+        ln = self.len()
+        if ln == 0:
+            return None
+        if state is None:
+            return self.__layout.read(self.__records[(int(self.__header[self.__HEAD]) - 1) % self.__capacity])
+
+        used = self.__records[:ln]
+        match = np.all(used[FixedRecordLayout.STATE] == self.__layout.encode(state), axis=1)
+        if not np.any(match):
+            return None
+        idx = np.flatnonzero(match)
+        return self.__layout.read(used[idx[np.argmax(used[FixedRecordLayout.SEQ][idx])]])
+
+    #
+    # Push any pending writes to disk.
+    #
+    def flush(self) -> None:
+        self.__records.flush()
+        self.__header.flush()
+        return
+
+    #
+    # Flush and release the underlying memory maps.
+    #
+    def close(self) -> None:
+        if self.__records is not None:
+            self.flush()
+            self.__records = None
+            self.__header = None
+        return
+
+    class ReplayFileFormatError(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
@@ -0,0 +1,131 @@
+import logging
+import random
+from collections import deque
+
+import numpy as np
+
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+
+
+#
+# Replay memory that pre computes n-step discounted returns.
+#
+# Transitions of the open episode are held back until n further steps have been seen (or the episode closes),
+# at which point the memory is stored with the extra columns
+#
+#   R_n : sum_{k=0}^{n-1} gamma^k r_{t+k} (truncated at the end of the episode)
+#   s_{t+n} : the state to bootstrap from
+#   done_n : True if the episode ended within the n steps, so there is nothing to bootstrap
+#
+# The target for a sample is then R_n + gamma^n * max_a Q(s_{t+n}, a) (or just R_n when done_n) which needs
+# one bootstrap prediction per sample and moves reward n steps per update.
+#
+# An episode is closed by a memory flagged episode complete or by end_episode(). In environments such as
+# TicTacToe the last memory an agent is given may not be flagged complete (the other agent won) so the agent
+# must call end_episode() when told the episode is over, else the open transitions would run on into the
+# returns of the next episode.
+#
+
+class NStepReplayMemory(ReplayMemory):
+    # Memory List Entry Off Sets
+    mem_episode_id = 0
+    mem_state = 1
+    mem_next_state = 2
+    mem_action = 3
+    mem_reward = 4
+    mem_complete = 5
+    mem_return_n = 6
+    mem_bootstrap_state = 7
+    mem_done_n = 8
+
+    # Open episode entry off sets
+    __NST = 1
+    __RWD = 3
+
+    def __init__(self,
+                 lg: logging,
+                 replay_mem_size: int,
+                 n_step: int = 3,
+                 gamma: float = 0.8):
+        if n_step < 1:
+            raise ValueError("n_step must be >= 1")
+        self.__lg = lg
+        self.__replay_memory = deque([], maxlen=replay_mem_size)
+        self.__open_episode = deque([])
+        self.__n_step = n_step
+        self.__gamma = gamma
+        self.__discounts = np.power(gamma, np.arange(n_step))
+        self.__episode_id = 0
+        return
+
+    #
+    # The discount to apply to the bootstrap prediction of a sample that is not done_n.
+    #
+    def bootstrap_discount(self) -> float:
+        return float(self.__gamma ** self.__n_step)
+
+    def n_step(self) -> int:
+        return self.__n_step
+
+    #
+    # Add a memory, memories become available for sampling once their n-step return is known.
+    #
+    def append_memory(self,
+                      state: State,
+                      next_state: State,
+                      action: int,
+                      reward: float,
+                      episode_complete: bool) -> None:
+        self.__open_episode.append((state, next_state, action, reward, episode_complete))
+        if episode_complete:
+            while len(self.__open_episode) > 0:
+                self.__close_oldest(done_n=True)
+            self.__episode_id += 1
+        elif len(self.__open_episode) == self.__n_step:
+            self.__close_oldest(done_n=False)
+        return
+
+    #
+    # The episode is over, close any open transitions as there is nothing beyond them to bootstrap from.
+    #
+    def end_episode(self) -> None:
+        if len(self.__open_episode) > 0:
+            while len(self.__open_episode) > 0:
+                self.__close_oldest(done_n=True)
+            self.__episode_id += 1
+        return
+
+    #
+    # The n-step return of the oldest open transition is now known, move it into the replay memory.
+    #
+    def __close_oldest(self,
+                       done_n: bool) -> None:
+        rewards = [t[self.__RWD] for t in self.__open_episode]
+        return_n = float(np.dot(self.__discounts[:len(rewards)], rewards))
+        bootstrap_state = self.__open_episode[-1][self.__NST]
+        st, nst, actn, rwd, done = self.__open_episode.popleft()
+        # Must match order as defined by class level mem_<?> offsets.
+        self.__replay_memory.append((self.__episode_id, st, nst, actn, rwd, done, return_n, bootstrap_state, done_n))
+        return
+
+    #
+    # How many items are available for sampling.
+    #
+    def len(self) -> int:
+        return len(self.__replay_memory)
+
+    #
+    # Get a random set of memories
+    #
+    # return list of elements [episode, curr_state, next_state, action, reward, complete, R_n, s_{t+n}, done_n]
+    #
+    def get_random_memories(self,
+                            sample_size: int) -> [[int, State, State, int, float, bool, float, State, bool]]:
+        ln = self.len()
+        indices = np.random.choice(ln, min(ln, sample_size), replace=False)
+        samples = [self.__replay_memory[idx] for idx in indices]
+        return random.sample(samples, len(samples))
+
+    def get_last_memory(self, state: State = None) -> [int, State, State, int, float, bool, float, State, bool]:
+        raise RuntimeError("get_last_memory, method not implemented")
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+#
+# Forward pass of a small sequential Dense network in numpy.
+#
+# For the small Dense / ReLU Q-Value networks the Keras dispatch overhead of predict is far larger than the
+# matrix multiplies, so the Dense layer weights are exported as contiguous float32 arrays and the forward pass
+# is run here in preallocated per batch size buffers. The export is tagged with the weights version it was
+# taken from so the owner can re-export when the weights change.
+#
+# Only Dense, Activation, Dropout (a no-op at inference) and InputLayer layers are supported; export returns
+# False for any other model so the owner can fall back to Keras.
+#
+
+class NumpyDenseInference:
+    __max_buffered_batch_sizes = 8
+
+    __activations = {'linear': None,
+                     'relu': lambda z: np.maximum(z, 0, out=z),
+                     'tanh': lambda z: np.tanh(z, out=z),
+                     'sigmoid': lambda z: np.divide(1, np.add(1, np.exp(np.negative(z, out=z), out=z), out=z), out=z)}
+
+    __pass_through_layers = ('Dropout', 'InputLayer')
+
+    def __init__(self):
+        self.__weights = None  # [(W, b)]
+        self.__activation = None  # [activation name]
+        self.__version = None
+        self.__buffers = dict()
+        return
+
+    #
+    # Export the weights of the given Keras model as at the given weights version.
+    #
+    # return False if the model has layers that are not supported.
+    #
+    def export(self,
+               model,
+               version: int) -> bool:
+        weights = list()
+        activation = list()
+        for layer in model.layers:
+            layer_type = type(layer).__name__
+            cfg = layer.get_config()
+            if layer_type == 'Dense':
+                act = cfg.get('activation', 'linear')
+                if act not in self.__activations:
+                    return self.__unsupported()
+                lw = layer.get_weights()
+                w = np.ascontiguousarray(lw[0], dtype=np.float32)
+                b = np.ascontiguousarray(lw[1] if len(lw) > 1 else np.zeros(w.shape[1]), dtype=np.float32)
+                weights.append((w, b))
+                activation.append(act)
+            elif layer_type == 'Activation':
+                act = cfg.get('activation', None)
+                if act not in self.__activations or len(weights) == 0 or activation[-1] != 'linear':
+                    return self.__unsupported()
+                activation[-1] = act
+            elif layer_type not in self.__pass_through_layers:
+                return self.__unsupported()
+        if len(weights) == 0:
+            return self.__unsupported()
+
+        self.__weights = weights
+        self.__activation = activation
+        self.__version = version
+        self.__buffers = dict()
+        return True
+
+    def __unsupported(self) -> bool:
+        self.__weights = None
+        self.__activation = None
+        self.__version = None
+        return False
+
+    #
+    # The weights version of the current export, None if nothing exported.
+    #
+    def version(self) -> int:
+        return self.__version
+
+    #
+    # Run the forward pass for the batch x [n, input_dim]
+    #
+    def predict(self,
+                x: np.ndarray) -> np.ndarray:
+        if self.__weights is None:
+            raise RuntimeError("No model has been exported")
+        h = np.asarray(x, dtype=np.float32)
+        h = h.reshape(h.shape[0], -1)
+        for (w, b), act, buf in zip(self.__weights, self.__activation, self.__batch_buffers(h.shape[0])):
+            np.matmul(h, w, out=buf)
+            buf += b
+            if self.__activations[act] is not None:
+                self.__activations[act](buf)
+            h = buf
+        return np.array(h, copy=True)  # Buffers are re-used, so hand back a copy
+
+    #
+    # The layer output buffers for the given batch size.
+    #
+    def __batch_buffers(self,
+                        n: int) -> list:
+        if n not in self.__buffers:
+            if len(self.__buffers) >= self.__max_buffered_batch_sizes:
+                self.__buffers = dict()
+            self.__buffers[n] = [np.empty((n, w.shape[1]), dtype=np.float32) for w, _ in self.__weights]
+        return self.__buffers[n]
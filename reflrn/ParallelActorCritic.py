@@ -0,0 +1,156 @@
+import logging
+import multiprocessing
+import random
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from reflrn.ActorCriticPolicyTDQVal import ActorCriticPolicyTDQVal
+from reflrn.Interface.Environment import Environment
+from reflrn.Interface.State import State
+from reflrn.SharedMemoryReplayMemory import SharedMemoryReplayMemory
+from reflrn.SharedModelWeights import SharedModelWeights
+
+
+#
+# Run {n} actor processes that play games (TicTacToe, GridWorld ..) into a shared replay memory while a single
+# learner (this process) trains the critic continuously from that memory.
+#
+# Actors act with a copy of the learners weights that is refreshed every refresh_every iterations, the learner
+# publishes the critic weights every publish_every critic trainings.
+#
+# The env_factory is called in each actor process as env_factory(worker_id, replay_memory) and must return the
+# environment to run and the ActorCriticPolicyTDQVal policies acting in it, where those policies have been
+# created with the given replay_memory. The factory must be picklable (i.e. a module level function).
+#
+# The shared replay memory only holds the array form of states, the state_decoder rebuilds the environment's
+# own states (e.g. TicTacToeStateDecoder) for the learner so the learner policy can pass sampled states to
+# its environment. It is set on the learner's view of the memory only, actors just append.
+#
+
+class ParallelActorCritic:
+
+    def __init__(self,
+                 lg: logging,
+                 learner_policy: ActorCriticPolicyTDQVal,
+                 replay_memory: SharedMemoryReplayMemory,
+                 env_factory: Callable[[int, SharedMemoryReplayMemory],
+                                       Tuple[Environment, List[ActorCriticPolicyTDQVal]]],
+                 state_decoder: Callable[[np.ndarray], State] = None,
+                 num_actors: int = 2,
+                 refresh_every: int = 500,
+                 publish_every: int = 5,
+                 seed: int = 42):
+        if num_actors < 1:
+            raise ValueError("Must have at least one actor process")
+        self.__lg = lg
+        self.__learner_policy = learner_policy
+        self.__replay_memory = replay_memory
+        self.__env_factory = env_factory
+        self.__num_actors = num_actors
+        self.__refresh_every = refresh_every
+        self.__publish_every = publish_every
+        self.__seed = seed
+        self.__shared_weights = None
+        self.__actors = list()
+        self.__state_decoder = state_decoder
+        return
+
+    #
+    # Start the actor processes, each will play the given number of iterations.
+    #
+    def start_actors(self,
+                     iterations: int) -> None:
+        if len(self.__actors) > 0:
+            raise RuntimeError("Actors already started")
+        self.__shared_weights = SharedModelWeights(self.__learner_policy.get_weights())
+        for worker_id in range(1, self.__num_actors + 1):
+            p = multiprocessing.Process(target=ParallelActorCritic._actor_worker,
+                                        name="Actor-" + str(worker_id),
+                                        args=(worker_id,
+                                              self.__env_factory,
+                                              self.__replay_memory,
+                                              self.__shared_weights,
+                                              iterations,
+                                              self.__refresh_every,
+                                              self.__seed),
+                                        daemon=True)
+            p.start()
+            self.__actors.append(p)
+        if self.__state_decoder is not None:
+            self.__replay_memory.set_state_decoder(self.__state_decoder)  # after actors have their copy
+        self.__lg.info("Started [" + str(self.__num_actors) + "] actor processes")
+        return
+
+    #
+    # Train the critic continuously from the shared replay memory until all actors have finished or
+    # max_train_steps critic trainings have been done.
+    #
+    # return the number of critic trainings done.
+    #
+    def learn(self,
+              max_train_steps: int = None,
+              update_every: int = 5) -> int:
+        trained = 0
+        while self.__actors_alive() and (max_train_steps is None or trained < max_train_steps):
+            if self.__learner_policy.train_from_replay(update_every=update_every):
+                trained += 1
+                if trained % self.__publish_every == 0:
+                    self.__shared_weights.publish(self.__learner_policy.get_weights())
+            else:
+                time.sleep(0.01)  # Wait for actors to build up experience
+        self.__lg.info("Learner stopped after [" + str(trained) + "] critic trainings")
+        return trained
+
+    #
+    # Wait for the actors to finish and release the shared weights.
+    #
+    def stop(self,
+             timeout: float = None) -> None:
+        for p in self.__actors:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        self.__actors = list()
+        if self.__shared_weights is not None:
+            self.__shared_weights.unlink()
+            self.__shared_weights = None
+        return
+
+    def __actors_alive(self) -> bool:
+        return any(p.is_alive() for p in self.__actors)
+
+    #
+    # Actor process entry point.
+    #
+    @staticmethod
+    def _actor_worker(worker_id: int,
+                      env_factory: Callable[[int, SharedMemoryReplayMemory],
+                                            Tuple[Environment, List[ActorCriticPolicyTDQVal]]],
+                      replay_memory: SharedMemoryReplayMemory,
+                      shared_weights: SharedModelWeights,
+                      iterations: int,
+                      refresh_every: int,
+                      seed: int) -> None:
+        random.seed(seed + worker_id)
+        np.random.seed(seed + worker_id)
+        replay_memory.set_producer_id(worker_id)
+        env, policies = env_factory(worker_id, replay_memory)
+        for policy in policies:
+            policy.set_training_off()  # Actors only act and remember, the learner trains
+
+        version = 0
+        done = 0
+        try:
+            while done < iterations:
+                version, weights = shared_weights.weights_if_newer(version)
+                if weights is not None:
+                    for policy in policies:
+                        policy.set_weights(weights)
+                env.run(min(refresh_every, iterations - done))
+                done += refresh_every
+        finally:
+            replay_memory.close()
+            shared_weights.close()
+        return
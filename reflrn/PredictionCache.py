@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+
+#
+# LRU cache of model predictions keyed by the bytes of each input row.
+#
+# Predictions are only valid for the weights they were made with, so the owner must call invalidate() whenever
+# the weights change (train, clone, load ..). This bumps the weights version and drops all cached entries.
+#
+# For small state spaces such as TicTacToe most predictions between weight changes are then cache hits.
+#
+
+class PredictionCache:
+
+    def __init__(self,
+                 max_entries: int = 10000):
+        self.__max_entries = max_entries
+        self.__cache = OrderedDict()
+        self.__version = 0
+        self.__hits = 0
+        self.__misses = 0
+        return
+
+    #
+    # The weights have changed, cached predictions are no longer valid.
+    #
+    def invalidate(self) -> None:
+        self.__version += 1
+        self.__cache.clear()
+        return
+
+    #
+    # The version of the weights the cached entries belong to.
+    #
+    def version(self) -> int:
+        return self.__version
+
+    #
+    # Predict for each row in x, rows not in the cache are predicted with a single call to predict_fn.
+    #
+    def predict(self,
+                x: np.ndarray,
+                predict_fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        if self.__max_entries <= 0:
+            return predict_fn(x)
+
+        x = np.asarray(x)
+        rows = x.reshape(x.shape[0], -1)
+        keys = [(rows.dtype.str, r.tobytes()) for r in rows]
+        cached = [self.__cache.get(k, None) for k in keys]
+        missed = [i for i, c in enumerate(cached) if c is None]
+
+        self.__hits += len(keys) - len(missed)
+        self.__misses += len(missed)
+
+        if len(missed) > 0:
+            predictions = np.asarray(predict_fn(x[missed]))
+            for i, p in zip(missed, predictions):
+                cached[i] = np.array(p, copy=True)
+                self.__add(keys[i], cached[i])
+        for i, k in enumerate(keys):
+            if k in self.__cache:
+                self.__cache.move_to_end(k)  # most recently used
+
+        return np.stack(cached)  # a new array so callers can not change cached entries
+
+    def __add(self, key, prediction: np.ndarray) -> None:
+        self.__cache[key] = prediction
+        if len(self.__cache) > self.__max_entries:
+            self.__cache.popitem(last=False)
+        return
+
+    def hits(self) -> int:
+        return self.__hits
+
+    def misses(self) -> int:
+        return self.__misses
+
+    #
+    # Fraction of row predictions served from the cache.
+    #
+    def hit_rate(self) -> float:
+        total = self.__hits + self.__misses
+        if total == 0:
+            return float(0)
+        return self.__hits / total
+
+    def len(self) -> int:
+        return len(self.__cache)
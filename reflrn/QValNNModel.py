@@ -3,15 +3,20 @@ from pathlib import Path
 
 import keras
 import numpy as np
-from keras.callbacks import LearningRateScheduler
 
+from reflrn.DTypePolicy import DTypePolicy
 from reflrn.Interface.Model import Model
 from reflrn.Interface.ModelParams import ModelParams
 from reflrn.Interface.NeuralNetwork import NeuralNetwork
+from reflrn.KerasTrainStep import KerasTrainStep
+from reflrn.NumpyDenseInference import NumpyDenseInference
+from reflrn.WeightSync import WeightSync
+from reflrn.PredictionCache import PredictionCache
 from reflrn.exceptions.CannotCloneWeightsOfDifferentModelException import CannotCloneWeightsOfDifferentModelException
 
 
 class QValNNModel(Model):
+    __default_prediction_cache_size = 10000
 
     #
     # At init time we need
@@ -35,6 +40,7 @@ class QValNNModel(Model):
         self.__batch_size = model_params.get_parameter(ModelParams.batch_size)
         self.__model_compiled = False
         self.__epochs = 10
+        self.__train_step = KerasTrainStep(batch_size=self.__batch_size, passes=self.__epochs)
 
         self.__lr_0 = model_params.get_parameter(ModelParams.learning_rate_0)
         self.__lr_min = model_params.get_parameter(ModelParams.learning_rate_min)
@@ -47,6 +53,23 @@ class QValNNModel(Model):
 
         self.__nn = network
 
+        #
+        # Predictions are cached until the weights change, 0 entries => no caching.
+        #
+        try:
+            cache_size = model_params.get_parameter(ModelParams.prediction_cache_size)
+        except ModelParams.RequestedParameterNotAvailable:
+            cache_size = self.__default_prediction_cache_size
+        self.__prediction_cache = PredictionCache(cache_size)
+
+        #
+        # Predict in numpy where the network is a simple Dense stack, Keras is still used for training.
+        #
+        self.__inference = NumpyDenseInference()
+        self.__inference_supported = True
+
+        self.__weight_sync = WeightSync()
+
         return
 
     #
@@ -74,6 +97,17 @@ class QValNNModel(Model):
     #
     def predict(self, x) -> [np.float]:
         self.__bootstrap_model()
+        return self.__prediction_cache.predict(DTypePolicy.as_input(x, "predict X"), self.__predict_on_batch)
+
+    #
+    # Predict with the numpy inference engine, re-exporting the weights if they have changed since the last
+    # export. Fall back to Keras if the model has layers the engine does not support.
+    #
+    def __predict_on_batch(self, x) -> np.ndarray:
+        if self.__inference_supported and self.__inference.version() != self.weights_version():
+            self.__inference_supported = self.__inference.export(self.__model, self.weights_version())
+        if self.__inference_supported:
+            return self.__inference.predict(x)
         return self.__model.predict_on_batch(x)
 
     #
@@ -81,12 +115,12 @@ class QValNNModel(Model):
     #
     def train(self, x, y) -> None:
         self.__bootstrap_model()
-        self.__model.fit(x=x,
-                         y=y,
-                         batch_size=self.__batch_size,
-                         epochs=self.__epochs,
-                         verbose=self.__verbose,
-                         callbacks=[LearningRateScheduler(self.__lr_step_down_decay)])
+        x = DTypePolicy.as_input(x, "train X")
+        y = DTypePolicy.as_input(y, "train Y")
+        loss = self.__train_step.train(self.__model, x, y, lambda: self.__lr_step_down_decay(None))
+        if self.__verbose:
+            self.__lg.debug(self.__agent_name + " trained, loss : " + str(loss))
+        self.__prediction_cache.invalidate()
         self.__inc_lr_epoch()  # count a global fitting call.
         return
 
@@ -144,16 +178,56 @@ class QValNNModel(Model):
             raise RuntimeError("Internal Model is value (None) as has not been initialised")
         else:
             self.__model.set_weights(model.get_weights())
+            self.__prediction_cache.invalidate()
         return
 
     #
-    # Return the model weights.
+    # Return the model weights, the model is created if it does not yet exist.
     #
     def get_weights(self):
-        if self.__model is None:
-            raise RuntimeError("Internal Model is value (None) as has not been initialised")
+        self.__bootstrap_model()
         return self.__model.get_weights()
 
+    #
+    # Set the model weights from a list of arrays as returned by get_weights of a model with
+    # an identical architecture.
+    #
+    def set_weights(self, weights) -> None:
+        self.__bootstrap_model()
+        self.__model.set_weights(weights)
+        self.__prediction_cache.invalidate()
+        return
+
+    #
+    # The version of the current weights, this changes every time the weights change.
+    #
+    def weights_version(self) -> int:
+        return self.__prediction_cache.version()
+
+    #
+    # The cache of predictions for the current weights, for hit rate reporting.
+    #
+    def prediction_cache(self) -> PredictionCache:
+        return self.__prediction_cache
+
+    #
+    # Update the weights in place from the backend variables of an identical model, hard copy if tau = 1
+    # else soft (Polyak) update.
+    #
+    def sync_weights(self, model: 'Model', tau: float = 1.0) -> None:
+        if not isinstance(model, type(self)):
+            raise CannotCloneWeightsOfDifferentModelException(str(type(self)) + " <- " + str(type(model)))
+        self.__weight_sync.sync(self.weight_variables(), model.weight_variables(), tau)
+        self.__prediction_cache.invalidate()
+        return
+
+    #
+    # The backend variables holding the model weights, the model is created if it does not yet exist.
+    #
+    def weight_variables(self) -> list:
+        self.__bootstrap_model()
+        return self.__model.weights
+
     #
     # Save the model using Keras built in save capability.
     #
@@ -186,6 +260,8 @@ class QValNNModel(Model):
         finally:
             pass
         self.__model = model
+        self.__prediction_cache.invalidate()
+        self.__inference_supported = True  # Loaded model may differ in architecture, so check again
         return
 
     #
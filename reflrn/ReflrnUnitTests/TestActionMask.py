@@ -0,0 +1,54 @@
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.ActionMask import ActionMask
+
+
+class TestActionMask(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def test_from_actions(self):
+        mask = ActionMask.from_actions([0, 2, 5], 9)
+        self.assertEqual(9, mask.size)
+        self.assertEqual([0, 2, 5], ActionMask.legal_actions(mask).tolist())
+        self.assertEqual([1, 3, 4, 6, 7, 8], ActionMask.illegal_actions(mask).tolist())
+        self.assertFalse(np.any(ActionMask.from_actions([], 4)))
+        return
+
+    def test_greedy_single(self):
+        q = np.array([5.0, 1.0, 3.0, 4.0])
+        mask = np.array([False, True, True, False])
+        self.assertEqual(2, ActionMask.greedy(q, mask))
+        self.assertEqual(3.0, ActionMask.max_legal(q, mask))
+        masked = ActionMask.apply(q, mask)
+        self.assertTrue(np.all(np.isneginf(masked[~mask])))
+        self.assertTrue(np.array_equal(q[mask], masked[mask]))
+        return
+
+    def test_greedy_batch(self):
+        q = np.random.randn(50, 9)
+        mask = np.random.rand(50, 9) > 0.5
+        mask[:, 4] = True  # at least one legal action per row
+        greedy = ActionMask.greedy(q, mask)
+        best = ActionMask.max_legal(q, mask)
+        for i in range(0, 50):
+            legal = np.flatnonzero(mask[i])
+            self.assertEqual(legal[np.argmax(q[i, legal])], greedy[i])
+            self.assertEqual(np.max(q[i, legal]), best[i])
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestActionMask()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,366 @@
+import logging
+import os
+import random
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from examples.tictactoe.TicTacToe import TicTacToe
+from examples.tictactoe.TicTacToeNN import TicTacToeNN
+from examples.tictactoe.TicTacToeState import TicTacToeState
+from examples.tictactoe.TicTacToeStateDecoder import TicTacToeStateDecoder
+from examples.tictactoe.TicTacToeStateEncoder import TicTacToeStateEncoder
+from examples.tictactoe.TicTacToeTests.TestAgent import TestAgent
+from reflrn.ActorCriticPolicyTDQVal import ActorCriticPolicyTDQVal
+from reflrn.DequeReplayMemory import DequeReplayMemory
+from reflrn.EncodedReplayMemory import EncodedReplayMemory
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.GeneralModelParams import GeneralModelParams
+from reflrn.Interface.ModelParams import ModelParams
+from reflrn.MemoryMappedReplayMemory import MemoryMappedReplayMemory
+from reflrn.NStepReplayMemory import NStepReplayMemory
+
+
+#
+# Play the given number of games of random (legal) moves, passing every move to the given policy as the
+# TicTacToe environment would, -1 for a move, 100 for a win and -10 for a draw.
+#
+def play_random_games(policy,
+                      ttt: TicTacToe,
+                      agent_x: TestAgent,
+                      agent_o: TestAgent,
+                      num_games: int) -> None:
+    for _ in range(0, num_games):
+        board = np.full(9, np.nan)
+        agent = agent_x
+        state = TicTacToeState(board.reshape((3, 3)), agent_x, agent_o)
+        done = False
+        while not done:
+            action = int(np.random.choice(ttt.actions(state)))
+            board[action] = agent.id()
+            next_state = TicTacToeState(board.reshape((3, 3)), agent_x, agent_o)
+            done = ttt.episode_complete(next_state)
+            reward = float(-1)
+            if done:
+                reward = float(-10) if np.all(~np.isnan(board)) else float(100)
+            policy.update_policy(agent.name(), state, next_state, action, reward, done)
+            state = next_state
+            agent = agent_o if agent == agent_x else agent_x
+    return
+
+
+class TestActorCriticPolicyTDQVal(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestActorCriticPolicyTDQVal",
+                                      "TestActorCriticPolicyTDQVal.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    #
+    # A policy linked to TicTacToe that only trains when asked to.
+    #
+    def __policy(self,
+                 replay_memory=None,
+                 agents=None,
+                 **params) -> ActorCriticPolicyTDQVal:
+        agent_x, agent_o = agents if agents is not None else (TestAgent(1, "X"), TestAgent(-1, "O"))
+        ttt = TicTacToe(agent_x, agent_o, self.__lg)
+        pp = [[ModelParams.train_every, int(1e9)],
+              [ModelParams.learning_rate_min, float(0.001)],
+              [ModelParams.num_states, int(10)]]
+        pp.extend([[k, v] for k, v in params.items()])
+        acp = ActorCriticPolicyTDQVal(lg=self.__lg,
+                                      network=TicTacToeNN(9, 9),
+                                      policy_params=GeneralModelParams(pp),
+                                      env=ttt,
+                                      replay_memory=replay_memory)
+        return acp, ttt, agent_x, agent_o
+
+    #
+    # The states recorded in telemetry must be the states the critic was trained on, even though the training
+    # batch is a view onto a buffer that is re-used to build the loss evaluation batch.
+    #
+    def test_telemetry_is_training_batch(self):
+        acp, ttt, agent_x, agent_o = self.__policy(**{ModelParams.loss_eval_every: 1,
+                                                      ModelParams.loss_eval_size: 16,
+                                                      ModelParams.loss_hold_out_every: 2})
+        play_random_games(acp, ttt, agent_x, agent_o, 20)
+
+        trained = list()
+        telemetry = list()
+        train = acp.critic_model.train
+
+        def record_train(x, y):
+            trained.append(np.copy(x))
+            return train(x, y)
+
+        acp.critic_model.train = record_train
+        acp.update_telemetry_for_training_batch = lambda x: telemetry.append(np.copy(x))
+
+        for _ in range(0, 3):
+            self.assertTrue(acp._train_critic())
+        self.assertEqual(3, len(telemetry))
+        for x_trained, x_telemetry in zip(trained, telemetry):
+            self.assertTrue(np.array_equal(x_trained, x_telemetry))
+        return
+
+    #
+    # The critic loss is evaluated on memories held out of the replay memory, so the critic is never trained on
+    # the evaluation set.
+    #
+    def test_loss_evaluation_set_held_out(self):
+        rm = DequeReplayMemory(self.__lg, 1000)
+        acp, ttt, agent_x, agent_o = self.__policy(rm, **{ModelParams.loss_eval_every: 1,
+                                                          ModelParams.loss_eval_size: 16,
+                                                          ModelParams.loss_hold_out_every: 2})
+        play_random_games(acp, ttt, agent_x, agent_o, 20)
+
+        phase = ['train']
+        sampled = {'train': set(), 'eval': set()}
+        batch_targets = acp._batch_targets
+        train = acp.critic_model.train
+
+        def record_batch_targets(samples):
+            sampled[phase[0]].update(id(s[DequeReplayMemory.mem_state]) for s in samples)
+            return batch_targets(samples)
+
+        def record_train(x, y):
+            phase[0] = 'eval'
+            return train(x, y)
+
+        acp._batch_targets = record_batch_targets
+        acp.critic_model.train = record_train
+        for _ in range(0, 10):
+            phase[0] = 'train'
+            self.assertTrue(acp._train_critic())
+
+        self.assertEqual(16, len(sampled['eval']))
+        replay = set(id(m[DequeReplayMemory.mem_state]) for m in rm.get_random_memories(rm.len()))
+        self.assertTrue(sampled['train'].issubset(replay))
+        self.assertEqual(0, len(sampled['eval'].intersection(replay)))
+        return
+
+    #
+    # Two deterministic learner policies from the same weights and seed train to the same critic and act the same.
+    #
+    def test_deterministic_learner_reproducible(self):
+        params = {ModelParams.learner_mode: ActorCriticPolicyTDQVal.LEARNER_DETERMINISTIC,
+                  ModelParams.train_every: 5}
+        agents = (TestAgent(1, "X"), TestAgent(-1, "O"))
+        policies = [self.__policy(None, agents, **params) for _ in range(0, 2)]
+        weights = policies[0][0].get_weights()
+        states = [TicTacToeState(np.random.choice([np.nan, 1, -1], (3, 3)), *agents) for _ in range(0, 20)]
+
+        critic_weights = list()
+        actions = list()
+        for acp, ttt, agent_x, agent_o in policies:
+            acp.set_weights(weights)
+            random.seed(7)
+            np.random.seed(7)
+            play_random_games(acp, ttt, agent_x, agent_o, 20)
+            critic_weights.append(acp.get_weights())
+            actions.append([int(acp.greedy_action(st)) for st in states])
+
+        self.assertFalse(all(np.array_equal(w0, w1) for w0, w1 in zip(weights, critic_weights[0])))  # trained
+        for w0, w1 in zip(critic_weights[0], critic_weights[1]):
+            self.assertTrue(np.array_equal(w0, w1))
+        self.assertEqual(actions[0], actions[1])
+        return
+
+    #
+    # Weights set while the async learner is training are only applied once the learner step is complete.
+    #
+    def test_set_weights_waits_for_async_learner(self):
+        acp, ttt, agent_x, agent_o = self.__policy(**{ModelParams.learner_mode: ActorCriticPolicyTDQVal.LEARNER_ASYNC,
+                                                      ModelParams.train_every: 1})
+        in_train = threading.Event()
+        release = threading.Event()
+        train = acp.critic_model.train
+
+        def blocking_train(x, y):
+            in_train.set()
+            release.wait(10)
+            return train(x, y)
+
+        acp.critic_model.train = blocking_train
+        weights = acp.get_weights()
+        setter = threading.Thread(target=acp.set_weights, args=(weights,))
+        try:
+            play_random_games(acp, ttt, agent_x, agent_o, 5)
+            self.assertTrue(in_train.wait(10))
+            setter.start()
+            setter.join(0.2)
+            self.assertTrue(setter.is_alive())
+        finally:
+            release.set()
+            if setter.ident is not None:  # started
+                setter.join(10)
+            acp.stop_learner(10)
+        self.assertFalse(setter.is_alive())
+        return
+
+    #
+    # A TicTacToe agent whose opponent wins is not given a transition flagged episode complete, its open n-step
+    # transitions are closed when the environment ends the episode.
+    #
+    def test_n_step_episode_closed_by_environment(self):
+        acp, ttt, agent_x, agent_o = self.__policy(**{ModelParams.n_step: 3})
+        states = [TicTacToeState(np.full((3, 3), np.nan), agent_x, agent_o) for _ in range(0, 3)]
+        acp.update_policy(agent_x.name(), states[0], states[1], 0, float(-1), False)
+        acp.update_policy(agent_x.name(), states[1], states[2], 1, float(100), False)
+        x, _ = acp._get_sample_batch()
+        self.assertIsNone(x)
+        acp.episode_complete(states[2])
+        x, _ = acp._get_sample_batch()
+        self.assertEqual(2, x.shape[0])
+        return
+
+    #
+    # The targets one sample at a time, as they were before the batch was predicted at once, asking the
+    # environment for the terminal flag and the legal actions of each bootstrap state.
+    #
+    @classmethod
+    def __reference_targets(cls,
+                            acp: ActorCriticPolicyTDQVal,
+                            ttt: TicTacToe,
+                            samples: list) -> np.ndarray:
+        lr = acp.learning_rate.learning_rate(acp.episode)
+        y = list()
+        for sample in samples:
+            _, cur_state, _, action, _, done = sample[:6]
+            reward, bootstrap_state, bootstrap_done, discount = acp._sample_target_terms(sample)
+            qvp = 0.0
+            if not (ttt.episode_complete(bootstrap_state) or bootstrap_done):
+                qvn = acp.actor_model.predict(np.array(bootstrap_state.state_as_array()).reshape((1, 9)))[0]
+                qvp = np.max(qvn[ttt.actions(bootstrap_state)])
+            qvs = np.zeros(9)
+            if not done:
+                qvs = np.array(acp.actor_model.predict(np.array(cur_state.state_as_array()).reshape((1, 9)))[0],
+                               dtype=np.float64)
+            qvs[action] = (qvs[action] * (1 - lr)) + (lr * (reward + (discount * qvp)))
+            y.append(qvs)
+        return np.array(y)
+
+    #
+    # The batch targets match the targets taken one sample at a time, for single step and n-step memories.
+    #
+    def test_batch_targets_match_per_sample(self):
+        for n_step, discount_returns in ((1, False), (1, True), (3, True)):
+            params = {ModelParams.n_step: n_step,
+                      ModelParams.discount_returns: discount_returns,
+                      ModelParams.gamma: float(0.8)}
+            rm = NStepReplayMemory(self.__lg, 1000, n_step, float(0.8) if discount_returns else float(1))
+            acp, ttt, agent_x, agent_o = self.__policy(rm, **params)
+            play_random_games(acp, ttt, agent_x, agent_o, 10)
+            samples = rm.get_random_memories(rm.len())
+            self.assertTrue(any(s[NStepReplayMemory.mem_done_n] for s in samples))
+            self.assertTrue(any(not s[NStepReplayMemory.mem_done_n] for s in samples))
+            x, y = acp._batch_targets(samples)
+            for i, sample in enumerate(samples):
+                self.assertTrue(np.array_equal(np.reshape(sample[NStepReplayMemory.mem_state].state_as_array(), 9), x[i],
+                                               equal_nan=True))
+            self.assertTrue(np.allclose(self.__reference_targets(acp, ttt, samples), y, atol=1e-5))
+        return
+
+    #
+    # A replay memory that can be sampled as columns (EncodedReplayMemory) is, and gives the same targets as its
+    # memories taken one sample at a time.
+    #
+    def test_column_sampled_replay_memory(self):
+        agents = (TestAgent(1, "X"), TestAgent(-1, "O"))
+        erm = EncodedReplayMemory(self.__lg, 1000, TicTacToeStateEncoder(agents[0].id(), agents[1].id()))
+        acp, ttt, agent_x, agent_o = self.__policy(erm, agents, **{ModelParams.discount_returns: True,
+                                                                   ModelParams.gamma: float(0.8)})
+        play_random_games(acp, ttt, agent_x, agent_o, 10)
+
+        batches = list()
+        get_random_batch_with_next_states = erm.get_random_batch_with_next_states
+
+        def record_batch(sample_size):
+            batches.append(get_random_batch_with_next_states(sample_size))
+            return batches[-1]
+
+        erm.get_random_batch_with_next_states = record_batch
+        erm.get_random_memories = None  # must not be sampled one memory at a time
+        x, y = acp._get_sample_batch()
+        self.assertEqual(1, len(batches))
+
+        episodes, xs, _, actions, rewards, complete, next_states = batches[0]
+        self.assertTrue(any(complete))
+        self.assertTrue(any(~complete))
+        decoder = TicTacToeStateDecoder(*agents)
+        samples = [[episodes[i], decoder(xs[i]), next_states[i], int(actions[i]), float(rewards[i]), bool(complete[i])]
+                   for i in range(0, len(actions))]
+        self.assertTrue(np.array_equal(np.reshape(xs, x.shape), x))
+        self.assertTrue(np.allclose(self.__reference_targets(acp, ttt, samples), y, atol=1e-5))
+        return
+
+    #
+    # Single step targets and the targets from an n-step memory with n = 1 are the same, with and without
+    # discounting.
+    #
+    def test_single_step_matches_n_step_of_one(self):
+        for discount_returns in (False, True):
+            params = {ModelParams.discount_returns: discount_returns}
+            acp_1, ttt, agent_x, agent_o = self.__policy(**params)
+            nsrm = NStepReplayMemory(self.__lg, 1000, 1, acp_1.gamma if discount_returns else float(1))
+            acp_n, _, _, _ = self.__policy(nsrm, (agent_x, agent_o), **params)
+            weights = acp_1.get_weights()  # same actor for both
+            acp_1.set_weights(weights)
+            acp_n.set_weights(weights)
+
+            class Both:
+                @staticmethod
+                def update_policy(*args):
+                    acp_1.update_policy(*args)
+                    acp_n.update_policy(*args)
+
+            play_random_games(Both, ttt, agent_x, agent_o, 10)
+            samples_n = nsrm.get_random_memories(nsrm.len())
+            _, y_1 = acp_1._batch_targets([s[:6] for s in samples_n])
+            y_1 = np.copy(y_1)
+            _, y_n = acp_n._batch_targets(samples_n)
+            self.assertTrue(np.allclose(y_1, y_n))
+        return
+
+    #
+    # A run resumed from a memory mapped replay file can train on the memories restored from the file.
+    #
+    def test_resume_from_memory_mapped_replay(self):
+        agents = (TestAgent(1, "X"), TestAgent(-1, "O"))
+        decoder = TicTacToeStateDecoder(*agents)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "replay.mm")
+            mmrm = MemoryMappedReplayMemory(self.__lg, filename, 500, 9, state_decoder=decoder)
+            acp, ttt, agent_x, agent_o = self.__policy(mmrm, agents)
+            play_random_games(acp, ttt, agent_x, agent_o, 20)
+            num_memories = mmrm.len()
+            mmrm.close()
+
+            mmrm = MemoryMappedReplayMemory(self.__lg, filename, 500, 9, state_decoder=decoder)
+            acp, _, _, _ = self.__policy(mmrm, agents)
+            self.assertEqual(num_memories, mmrm.len())
+            x, y = acp._get_sample_batch()
+            self.assertEqual((32, 9), x.shape)
+            self.assertTrue(np.all(np.isfinite(y)))
+            for _ in range(0, 5):
+                self.assertTrue(acp.train_from_replay(update_every=2))
+            mmrm.close()
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestActorCriticPolicyTDQVal()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
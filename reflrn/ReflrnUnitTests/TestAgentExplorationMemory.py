@@ -177,6 +177,46 @@ class TestAgentExplorationMemory(unittest.TestCase):
 
         return
 
+    def test_wrap_around(self):
+        emeg = AgentExplorationMemory(self.__lg, replay_mem_size=5)
+        self.__add_test_cases(emeg, self.__test_cases, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        self.assertEqual(5, emeg.len())
+
+        # Episodes wholly overwritten are pruned from the indexes
+        for ep in (0, 1, 2):
+            self.assertRaises(AgentExplorationMemory.ExplorationMemoryNoSuchEpisode,
+                              emeg.get_memories_by_episode,
+                              ep)
+        self.assertEqual(None, emeg.get_memories_by_type(AgentExplorationMemory.Memory.ACTION, 0))
+
+        # Episode 3 has lost its first two memories, 4 & 5 are whole
+        for ep, first in ((3, 7), (4, 9), (5, 11)):
+            memory = emeg.get_memories_by_episode(episode=ep)
+            i = first
+            for mem in memory:
+                self.assertEqual(self.__test_case_equal(self.__test_cases[i], mem), True)
+                i += 1
+            self.assertEqual(i, first + len(memory))
+
+        memory = emeg.get_memories_by_type(AgentExplorationMemory.Memory.AGENT, "AgentTwo")
+        self.assertEqual([8, 11], [self.__test_cases.index(m) for m in memory])
+        return
+
+    def test_columnar(self):
+        emeg = AgentExplorationMemory(self.__lg)
+        self.__add_test_cases(emeg, self.__test_cases, [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11])
+        cols = emeg.get_memories_by_episode(episode=3, columnar=True)
+        self.assertEqual(8, len(cols))
+        self.assertTrue(np.array_equal(np.array([1, 2, 3, 1]), cols[AgentExplorationMemory.Memory.ACTION]))
+        self.assertTrue(np.allclose(np.array([0.1, 0.2, 0.3, 0.4]), cols[AgentExplorationMemory.Memory.REWARD]))
+        self.assertTrue(np.array_equal(np.array([False, False, False, True]),
+                                       cols[AgentExplorationMemory.Memory.EPISODE_COMPLETE]))
+        self.assertEqual(self.__dummy_state_1, cols[AgentExplorationMemory.Memory.STATE][0])
+
+        cols = emeg.get_memories_by_type(AgentExplorationMemory.Memory.ACTION, 1, columnar=True)
+        self.assertTrue(np.array_equal(np.array([3, 3, 5]), cols[AgentExplorationMemory.Memory.EPISODE]))
+        return
+
     #
     # Test equality of expected & actual memory
     #
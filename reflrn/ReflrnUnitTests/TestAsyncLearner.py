@@ -0,0 +1,108 @@
+import logging
+import random
+import threading
+import unittest
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.AsyncLearner import AsyncLearner
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.NStepReplayMemory import NStepReplayMemory
+from reflrn.SynchronisedReplayMemory import SynchronisedReplayMemory
+
+
+class TestAsyncLearner(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestAsyncLearner",
+                                      "TestAsyncLearner.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def test_requested_steps_run_on_learner_thread(self):
+        threads = list()
+        done = threading.Event()
+
+        def step():
+            threads.append(threading.current_thread().name)
+            done.set()
+
+        al = AsyncLearner(self.__lg, step, name="TestLearner")
+        al.start()
+        try:
+            self.assertTrue(al.running())
+            al.request_step()
+            self.assertTrue(done.wait(5))
+        finally:
+            al.stop(5)
+        self.assertFalse(al.running())
+        self.assertEqual(1, al.steps())
+        self.assertEqual(["TestLearner"], threads)
+        return
+
+    def test_requests_coalesce(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def step():
+            started.set()
+            release.wait(5)
+
+        al = AsyncLearner(self.__lg, step)
+        al.start()
+        try:
+            al.request_step()
+            self.assertTrue(started.wait(5))
+            for _ in range(0, 10):
+                al.request_step()  # Does not block while step is running
+            release.set()
+        finally:
+            al.stop(5)
+        self.assertLessEqual(al.steps(), 2)
+        return
+
+    def test_failure_raised_at_next_request(self):
+        failed = threading.Event()
+
+        def step():
+            failed.set()
+            raise ValueError("Step failed")
+
+        al = AsyncLearner(self.__lg, step)
+        al.start()
+        al.request_step()
+        self.assertTrue(failed.wait(5))
+        al.stop(5)
+        self.assertRaises(AsyncLearner.LearnerFailed, al.request_step)
+        return
+
+    def test_synchronised_replay_memory(self):
+        srm = SynchronisedReplayMemory(NStepReplayMemory(self.__lg, 1000, n_step=2, gamma=0.5))
+        self.assertAlmostEqual(0.25, srm.bootstrap_discount())  # passed through to wrapped memory
+
+        def produce():
+            for i in range(0, 500):
+                srm.append_memory(ArrayState(np.array([i])), ArrayState(np.array([i + 1])), i, 1.0, i % 10 == 9)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        while producer.is_alive():
+            srm.get_random_memories(16)
+        producer.join()
+        self.assertEqual(500, srm.len())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestAsyncLearner()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
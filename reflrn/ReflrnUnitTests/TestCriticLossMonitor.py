@@ -0,0 +1,128 @@
+import logging
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.CriticLossMonitor import CriticLossMonitor
+from reflrn.DequeReplayMemory import DequeReplayMemory
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.InMemoryMetricsSink import InMemoryMetricsSink
+
+
+class TestCriticLossMonitor(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestCriticLossMonitor",
+                                      "TestCriticLossMonitor.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def setUp(self):
+        self.builds = list()
+        self.evaluations = 0
+
+    #
+    # Targets are the action of each memory, so the eval set used can be checked.
+    #
+    def build_targets(self, memories: list):
+        self.builds.append(sorted(m[DequeReplayMemory.mem_action] for m in memories))
+        x = np.array([m[DequeReplayMemory.mem_state].state_as_array() for m in memories])
+        y = np.array([float(m[DequeReplayMemory.mem_action]) for m in memories])
+        return x, y
+
+    def evaluate(self, x, y):
+        self.evaluations += 1
+        return [float(np.mean(y)), 0.0]
+
+    def test_evaluation_cadence_and_targets(self):
+        rm = DequeReplayMemory(self.__lg, 100)
+        sink = InMemoryMetricsSink()
+        clm = CriticLossMonitor(self.__lg, rm, sink, evaluate_every=3, eval_set_size=5)
+
+        # Nothing in replay memory yet, so nothing to evaluate
+        for _ in range(0, 3):
+            self.assertIsNone(clm.trained(self.build_targets, self.evaluate))
+        self.assertEqual(0, self.evaluations)
+
+        for i in range(0, 20):
+            rm.append_memory(ArrayState(np.array([i])), ArrayState(np.array([i + 1])), i, 0.0, False)
+
+        losses = [clm.trained(self.build_targets, self.evaluate) for _ in range(0, 9)]
+        self.assertEqual([None, None], losses[0:2])
+        self.assertEqual(3, self.evaluations)
+        self.assertEqual(1, len(self.builds))  # Actor not updated so targets not rebuilt
+        self.assertEqual(5, len(self.builds[0]))
+        self.assertEqual(losses[2], losses[5])
+
+        clm.actor_updated()
+        for _ in range(0, 3):
+            clm.trained(self.build_targets, self.evaluate)
+        self.assertEqual(2, len(self.builds))
+        self.assertEqual(self.builds[0], self.builds[1])  # Same fixed evaluation set
+
+        history = sink.history("critic_loss")
+        self.assertEqual([6, 9, 12, 15], [step for step, _ in history])
+        self.assertAlmostEqual(float(np.mean(self.builds[0])), history[0][1])
+        return
+
+    #
+    # Every hold_out_every'th episode is held out until the evaluation memory is full, the held out memories are
+    # the evaluation set and are never added to the training memory.
+    #
+    def test_hold_out(self):
+        rm = DequeReplayMemory(self.__lg, 100)
+        em = DequeReplayMemory(self.__lg, 6)
+        clm = CriticLossMonitor(self.__lg, em, InMemoryMetricsSink(), evaluate_every=1, eval_set_size=6,
+                                hold_out_every=3)
+        held = list()
+        for i in range(0, 30):
+            for j in range(0, 2):
+                actn = (i * 2) + j
+                if clm.hold_out(ArrayState(np.array([actn])), ArrayState(np.array([actn + 1])), actn, 0.0, j == 1):
+                    held.append(actn)
+                else:
+                    rm.append_memory(ArrayState(np.array([actn])), ArrayState(np.array([actn + 1])), actn, 0.0,
+                                     j == 1)
+            if i == 5:
+                self.assertIsNone(clm.trained(self.build_targets, self.evaluate))  # evaluation memory not full
+        self.assertEqual([4, 5, 10, 11, 16, 17], held)  # episodes 3, 6 & 9 then the evaluation memory is full
+        self.assertEqual(54, rm.len())
+
+        self.assertIsNotNone(clm.trained(self.build_targets, self.evaluate))
+        trained_on = set(m[DequeReplayMemory.mem_action] for m in rm.get_random_memories(rm.len()))
+        self.assertEqual(held, self.builds[-1])
+        self.assertEqual(0, len(trained_on.intersection(self.builds[-1])))
+        return
+
+    #
+    # An episode the environment ended without a memory flagged episode complete is closed by end_episode.
+    #
+    def test_hold_out_end_episode(self):
+        em = DequeReplayMemory(self.__lg, 10)
+        clm = CriticLossMonitor(self.__lg, em, InMemoryMetricsSink(), eval_set_size=10, hold_out_every=2)
+        st = ArrayState(np.array([0]))
+        self.assertFalse(clm.hold_out(st, st, 0, 0.0, False))
+        self.assertFalse(clm.hold_out(st, st, 1, 0.0, False))
+        clm.end_episode()
+        clm.end_episode()  # the episode is only ended once
+        self.assertTrue(clm.hold_out(st, st, 2, 0.0, False))
+        clm.end_episode()
+        self.assertFalse(clm.hold_out(st, st, 3, 0.0, True))
+        self.assertEqual(1, em.len())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestCriticLossMonitor()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
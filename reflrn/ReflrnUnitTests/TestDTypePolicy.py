@@ -0,0 +1,69 @@
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.BatchBuffers import BatchBuffers
+from reflrn.DTypePolicy import DTypePolicy
+
+
+class TestDTypePolicy(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def tearDown(self):
+        DTypePolicy.set_assert_mode(False)
+        DTypePolicy.set_board_dtype(np.float32)
+
+    def test_as_input(self):
+        x32 = np.random.randn(4, 9).astype(np.float32)
+        self.assertIs(x32, DTypePolicy.as_input(x32))  # no copy when already float32
+        x64 = np.random.randn(4, 9)
+        self.assertEqual(np.float32, DTypePolicy.as_input(x64).dtype)
+        self.assertEqual(np.float32, DTypePolicy.as_input(np.zeros((2, 2), dtype=np.int8)).dtype)
+        return
+
+    def test_assert_mode(self):
+        DTypePolicy.set_assert_mode(True)
+        self.assertRaises(DTypePolicy.Float64Promotion, DTypePolicy.as_input, np.zeros((1, 9)))
+        DTypePolicy.as_input(np.zeros((1, 9), dtype=np.float32))
+        DTypePolicy.as_input(np.zeros((1, 9), dtype=np.int8))
+        DTypePolicy.set_assert_mode(False)
+        DTypePolicy.as_input(np.zeros((1, 9)))
+        return
+
+    def test_board_dtype(self):
+        brd = [[1, -1, 0], [0, 1, 0], [0, 0, -1]]
+        self.assertEqual(np.float32, DTypePolicy.as_board(brd).dtype)
+        DTypePolicy.set_board_dtype(np.int8)
+        self.assertEqual(np.int8, DTypePolicy.as_board(brd).dtype)
+        self.assertRaises(ValueError, DTypePolicy.set_board_dtype, np.float64)
+        return
+
+    def test_batch_buffers(self):
+        bb = BatchBuffers()
+        x = bb.get("x", 8, 9)
+        self.assertEqual((8, 9), x.shape)
+        self.assertEqual(np.float32, x.dtype)
+        x[:] = 1
+        y = bb.get("x", 4, 9)
+        self.assertTrue(np.shares_memory(x, y))  # smaller batch re-uses the buffer
+        self.assertEqual((4, 9), y.shape)
+        self.assertFalse(np.shares_memory(x, bb.get("xb", 8, 9)))
+        z = bb.get("x", 16, 9)  # larger batch re-allocates
+        self.assertEqual((16, 9), z.shape)
+        self.assertFalse(np.shares_memory(x, z))
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestDTypePolicy()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
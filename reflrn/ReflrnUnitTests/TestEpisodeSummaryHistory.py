@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from reflrn.EpisodeSummaryHistory import EpisodeSummaryHistory
+
+
+class TestEpisodeSummaryHistory(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    #
+    # Running totals match the totals of the steps taken, and closed episodes become rows.
+    #
+    def test_summaries(self):
+        esh = EpisodeSummaryHistory(initial_capacity=2)  # force the columns to grow
+        expected = list()
+        for episode in range(0, 5):
+            states = [str(random.randint(0, 5)) for _ in range(0, 10 + episode + 1)]
+            rewards = [random.uniform(-1, 1) for _ in range(0, 10 + episode)]
+            for i, reward in enumerate(rewards):
+                esh.step(states[i], states[i + 1], reward)
+            self.assertEqual(len(rewards), esh.current_length())
+            row = esh.close_episode(episode * 10)
+            self.assertEqual(0, esh.current_length())
+            self.assertEqual(len(rewards), row[EpisodeSummaryHistory.LENGTH])
+            self.assertAlmostEqual(sum(rewards), row[EpisodeSummaryHistory.TOTAL_REWARD])
+            self.assertEqual(len(set(states)), row[EpisodeSummaryHistory.DISTINCT_STATES])
+            expected.append((episode * 10, len(rewards), sum(rewards), min(rewards), max(rewards)))
+
+        self.assertEqual(5, esh.num_episodes())
+        self.assertEqual([e[0] for e in expected], esh.column(EpisodeSummaryHistory.EPISODE).tolist())
+        self.assertEqual([e[1] for e in expected], esh.column(EpisodeSummaryHistory.LENGTH).tolist())
+        self.assertTrue(np.allclose([e[2] for e in expected], esh.column(EpisodeSummaryHistory.TOTAL_REWARD)))
+        self.assertTrue(np.allclose([e[3] for e in expected], esh.column(EpisodeSummaryHistory.MIN_REWARD)))
+        self.assertTrue(np.allclose([e[4] for e in expected], esh.column(EpisodeSummaryHistory.MAX_REWARD)))
+        self.assertFalse(esh.column(EpisodeSummaryHistory.LENGTH).flags.writeable)
+        self.assertRaises(EpisodeSummaryHistory.UnknownColumn, esh.column, 'no_such_column')
+
+        row = esh.close_episode(99)  # no steps
+        self.assertEqual(0, row[EpisodeSummaryHistory.LENGTH])
+        self.assertTrue(np.isnan(row[EpisodeSummaryHistory.MIN_REWARD]))
+        return
+
+    #
+    # Exported columns load back as they were.
+    #
+    def test_save_load(self):
+        esh = EpisodeSummaryHistory()
+        for episode in range(0, 3):
+            esh.step("0,0", "0,1", -0.2)
+            esh.step("0,1", "0,2", 0.99)
+            esh.close_episode(episode)
+        with tempfile.TemporaryDirectory() as tmp:
+            file_name = os.path.join(tmp, "summaries")
+            esh.save(file_name)
+            cols = EpisodeSummaryHistory.load_columns(file_name)
+        self.assertEqual(sorted(esh.column_names()), sorted(cols.keys()))
+        for name in esh.column_names():
+            self.assertTrue(np.array_equal(esh.column(name), cols[name]))
+        self.assertEqual([3, 3, 3], cols[EpisodeSummaryHistory.DISTINCT_STATES].tolist())
+        return
+
+    #
+    # Extra columns are added to the history and their values must be given when each episode is closed.
+    #
+    def test_extra_columns(self):
+        esh = EpisodeSummaryHistory(initial_capacity=1, extra_columns={'start': np.int64, 'gap': np.float64})
+        self.assertEqual(EpisodeSummaryHistory().column_names() + ['start', 'gap'], esh.column_names())
+        for episode in range(0, 3):
+            esh.step("0,0", "0,1", -1.0)
+            row = esh.close_episode(episode, {'start': episode, 'gap': episode / 2})
+            self.assertEqual(episode, row['start'])
+        self.assertEqual([0, 1, 2], esh.column('start').tolist())
+        self.assertTrue(np.allclose([0.0, 0.5, 1.0], esh.column('gap')))
+        self.assertEqual(np.int64, esh.column('start').dtype)
+        self.assertTrue(np.array_equal(esh.column('gap'), esh.as_columns()['gap']))
+
+        self.assertRaises(ValueError, esh.close_episode, 3, {'start': 3})
+        self.assertRaises(EpisodeSummaryHistory.UnknownColumn, esh.close_episode, 3, {'start': 3, 'gap': 0.0,
+                                                                                      'other': 1})
+        self.assertRaises(ValueError, EpisodeSummaryHistory, 8, {EpisodeSummaryHistory.LENGTH: np.int64})
+        self.assertEqual(3, esh.num_episodes())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestEpisodeSummaryHistory()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
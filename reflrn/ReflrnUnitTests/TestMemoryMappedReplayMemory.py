@@ -0,0 +1,126 @@
+import logging
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.MemoryMappedReplayMemory import MemoryMappedReplayMemory
+
+
+class TestMemoryMappedReplayMemory(unittest.TestCase):
+    __lg = None
+    __state_dim = 3
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestMemoryMappedReplayMemory",
+                                      "TestMemoryMappedReplayMemory.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def setUp(self):
+        self.__tmp_dir = tempfile.TemporaryDirectory()
+        self.__filename = os.path.join(self.__tmp_dir.name, "replay.mm")
+
+    def tearDown(self):
+        self.__tmp_dir.cleanup()
+
+    def test_empty_memory(self):
+        mmrm = self.__new_memory(10)
+        self.assertEqual(0, mmrm.len())
+        self.assertEqual(0, len(mmrm.get_random_memories(5)))
+        self.assertIsNone(mmrm.get_last_memory())
+        mmrm.close()
+
+    def test_append_and_sample(self):
+        mmrm = self.__new_memory(10)
+        self.__add_memories(mmrm, 5)
+        self.assertEqual(5, mmrm.len())
+        samples = mmrm.get_random_memories(3)
+        self.assertEqual(3, len(samples))
+        for sample in samples:
+            i = int(sample[MemoryMappedReplayMemory.mem_action])
+            self.assertTrue(np.array_equal(self.__state(i).state_as_array(),
+                                           sample[MemoryMappedReplayMemory.mem_state].state_as_array()))
+            self.assertTrue(np.array_equal(self.__state(i + 1).state_as_array(),
+                                           sample[MemoryMappedReplayMemory.mem_next_state].state_as_array()))
+            self.assertAlmostEqual(i * 0.5, sample[MemoryMappedReplayMemory.mem_reward])
+        mmrm.close()
+
+    def test_ring_buffer_wraps(self):
+        mmrm = self.__new_memory(4)
+        self.__add_memories(mmrm, 10)
+        self.assertEqual(4, mmrm.len())
+        actions = sorted(s[MemoryMappedReplayMemory.mem_action] for s in mmrm.get_random_memories(10))
+        self.assertEqual([6, 7, 8, 9], actions)
+        self.assertEqual(9, mmrm.get_last_memory()[MemoryMappedReplayMemory.mem_action])
+        mmrm.close()
+
+    def test_last_memory_by_state(self):
+        mmrm = self.__new_memory(10)
+        self.__add_memories(mmrm, 5)
+        mmrm.append_memory(self.__state(1), self.__state(4), 7, float(0), False)
+        self.assertEqual(7, mmrm.get_last_memory(self.__state(1))[MemoryMappedReplayMemory.mem_action])
+        self.assertEqual(3, mmrm.get_last_memory(self.__state(3))[MemoryMappedReplayMemory.mem_action])
+        self.assertIsNone(mmrm.get_last_memory(self.__state(99)))
+        mmrm.close()
+
+    def test_survives_restart(self):
+        mmrm = self.__new_memory(8)
+        self.__add_memories(mmrm, 6)
+        mmrm.close()
+
+        mmrm = self.__new_memory(8)
+        self.assertEqual(6, mmrm.len())
+        last = mmrm.get_last_memory()
+        self.assertEqual(5, last[MemoryMappedReplayMemory.mem_action])
+        self.assertEqual(2, last[MemoryMappedReplayMemory.mem_episode_id])  # episodes end every 2nd memory
+        mmrm.append_memory(self.__state(6), self.__state(7), 6, float(3), True)
+        self.assertEqual(7, mmrm.len())
+        self.assertEqual(3, mmrm.get_last_memory()[MemoryMappedReplayMemory.mem_episode_id])
+        mmrm.close()
+
+    def test_geometry_mismatch(self):
+        self.__new_memory(8).close()
+        self.assertRaises(MemoryMappedReplayMemory.ReplayFileFormatError,
+                          self.__new_memory,
+                          16)
+
+    #
+    # Memory mapped replay memory on the test file.
+    #
+    def __new_memory(self, replay_mem_size: int) -> MemoryMappedReplayMemory:
+        return MemoryMappedReplayMemory(lg=self.__lg,
+                                        filename=self.__filename,
+                                        replay_mem_size=replay_mem_size,
+                                        state_dim=self.__state_dim)
+
+    #
+    # Add num memories where memory i goes from state i to i + 1 with action i and reward i / 2
+    #
+    def __add_memories(self,
+                       mmrm: MemoryMappedReplayMemory,
+                       num: int) -> None:
+        for i in range(0, num):
+            mmrm.append_memory(self.__state(i), self.__state(i + 1), i, i * 0.5, i % 2 == 1)
+        return
+
+    @classmethod
+    def __state(cls, i: int) -> ArrayState:
+        return ArrayState(np.full(cls.__state_dim, i))
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestMemoryMappedReplayMemory()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,128 @@
+import logging
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.NStepReplayMemory import NStepReplayMemory
+
+
+class TestNStepReplayMemory(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestNStepReplayMemory",
+                                      "TestNStepReplayMemory.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    #
+    # Add an episode of the given length where step i has reward i + 1
+    #
+    @classmethod
+    def __add_episode(cls,
+                      nsrm: NStepReplayMemory,
+                      episode_len: int,
+                      complete: bool = True) -> None:
+        for i in range(0, episode_len):
+            nsrm.append_memory(ArrayState(np.array([i])),
+                               ArrayState(np.array([i + 1])),
+                               i,
+                               float(i + 1),
+                               complete and i == episode_len - 1)
+        return
+
+    @classmethod
+    def __by_action(cls,
+                    nsrm: NStepReplayMemory) -> dict:
+        return {s[NStepReplayMemory.mem_action]: s for s in nsrm.get_random_memories(nsrm.len())}
+
+    def test_open_episode_held_back(self):
+        nsrm = NStepReplayMemory(self.__lg, replay_mem_size=100, n_step=3, gamma=0.5)
+        self.__add_episode(nsrm, 2, complete=False)
+        self.assertEqual(0, nsrm.len())
+        self.__add_episode(nsrm, 1, complete=False)
+        self.assertEqual(1, nsrm.len())
+        return
+
+    def test_n_step_returns(self):
+        gamma = 0.5
+        nsrm = NStepReplayMemory(self.__lg, replay_mem_size=100, n_step=3, gamma=gamma)
+        self.__add_episode(nsrm, 5)
+        self.assertEqual(5, nsrm.len())
+        self.assertAlmostEqual(gamma ** 3, nsrm.bootstrap_discount())
+
+        mems = self.__by_action(nsrm)
+        # Full n steps, bootstrap from s_{t+3}
+        self.assertAlmostEqual(1 + (gamma * 2) + (gamma * gamma * 3), mems[0][NStepReplayMemory.mem_return_n])
+        self.assertEqual(3, mems[0][NStepReplayMemory.mem_bootstrap_state].state_as_array()[0])
+        self.assertFalse(mems[0][NStepReplayMemory.mem_done_n])
+        self.assertAlmostEqual(2 + (gamma * 3) + (gamma * gamma * 4), mems[1][NStepReplayMemory.mem_return_n])
+        self.assertFalse(mems[1][NStepReplayMemory.mem_done_n])
+
+        # Episode ends inside n steps so return is truncated and there is no bootstrap
+        self.assertAlmostEqual(3 + (gamma * 4) + (gamma * gamma * 5), mems[2][NStepReplayMemory.mem_return_n])
+        self.assertTrue(mems[2][NStepReplayMemory.mem_done_n])
+        self.assertAlmostEqual(4 + (gamma * 5), mems[3][NStepReplayMemory.mem_return_n])
+        self.assertTrue(mems[3][NStepReplayMemory.mem_done_n])
+        self.assertAlmostEqual(5, mems[4][NStepReplayMemory.mem_return_n])
+        self.assertEqual(5, mems[4][NStepReplayMemory.mem_bootstrap_state].state_as_array()[0])
+        self.assertTrue(mems[4][NStepReplayMemory.mem_complete])
+        return
+
+    def test_single_step(self):
+        nsrm = NStepReplayMemory(self.__lg, replay_mem_size=100, n_step=1, gamma=0.9)
+        self.__add_episode(nsrm, 3)
+        for mem in nsrm.get_random_memories(3):
+            self.assertEqual(mem[NStepReplayMemory.mem_reward], mem[NStepReplayMemory.mem_return_n])
+            self.assertIs(mem[NStepReplayMemory.mem_next_state], mem[NStepReplayMemory.mem_bootstrap_state])
+            self.assertEqual(mem[NStepReplayMemory.mem_complete], mem[NStepReplayMemory.mem_done_n])
+        return
+
+    #
+    # An episode whose last memory is not flagged complete (e.g. the other agent won) is closed by end_episode
+    # and its returns do not run on into the next episode.
+    #
+    def test_end_episode(self):
+        gamma = 0.5
+        nsrm = NStepReplayMemory(self.__lg, replay_mem_size=100, n_step=3, gamma=gamma)
+        self.__add_episode(nsrm, 2, complete=False)
+        self.assertEqual(0, nsrm.len())
+        nsrm.end_episode()
+        self.assertEqual(2, nsrm.len())
+        nsrm.end_episode()  # nothing open, so no empty episode
+        self.__add_episode(nsrm, 3)
+
+        mems = nsrm.get_random_memories(5)
+        first = {m[NStepReplayMemory.mem_action]: m for m in mems if m[NStepReplayMemory.mem_episode_id] == 0}
+        self.assertEqual(2, len(first))
+        self.assertAlmostEqual(1 + (gamma * 2), first[0][NStepReplayMemory.mem_return_n])
+        self.assertTrue(first[0][NStepReplayMemory.mem_done_n])
+        self.assertAlmostEqual(2, first[1][NStepReplayMemory.mem_return_n])
+        self.assertTrue(first[1][NStepReplayMemory.mem_done_n])
+        self.assertEqual(3, len([m for m in mems if m[NStepReplayMemory.mem_episode_id] == 1]))
+        return
+
+    def test_episode_ids(self):
+        nsrm = NStepReplayMemory(self.__lg, replay_mem_size=100, n_step=2, gamma=0.9)
+        self.__add_episode(nsrm, 3)
+        self.__add_episode(nsrm, 4)
+        episodes = [m[NStepReplayMemory.mem_episode_id] for m in nsrm.get_random_memories(7)]
+        self.assertEqual(3, episodes.count(0))
+        self.assertEqual(4, episodes.count(1))
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestNStepReplayMemory()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
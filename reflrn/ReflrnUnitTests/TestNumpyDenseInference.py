@@ -0,0 +1,108 @@
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.NumpyDenseInference import NumpyDenseInference
+
+
+#
+# Stand ins for the Keras layers, the inference engine only relies on the layer class name, get_config
+# and get_weights.
+#
+class Dense:
+    def __init__(self, w: np.ndarray, b: np.ndarray, activation: str = 'linear'):
+        self.w = w
+        self.b = b
+        self.activation = activation
+
+    def get_config(self) -> dict:
+        return {'activation': self.activation}
+
+    def get_weights(self) -> list:
+        return [self.w, self.b]
+
+
+class Activation:
+    def __init__(self, activation: str):
+        self.activation = activation
+
+    def get_config(self) -> dict:
+        return {'activation': self.activation}
+
+    def get_weights(self) -> list:
+        return []
+
+
+class Dropout(Activation):
+    def __init__(self):
+        Activation.__init__(self, None)
+
+
+class Conv2D(Activation):
+    def __init__(self):
+        Activation.__init__(self, 'relu')
+
+
+class StubModel:
+    def __init__(self, layers: list):
+        self.layers = layers
+
+
+class TestNumpyDenseInference(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    @classmethod
+    def __dense(cls, n_in: int, n_out: int, activation: str = 'linear') -> Dense:
+        return Dense(np.random.randn(n_in, n_out), np.random.randn(n_out), activation)
+
+    def test_forward_pass(self):
+        d1 = self.__dense(9, 25)
+        d2 = self.__dense(25, 50, 'tanh')
+        d3 = self.__dense(50, 9)
+        model = StubModel([d1, Activation('relu'), Dropout(), d2, d3])
+        ndi = NumpyDenseInference()
+        self.assertTrue(ndi.export(model, 1))
+        self.assertEqual(1, ndi.version())
+
+        for n in (1, 32, 1):
+            x = np.random.randn(n, 9)
+            expected = np.tanh(np.maximum(x @ d1.w + d1.b, 0) @ d2.w + d2.b) @ d3.w + d3.b
+            actual = ndi.predict(x)
+            self.assertEqual((n, 9), actual.shape)
+            self.assertEqual(np.float32, actual.dtype)
+            self.assertTrue(np.allclose(expected, actual, atol=1e-4))
+        return
+
+    def test_result_not_overwritten(self):
+        model = StubModel([self.__dense(2, 3, 'relu')])
+        ndi = NumpyDenseInference()
+        ndi.export(model, 1)
+        p1 = ndi.predict(np.array([[1.0, 2.0]]))
+        p1_copy = np.copy(p1)
+        ndi.predict(np.array([[-3.0, 5.0]]))
+        self.assertTrue(np.array_equal(p1_copy, p1))
+        return
+
+    def test_unsupported(self):
+        ndi = NumpyDenseInference()
+        self.assertTrue(ndi.export(StubModel([self.__dense(2, 3)]), 1))
+        self.assertFalse(ndi.export(StubModel([Conv2D(), self.__dense(2, 3)]), 2))
+        self.assertIsNone(ndi.version())
+        self.assertFalse(ndi.export(StubModel([self.__dense(2, 3, 'selu')]), 3))
+        self.assertRaises(RuntimeError, ndi.predict, np.zeros((1, 2)))
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestNumpyDenseInference()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
@@ -0,0 +1,108 @@
+import logging
+import random
+import unittest
+
+import numpy as np
+
+from examples.tictactoe.TicTacToe import TicTacToe
+from examples.tictactoe.TicTacToeAgent import TicTacToeAgent
+from examples.tictactoe.TicTacToeNN import TicTacToeNN
+from examples.tictactoe.TicTacToeState import TicTacToeState
+from examples.tictactoe.TicTacToeStateDecoder import TicTacToeStateDecoder
+from examples.tictactoe.TicTacToeTests.TestAgent import TestAgent
+from reflrn.ActorCriticPolicyTDQVal import ActorCriticPolicyTDQVal
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.GeneralModelParams import GeneralModelParams
+from reflrn.Interface.ModelParams import ModelParams
+from reflrn.ParallelActorCritic import ParallelActorCritic
+from reflrn.PureRandomExploration import PureRandomExploration
+from reflrn.SharedMemoryReplayMemory import SharedMemoryReplayMemory
+
+X_ID = 1
+O_ID = -1
+
+
+#
+# Actors explore at random (epsilon 0) so the test does not depend on what the critic has learned.
+#
+def policy_params() -> GeneralModelParams:
+    return GeneralModelParams([[ModelParams.learning_rate_min, float(0.001)],
+                               [ModelParams.epsilon, float(0)],
+                               [ModelParams.num_states, int(10)]])
+
+
+#
+# Actor process environment, TicTacToe between two agents acting with policies that remember into the shared
+# replay memory.
+#
+def tictactoe_env_factory(worker_id: int,
+                          replay_memory: SharedMemoryReplayMemory):
+    lg = logging.getLogger("TestParallelActorCritic-Actor-" + str(worker_id))
+    policies = [ActorCriticPolicyTDQVal(lg=lg,
+                                        network=TicTacToeNN(9, 9),
+                                        policy_params=policy_params(),
+                                        replay_memory=replay_memory) for _ in range(0, 2)]
+    agent_x = TicTacToeAgent(X_ID, "X", policies[0], 0, PureRandomExploration(), lg)
+    agent_o = TicTacToeAgent(O_ID, "O", policies[1], 0, PureRandomExploration(), lg)
+    ttt = TicTacToe(agent_x, agent_o, lg)
+    for policy in policies:
+        policy.link_to_env(ttt)
+    return ttt, policies
+
+
+class TestParallelActorCritic(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestParallelActorCritic",
+                                      "TestParallelActorCritic.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    #
+    # Actor processes play TicTacToe into the shared replay memory and the learner trains the critic on the
+    # TicTacToe states rebuilt from the shared records.
+    #
+    def test_tictactoe_actors_to_learner(self):
+        agent_x = TestAgent(X_ID, "X")
+        agent_o = TestAgent(O_ID, "O")
+        ttt = TicTacToe(agent_x, agent_o, self.__lg)
+        smrm = SharedMemoryReplayMemory(self.__lg, replay_mem_size=1000, state_dim=9)
+        learner = ActorCriticPolicyTDQVal(lg=self.__lg,
+                                          network=TicTacToeNN(9, 9),
+                                          policy_params=policy_params(),
+                                          env=ttt,
+                                          replay_memory=smrm)
+        pac = ParallelActorCritic(self.__lg,
+                                  learner,
+                                  smrm,
+                                  tictactoe_env_factory,
+                                  state_decoder=TicTacToeStateDecoder(agent_x, agent_o),
+                                  num_actors=2,
+                                  refresh_every=100)
+        try:
+            pac.start_actors(1000)
+            trained = pac.learn(max_train_steps=10)
+            self.assertEqual(10, trained)
+            for sample in smrm.get_random_memories(32):
+                self.assertIsInstance(sample[SharedMemoryReplayMemory.mem_state], TicTacToeState)
+                self.assertIsInstance(sample[SharedMemoryReplayMemory.mem_next_state], TicTacToeState)
+                if sample[SharedMemoryReplayMemory.mem_complete]:
+                    self.assertTrue(ttt.episode_complete(sample[SharedMemoryReplayMemory.mem_next_state]))
+        finally:
+            pac.stop(timeout=30)
+            smrm.unlink()
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestParallelActorCritic()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
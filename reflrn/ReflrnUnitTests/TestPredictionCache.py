@@ -0,0 +1,90 @@
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.PredictionCache import PredictionCache
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def setUp(self):
+        self.calls = list()
+        self.weight = 1.0
+
+    #
+    # Stand in for a model, records the number of rows it was asked to predict.
+    #
+    def predict_fn(self, x: np.ndarray) -> np.ndarray:
+        self.calls.append(len(x))
+        return np.asarray(x, dtype=np.float64) * self.weight
+
+    def test_hits_and_misses(self):
+        pc = PredictionCache(max_entries=10)
+        x = np.array([[1, 2], [3, 4], [1, 2]], dtype=np.float64)
+        p = pc.predict(x, self.predict_fn)
+        self.assertTrue(np.array_equal(x, p))
+        self.assertEqual([3], self.calls)
+        self.assertEqual(0, pc.hits())
+
+        p = pc.predict(np.array([[3, 4], [5, 6]], dtype=np.float64), self.predict_fn)
+        self.assertTrue(np.array_equal(np.array([[3, 4], [5, 6]]), p))
+        self.assertEqual([3, 1], self.calls)  # only the miss is predicted
+        self.assertEqual(1, pc.hits())
+        self.assertEqual(4, pc.misses())
+        self.assertAlmostEqual(0.2, pc.hit_rate())
+
+        p[0, 0] = 99  # Result is a copy, cache is not changed
+        self.assertEqual(3, pc.predict(np.array([[3, 4]], dtype=np.float64), self.predict_fn)[0, 0])
+        return
+
+    def test_invalidate(self):
+        pc = PredictionCache(max_entries=10)
+        x = np.array([[1, 2]], dtype=np.float64)
+        pc.predict(x, self.predict_fn)
+        v = pc.version()
+        self.weight = 2.0
+        pc.invalidate()
+        self.assertEqual(v + 1, pc.version())
+        self.assertTrue(np.array_equal(x * 2, pc.predict(x, self.predict_fn)))
+        self.assertEqual([1, 1], self.calls)
+        return
+
+    def test_lru_eviction(self):
+        pc = PredictionCache(max_entries=2)
+        a, b, c = (np.array([[i]], dtype=np.float64) for i in (1, 2, 3))
+        pc.predict(a, self.predict_fn)
+        pc.predict(b, self.predict_fn)
+        pc.predict(a, self.predict_fn)  # a is now most recent
+        pc.predict(c, self.predict_fn)  # evicts b
+        self.assertEqual(2, pc.len())
+        n = len(self.calls)
+        pc.predict(a, self.predict_fn)
+        self.assertEqual(n, len(self.calls))
+        pc.predict(b, self.predict_fn)
+        self.assertEqual(n + 1, len(self.calls))
+        return
+
+    def test_disabled(self):
+        pc = PredictionCache(max_entries=0)
+        x = np.array([[1, 2]], dtype=np.float64)
+        pc.predict(x, self.predict_fn)
+        pc.predict(x, self.predict_fn)
+        self.assertEqual([1, 1], self.calls)
+        self.assertEqual(0, pc.len())
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestPredictionCache()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
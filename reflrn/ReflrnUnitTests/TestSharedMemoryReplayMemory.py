@@ -0,0 +1,159 @@
+import logging
+import multiprocessing
+import random
+import threading
+import unittest
+
+import numpy as np
+
+from reflrn.ArrayState import ArrayState
+from reflrn.EnvironmentLogging import EnvironmentLogging
+from reflrn.SharedMemoryReplayMemory import SharedMemoryReplayMemory
+from reflrn.SharedModelWeights import SharedModelWeights
+
+STATE_DIM = 2
+
+
+#
+# Producer process, adds num memories where state i goes to state i + 1 with action i.
+#
+def produce(replay_memory: SharedMemoryReplayMemory,
+            producer_id: int,
+            num: int) -> None:
+    replay_memory.set_producer_id(producer_id)
+    for i in range(0, num):
+        replay_memory.append_memory(ArrayState(np.full(STATE_DIM, i)),
+                                    ArrayState(np.full(STATE_DIM, i + 1)),
+                                    i,
+                                    float(producer_id),
+                                    i == num - 1)
+    replay_memory.close()
+
+
+class TestSharedMemoryReplayMemory(unittest.TestCase):
+    __lg = None
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+        cls.__lg = EnvironmentLogging("TestSharedMemoryReplayMemory",
+                                      "TestSharedMemoryReplayMemory.log",
+                                      logging.DEBUG
+                                      ).get_logger()
+
+    def test_empty_memory(self):
+        smrm = SharedMemoryReplayMemory(self.__lg, replay_mem_size=5, state_dim=STATE_DIM)
+        try:
+            self.assertEqual(0, smrm.len())
+            self.assertEqual(0, len(smrm.get_random_memories(3)))
+            self.assertIsNone(smrm.get_last_memory())
+        finally:
+            smrm.unlink()
+        return
+
+    def test_multi_producer(self):
+        smrm = SharedMemoryReplayMemory(self.__lg, replay_mem_size=100, state_dim=STATE_DIM)
+        try:
+            producers = [multiprocessing.Process(target=produce, args=(smrm, pid, 20)) for pid in (1, 2, 3)]
+            for p in producers:
+                p.start()
+            for p in producers:
+                p.join()
+            self.assertEqual(60, smrm.len())
+            samples = smrm.get_random_memories(60)
+            self.assertEqual(60, len(samples))
+            per_producer = dict()
+            for sample in samples:
+                pid = int(sample[SharedMemoryReplayMemory.mem_reward])
+                per_producer[pid] = per_producer.get(pid, 0) + 1
+                i = sample[SharedMemoryReplayMemory.mem_action]
+                self.assertTrue(np.array_equal(np.full(STATE_DIM, i + 1),
+                                               sample[SharedMemoryReplayMemory.mem_next_state].state_as_array()))
+                self.assertEqual(pid, sample[SharedMemoryReplayMemory.mem_episode_id] >> 32)
+            self.assertEqual({1: 20, 2: 20, 3: 20}, per_producer)
+        finally:
+            smrm.unlink()
+        return
+
+    def test_wrap_around(self):
+        smrm = SharedMemoryReplayMemory(self.__lg, replay_mem_size=8, state_dim=STATE_DIM)
+        try:
+            for i in range(0, 20):
+                smrm.append_memory(ArrayState(np.full(STATE_DIM, i)), ArrayState(np.full(STATE_DIM, i + 1)),
+                                   i, float(0), False)
+            self.assertEqual(8, smrm.len())
+            actions = sorted(s[SharedMemoryReplayMemory.mem_action] for s in smrm.get_random_memories(8))
+            self.assertEqual(list(range(12, 20)), actions)
+            self.assertEqual(19, smrm.get_last_memory()[SharedMemoryReplayMemory.mem_action])
+        finally:
+            smrm.unlink()
+        return
+
+    #
+    # A slot that is claimed but still being written is not counted and not sampled, full batches are still
+    # given while there are enough committed records.
+    #
+    def test_claimed_not_committed(self):
+        writing = threading.Event()
+        release = threading.Event()
+
+        def encoder(state):
+            if state.state_as_array()[0] < 0:
+                writing.set()
+                release.wait(5)
+            return state.state_as_array()
+
+        smrm = SharedMemoryReplayMemory(self.__lg, replay_mem_size=10, state_dim=STATE_DIM, state_encoder=encoder)
+        writer = threading.Thread(target=smrm.append_memory,
+                                  args=(ArrayState(np.full(STATE_DIM, -1)), ArrayState(np.full(STATE_DIM, 0)),
+                                        -1, float(0), False))
+        try:
+            for i in range(0, 4):
+                smrm.append_memory(ArrayState(np.full(STATE_DIM, i)), ArrayState(np.full(STATE_DIM, i + 1)),
+                                   i, float(0), False)
+            writer.start()
+            self.assertTrue(writing.wait(5))
+            self.assertEqual(4, smrm.len())
+            self.assertEqual(4, len(smrm.get_random_memories(5)))
+            for _ in range(0, 20):
+                samples = smrm.get_random_memories(3)
+                self.assertEqual(3, len(samples))
+                self.assertTrue(all(s[SharedMemoryReplayMemory.mem_action] >= 0 for s in samples))
+            release.set()
+            writer.join()
+            self.assertEqual(5, smrm.len())
+            self.assertEqual(5, len(smrm.get_random_memories(5)))
+        finally:
+            release.set()
+            if writer.is_alive():
+                writer.join()
+            smrm.unlink()
+        return
+
+    def test_shared_weights(self):
+        weights = [np.ones((2, 3)), np.zeros(3)]
+        smw = SharedModelWeights(weights)
+        try:
+            version, w = smw.weights_if_newer(0)
+            self.assertEqual(2, version)
+            self.assertTrue(np.array_equal(weights[0], w[0]))
+            self.assertIsNone(smw.weights_if_newer(version)[1])
+            smw.publish([np.full((2, 3), 2.0), np.ones(3)])
+            version, w = smw.weights_if_newer(version)
+            self.assertEqual(4, version)
+            self.assertTrue(np.array_equal(np.ones(3), w[1]))
+            self.assertRaises(ValueError, smw.publish, [np.ones(3)])
+        finally:
+            smw.unlink()
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestSharedMemoryReplayMemory()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
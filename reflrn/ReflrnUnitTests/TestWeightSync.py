@@ -0,0 +1,97 @@
+import random
+import unittest
+
+import numpy as np
+
+from reflrn.WeightSync import WeightSync
+
+
+#
+# Stand in for a backend variable, holds a numpy value updated via assign and assign_sub.
+#
+class Variable:
+    def __init__(self, value: np.ndarray):
+        self.value = np.array(value, copy=True)
+        self.assigns = 0
+        self.assign_subs = 0
+
+    def assign(self, value) -> None:
+        self.value[...] = value.value if isinstance(value, Variable) else value
+        self.assigns += 1
+
+    def assign_sub(self, value) -> None:
+        self.value -= value
+        self.assign_subs += 1
+
+    def __sub__(self, other):
+        return self.value - (other.value if isinstance(other, Variable) else other)
+
+    def __mul__(self, other):
+        return self.value * other
+
+
+class TestWeightSync(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(42)
+        np.random.seed(42)
+
+    def setUp(self):
+        self.source = [np.random.randn(3, 4), np.random.randn(4)]
+        self.target = [np.random.randn(3, 4), np.random.randn(4)]
+
+    def test_hard_sync_in_place(self):
+        target_ids = [id(t) for t in self.target]
+        WeightSync().sync(self.target, self.source)
+        self.assertEqual(target_ids, [id(t) for t in self.target])
+        for t, s in zip(self.target, self.source):
+            self.assertTrue(np.array_equal(s, t))
+        return
+
+    def test_soft_sync(self):
+        tau = 0.1
+        expected = [(tau * s) + ((1 - tau) * t) for t, s in zip(self.target, self.source)]
+        ws = WeightSync()
+        ws.sync(self.target, self.source, tau)
+        for t, e in zip(self.target, expected):
+            self.assertTrue(np.allclose(e, t))
+
+        # Repeated soft syncs converge on the source
+        for _ in range(0, 200):
+            ws.sync(self.target, self.source, tau)
+        for t, s in zip(self.target, self.source):
+            self.assertTrue(np.allclose(s, t))
+        return
+
+    def test_variables(self):
+        tau = 0.5
+        tv = [Variable(t) for t in self.target]
+        sv = [Variable(s) for s in self.source]
+        WeightSync().sync(tv, sv, tau)
+        for v, t, s in zip(tv, self.target, self.source):
+            self.assertTrue(np.allclose((tau * s) + ((1 - tau) * t), v.value))
+            self.assertEqual(0, v.assigns)
+            self.assertEqual(1, v.assign_subs)  # soft sync updates the variable in place
+        WeightSync().sync(tv, sv)
+        for v, s in zip(tv, self.source):
+            self.assertTrue(np.array_equal(s, v.value))
+            self.assertEqual(1, v.assigns)
+        return
+
+    def test_invalid(self):
+        ws = WeightSync()
+        self.assertRaises(ValueError, ws.sync, self.target, self.source, 0.0)
+        self.assertRaises(ValueError, ws.sync, self.target, self.source, 1.5)
+        self.assertRaises(ValueError, ws.sync, self.target[0:1], self.source)
+        return
+
+
+#
+# Execute the Unit Tests.
+#
+
+if __name__ == "__main__":
+    tests = TestWeightSync()
+    suite = unittest.TestLoader().loadTestsFromModule(tests)
+    unittest.TextTestRunner().run(suite)
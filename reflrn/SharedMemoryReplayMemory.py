@@ -0,0 +1,242 @@
+import logging
+import multiprocessing
+import random
+from multiprocessing import shared_memory
+from typing import Callable
+
+import numpy as np
+
+from reflrn.FixedRecordLayout import FixedRecordLayout
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+
+
+#
+# Replay memory that lives in a multiprocessing.shared_memory block so that {n} actor processes can append
+# memories while a single learner process samples them.
+#
+# Append is lock light, the lock is only held to claim the next slot and then to count it as committed (fetch
+# and add on the claim / commit counters); the record itself is written outside of the lock. Records carry a
+# sequence stamp that is cleared while the slot is being written, the sampler drops any record whose stamp is
+# not set or changes while it is being copied out and draws another in its place. len() is the commit count so
+# it does not include slots that are claimed but not yet written.
+#
+# Only the array form of states is held, the learner needs the environment's state_decoder (see
+# FixedRecordLayout) to sample states its policy can pass to the environment.
+#
+# The creating (learner) process owns the block and must unlink() it. Actor processes get an attached
+# copy when the memory is passed to them as a Process argument.
+#
+
+class SharedMemoryReplayMemory(ReplayMemory):
+    # Memory List Entry Off Sets
+    mem_episode_id = 0
+    mem_state = 1
+    mem_next_state = 2
+    mem_action = 3
+    mem_reward = 4
+    mem_complete = 5
+
+    # Header Off Sets
+    __CAPACITY = 0
+    __STATE_DIM = 1
+    __CLAIMED = 2
+    __COMMITTED = 3
+    HEADER_LEN = 4
+
+    # Episode id is producer id in the high bits and the producers local episode count in the low bits.
+    __EPISODE_BITS = 32
+
+    def __init__(self,
+                 lg: logging,
+                 replay_mem_size: int,
+                 state_dim: int,
+                 state_encoder: Callable[[State], np.ndarray] = None,
+                 state_decoder: Callable[[np.ndarray], State] = None):
+        self.__lg = lg
+        self.__layout = FixedRecordLayout(state_dim=state_dim,
+                                          state_encoder=state_encoder,
+                                          state_decoder=state_decoder)
+        self.__capacity = replay_mem_size
+        self.__state_encoder = state_encoder
+        self.__state_decoder = state_decoder
+        self.__lock = multiprocessing.Lock()
+        self.__shm = shared_memory.SharedMemory(create=True, size=self.__size_in_bytes())
+        self.__owner = True
+        self.__attach()
+        self.__header[:] = 0
+        self.__header[self.__CAPACITY] = replay_mem_size
+        self.__header[self.__STATE_DIM] = state_dim
+        self.__records[:] = np.zeros(1, dtype=self.__layout.dtype)
+        self.__producer_id = 0
+        self.__episode_id = 0
+        return
+
+    #
+    # Map the header and record arrays over the shared block.
+    #
+    def __attach(self) -> None:
+        self.__header = np.ndarray((self.HEADER_LEN,), dtype=np.int64, buffer=self.__shm.buf)
+        self.__records = np.ndarray((self.__capacity,),
+                                    dtype=self.__layout.dtype,
+                                    buffer=self.__shm.buf,
+                                    offset=self.__header.nbytes)
+        return
+
+    def __size_in_bytes(self) -> int:
+        return (self.HEADER_LEN * np.dtype(np.int64).itemsize) + (self.__capacity * self.__layout.dtype.itemsize)
+
+    #
+    # When passed to a (spawned or forked) process, attach to the block by name rather than copy it.
+    #
+    def __getstate__(self) -> dict:
+        return {'lg': self.__lg,
+                'name': self.__shm.name,
+                'capacity': self.__capacity,
+                'state_dim': self.__layout.state_dim,
+                'state_encoder': self.__state_encoder,
+                'state_decoder': self.__state_decoder,
+                'lock': self.__lock,
+                'producer_id': self.__producer_id}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__lg = state['lg']
+        self.__capacity = state['capacity']
+        self.__state_encoder = state['state_encoder']
+        self.__state_decoder = state['state_decoder']
+        self.__layout = FixedRecordLayout(state_dim=state['state_dim'],
+                                          state_encoder=self.__state_encoder,
+                                          state_decoder=self.__state_decoder)
+        self.__lock = state['lock']
+        self.__shm = shared_memory.SharedMemory(name=state['name'])
+        self.__owner = False
+        self.__attach()
+        self.__producer_id = state['producer_id']
+        self.__episode_id = 0
+        return
+
+    #
+    # Set the id of this producer, each actor process should have a distinct id so that
+    # episode ids do not collide in the shared memory.
+    #
+    def set_producer_id(self, producer_id: int) -> None:
+        self.__producer_id = producer_id
+        return
+
+    #
+    # The name of the shared memory block.
+    #
+    def name(self) -> str:
+        return self.__shm.name
+
+    #
+    # Add a memory to the reply memory, but tag it with the (producer qualified) episode id such
+    # that whole episodes can later be recovered for training.
+    #
+    def append_memory(self,
+                      state: State,
+                      next_state: State,
+                      action: int,
+                      reward: float,
+                      episode_complete: bool) -> None:
+        with self.__lock:
+            claim = int(self.__header[self.__CLAIMED])
+            self.__header[self.__CLAIMED] = claim + 1
+
+        self.__layout.write(self.__records,
+                            claim % self.__capacity,
+                            claim + 1,
+                            (self.__producer_id << self.__EPISODE_BITS) + self.__episode_id,
+                            state,
+                            next_state,
+                            action,
+                            reward,
+                            episode_complete)
+        with self.__lock:
+            self.__header[self.__COMMITTED] += 1
+        if episode_complete:
+            self.__episode_id += 1
+        return
+
+    #
+    # How many committed (fully written) items in the replay memory.
+    #
+    def len(self) -> int:
+        return min(int(self.__header[self.__COMMITTED]), self.__capacity)
+
+    #
+    # The slots that hold a record or have been claimed to write one.
+    #
+    def __slots_used(self) -> int:
+        return min(int(self.__header[self.__CLAIMED]), self.__capacity)
+
+    #
+    # Use the given decoder to rebuild the states of sampled memories, this only affects this process's view
+    # of the memory.
+    #
+    def set_state_decoder(self,
+                          state_decoder: Callable[[np.ndarray], State]) -> None:
+        self.__state_decoder = state_decoder
+        self.__layout = FixedRecordLayout(state_dim=self.__layout.state_dim,
+                                          state_encoder=self.__state_encoder,
+                                          state_decoder=self.__state_decoder)
+        return
+
+    #
+    # Get a random set of committed memories.
+    #
+    # Records being written (or overwritten) while they are sampled are replaced by other records, so fewer
+    # than sample_size memories are only given if there are fewer committed records than that.
+    #
+    # return list of elements [episode, curr_state, next_state, action, reward, complete]
+    #
+    def get_random_memories(self,
+                            sample_size: int) -> [[int, State, State, int, float, bool]]:
+        ln = self.__slots_used()
+        candidates = np.random.permutation(ln)
+        samples = list()
+        taken = 0
+        while len(samples) < sample_size and taken < ln:
+            indices = candidates[taken:taken + (sample_size - len(samples))]
+            taken += len(indices)
+            recs = self.__records[indices]  # copy out
+            stable = (recs[FixedRecordLayout.SEQ] != 0) & \
+                     (recs[FixedRecordLayout.SEQ] == self.__records[FixedRecordLayout.SEQ][indices])
+            for rec in recs[stable]:
+                samples.append(self.__layout.read(rec))
+
+        # Ensure results are random order
+        return random.sample(samples, len(samples))
+
+    #
+    # Get the last committed memory overall, look up by state is not supported across producers.
+    #
+    def get_last_memory(self, state: State = None) -> [int, State, State, int, float, bool]:
+        if state is not None:
+            raise RuntimeError("get_last_memory by state, method not implemented")
+        ln = self.__slots_used()
+        if ln == 0:
+            return None
+        seqs = self.__records[FixedRecordLayout.SEQ][:ln]
+        if np.max(seqs) == 0:
+            return None
+        return self.__layout.read(self.__records[int(np.argmax(seqs))])
+
+    #
+    # Release this processes view of the shared block.
+    #
+    def close(self) -> None:
+        self.__header = None
+        self.__records = None
+        self.__shm.close()
+        return
+
+    #
+    # Release and destroy the shared block, only the creating process should call this.
+    #
+    def unlink(self) -> None:
+        if not self.__owner:
+            raise RuntimeError("Only the process that created the shared replay memory can unlink it")
+        self.close()
+        self.__shm.unlink()
+        return
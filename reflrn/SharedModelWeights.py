@@ -0,0 +1,109 @@
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+
+
+#
+# A single writer / many reader copy of a models weights held in a multiprocessing.shared_memory block.
+#
+# The learner publishes weights, actor processes poll for a version newer than the one they hold. The version
+# is odd while a publish is in progress (sequence lock) so readers never take a half written set of weights.
+#
+
+class SharedModelWeights:
+    __VERSION = 0
+    HEADER_LEN = 2
+
+    #
+    # Create the shared block sized for and holding the given (initial) set of weights.
+    #
+    def __init__(self,
+                 weights: List[np.ndarray]):
+        self.__shapes = [np.shape(w) for w in weights]
+        self.__shm = shared_memory.SharedMemory(create=True, size=self.__size_in_bytes())
+        self.__owner = True
+        self.__attach()
+        self.__header[:] = 0
+        self.publish(weights)
+        return
+
+    def __size_in_bytes(self) -> int:
+        num_weights = int(sum(int(np.prod(s)) for s in self.__shapes))
+        return (self.HEADER_LEN * np.dtype(np.int64).itemsize) + (num_weights * np.dtype(np.float32).itemsize)
+
+    #
+    # Map the header and one float32 view per weight array over the shared block.
+    #
+    def __attach(self) -> None:
+        self.__header = np.ndarray((self.HEADER_LEN,), dtype=np.int64, buffer=self.__shm.buf)
+        self.__views = list()
+        offset = self.__header.nbytes
+        for shp in self.__shapes:
+            v = np.ndarray(shp, dtype=np.float32, buffer=self.__shm.buf, offset=offset)
+            self.__views.append(v)
+            offset += v.nbytes
+        return
+
+    def __getstate__(self) -> dict:
+        return {'name': self.__shm.name, 'shapes': self.__shapes}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__shapes = state['shapes']
+        self.__shm = shared_memory.SharedMemory(name=state['name'])
+        self.__owner = False
+        self.__attach()
+        return
+
+    #
+    # The version of the currently published weights.
+    #
+    def version(self) -> int:
+        return int(self.__header[self.__VERSION])
+
+    #
+    # Publish a new set of weights (single writer only).
+    #
+    def publish(self,
+                weights: List[np.ndarray]) -> int:
+        if len(weights) != len(self.__views):
+            raise ValueError("Expected [" + str(len(self.__views)) + "] weight arrays, given [" +
+                             str(len(weights)) + "]")
+        self.__header[self.__VERSION] += 1  # odd, publish in progress
+        for v, w in zip(self.__views, weights):
+            np.copyto(v, w, casting='same_kind')
+        self.__header[self.__VERSION] += 1
+        return self.version()
+
+    #
+    # Return (version, weights) if weights newer than the given version have been published else
+    # (version, None). Weights are returned as private copies.
+    #
+    def weights_if_newer(self,
+                         version: int) -> Tuple[int, List[np.ndarray]]:
+        v1 = self.version()
+        if v1 == version or v1 % 2 == 1:
+            return version, None
+        weights = [np.array(v, copy=True) for v in self.__views]
+        if self.version() != v1:
+            return version, None  # publish started while copying, pick it up on next poll
+        return v1, weights
+
+    #
+    # Release this processes view of the shared block.
+    #
+    def close(self) -> None:
+        self.__header = None
+        self.__views = None
+        self.__shm.close()
+        return
+
+    #
+    # Release and destroy the shared block, only the creating process should call this.
+    #
+    def unlink(self) -> None:
+        if not self.__owner:
+            raise RuntimeError("Only the process that created the shared weights can unlink them")
+        self.close()
+        self.__shm.unlink()
+        return
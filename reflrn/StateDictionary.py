@@ -0,0 +1,70 @@
+import numpy as np
+
+from reflrn.Interface.State import State
+
+
+#
+# Map from state code to the (first seen) State object with that code. Replay memories that store codes
+# can share one dictionary so that each distinct state is only held once however many memories refer to it.
+#
+# Entries are reference counted, each add is one reference and each release drops one. A state is removed
+# when no memory refers to it any more, so the dictionary only holds the states of the memories held.
+#
+
+class StateDictionary:
+
+    def __init__(self):
+        self.__states = dict()
+        self.__refs = dict()
+        return
+
+    #
+    # Add a reference to the state under the given code, if the code is already known the existing state is
+    # kept.
+    #
+    def add(self,
+            code: np.ndarray,
+            state: State) -> None:
+        k = np.asarray(code).tobytes()
+        if k not in self.__states:
+            self.__states[k] = state
+            self.__refs[k] = 1
+        else:
+            self.__refs[k] += 1
+        return
+
+    #
+    # Drop a reference to the state under the given code, the state is removed when the last reference goes.
+    #
+    def release(self,
+                code: np.ndarray) -> None:
+        k = np.asarray(code).tobytes()
+        if k not in self.__refs:
+            raise StateDictionary.UnknownStateCode("No state held for code [" + str(code) + "]")
+        self.__refs[k] -= 1
+        if self.__refs[k] == 0:
+            del self.__refs[k]
+            del self.__states[k]
+        return
+
+    #
+    # The state for the given code.
+    #
+    def get(self,
+            code: np.ndarray) -> State:
+        k = np.asarray(code).tobytes()
+        if k not in self.__states:
+            raise StateDictionary.UnknownStateCode("No state held for code [" + str(code) + "]")
+        return self.__states[k]
+
+    #
+    # How many distinct states are held.
+    #
+    def len(self) -> int:
+        return len(self.__states)
+
+    # A state was requested for a code that was never added.
+    #
+    class UnknownStateCode(Exception):
+        def __init__(self, *args, **kwargs):
+            Exception.__init__(self, *args, **kwargs)
@@ -0,0 +1,70 @@
+import threading
+
+from reflrn.Interface.ReplayMemory import ReplayMemory
+from reflrn.Interface.State import State
+
+
+#
+# Wrap a replay memory such that it can be appended to from an acting thread while a learner thread samples it.
+#
+# Any other attributes of the wrapped memory (e.g. bootstrap_discount) are passed through.
+#
+
+class SynchronisedReplayMemory(ReplayMemory):
+
+    def __init__(self,
+                 replay_memory: ReplayMemory):
+        self.__replay_memory = replay_memory
+        self.__lock = threading.Lock()
+        return
+
+    def append_memory(self,
+                      state: State,
+                      next_state: State,
+                      action: int,
+                      reward: float,
+                      episode_complete: bool) -> None:
+        with self.__lock:
+            self.__replay_memory.append_memory(state, next_state, action, reward, episode_complete)
+        return
+
+    def len(self) -> int:
+        with self.__lock:
+            return self.__replay_memory.len()
+
+    def get_random_memories(self,
+                            sample_size: int) -> list:
+        with self.__lock:
+            return self.__replay_memory.get_random_memories(sample_size)
+
+    def get_last_memory(self, state: State = None) -> list:
+        with self.__lock:
+            return self.__replay_memory.get_last_memory(state)
+
+    #
+    # The column (bulk) sampling of a wrapped memory that supports it (e.g. EncodedReplayMemory)
+    #
+    def get_random_batch(self,
+                         sample_size: int) -> tuple:
+        with self.__lock:
+            return self.__replay_memory.get_random_batch(sample_size)
+
+    def get_random_batch_with_next_states(self,
+                                          sample_size: int) -> tuple:
+        with self.__lock:
+            return self.__replay_memory.get_random_batch_with_next_states(sample_size)
+
+    #
+    # Close the open episode of a wrapped memory that holds one (e.g. NStepReplayMemory)
+    #
+    def end_episode(self) -> None:
+        end_episode = getattr(self.__replay_memory, 'end_episode', None)
+        if end_episode is not None:
+            with self.__lock:
+                end_episode()
+        return
+
+    def __getattr__(self, name):
+        if name.startswith('_SynchronisedReplayMemory__'):
+            raise AttributeError(name)  # Not yet initialised
+        return getattr(self.__replay_memory, name)
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+#
+# Update target weights from source weights in place, either as a hard copy (tau = 1) or as a soft (Polyak)
+# update target = tau * source + (1 - tau) * target.
+#
+# The soft update is taken as target -= tau * (target - source), which leaves the target updated in place.
+#
+# Weights may be backend variables (anything with assign) which are updated by the backend directly, or numpy
+# arrays which are updated in place using a scratch buffer per weight that is allocated once and re-used for
+# every following sync. Backend variables have no in place scale, so the one temporary per weight for
+# tau * (target - source) is left to the backend, which then subtracts it from the variable in place.
+#
+
+class WeightSync:
+
+    def __init__(self):
+        self.__scratch = None
+        return
+
+    #
+    # Sync target weights from source weights, the two lists must be of matching shapes.
+    #
+    def sync(self,
+             target: list,
+             source: list,
+             tau: float = 1.0) -> None:
+        if not 0.0 < tau <= 1.0:
+            raise ValueError("tau must be in the range (0, 1] given [" + str(tau) + "]")
+        if len(target) != len(source):
+            raise ValueError("Target has [" + str(len(target)) + "] weights, source has [" + str(len(source)) + "]")
+        if len(target) > 0 and hasattr(target[0], 'assign'):
+            self.__sync_variables(target, source, tau)
+        else:
+            self.__sync_arrays(target, source, tau)
+        return
+
+    @classmethod
+    def __sync_variables(cls,
+                         target: list,
+                         source: list,
+                         tau: float) -> None:
+        for t, s in zip(target, source):
+            if tau == 1.0:
+                t.assign(s)
+            else:
+                t.assign_sub((t - s) * tau)
+        return
+
+    def __sync_arrays(self,
+                      target: list,
+                      source: list,
+                      tau: float) -> None:
+        if tau == 1.0:
+            for t, s in zip(target, source):
+                np.copyto(t, s)
+            return
+        if self.__scratch is None or [b.shape for b in self.__scratch] != [np.shape(t) for t in target]:
+            self.__scratch = [np.empty_like(t) for t in target]
+        for t, s, b in zip(target, source, self.__scratch):
+            np.subtract(t, s, out=b)
+            b *= tau
+            t -= b
+        return